@@ -0,0 +1,9 @@
+-- Monotonic policy generation per (scope, app_id), bumped in the same transaction as every IAM mutation.
+-- app_id is '' for scope-wide keys, scope '*' holds the global generation.
+CREATE TABLE IF NOT EXISTS iam_policy_generations (
+    scope VARCHAR(64) NOT NULL,
+    app_id VARCHAR(64) NOT NULL DEFAULT '',
+    generation BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(),
+    CONSTRAINT iam_policy_generations_pkey PRIMARY KEY (scope, app_id)
+);
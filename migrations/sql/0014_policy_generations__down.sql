@@ -0,0 +1 @@
+DROP TABLE IF EXISTS iam_policy_generations;
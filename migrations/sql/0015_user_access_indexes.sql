@@ -0,0 +1,4 @@
+-- Lookups of the user-scoped access query (providers/queries/user_access.sql).
+-- iam_user_roles, iam_user_permissions and iam_role_permissions are already covered by their
+-- unique indexes leading with user_id / role_id.
+CREATE INDEX IF NOT EXISTS ix_org_apps_org_id_app_id ON org_apps (org_id, app_id);
@@ -0,0 +1 @@
+DROP INDEX IF EXISTS ix_org_apps_org_id_app_id;
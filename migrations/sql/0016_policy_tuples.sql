@@ -0,0 +1,204 @@
+-- Ready-made Casbin tuples, one row per role permission ('rp'), user permission ('up') and user role ('ur').
+-- Maintained by triggers on the IAM tables; scope/app_id hold the (scope, app_id) the tuple is loaded for.
+-- Role permissions whose role and resource belong to different scopes keep a NULL scope and are only
+-- returned by the unfiltered query.
+CREATE TABLE IF NOT EXISTS iam_policy_tuples (
+    source_kind VARCHAR(2) NOT NULL,
+    source_id UUID NOT NULL,
+    ptype VARCHAR(2) NOT NULL,
+    subject TEXT NOT NULL,
+    object TEXT NOT NULL,
+    action VARCHAR(50) NULL,
+    effect VARCHAR NULL,
+    scope VARCHAR NULL,
+    app_id UUID NULL,
+    CONSTRAINT iam_policy_tuples_pkey PRIMARY KEY (source_kind, source_id)
+);
+CREATE INDEX IF NOT EXISTS ix_iam_policy_tuples_scope_app_id ON iam_policy_tuples (scope, app_id);
+
+
+-- ######### REFRESH FUNCTIONS ########## --
+
+CREATE OR REPLACE FUNCTION iam_refresh_role_permission_tuples(ids UUID[]) RETURNS void AS $$
+BEGIN
+    DELETE FROM iam_policy_tuples WHERE source_kind = 'rp' AND source_id = ANY(ids);
+
+    INSERT INTO iam_policy_tuples (source_kind, source_id, ptype, subject, object, action, effect, scope, app_id)
+    SELECT
+        'rp',
+        rp.id,
+        'p',
+        r.scope || '/' || COALESCE(r.app_id::text, '') || '/' || r.role_name,
+        res.scope || '/' || COALESCE(res.app_id::text, '') || '/' || res.resource_name,
+        perm.action,
+        COALESCE(rp.effect, 'allow'),
+        CASE WHEN r.scope = res.scope THEN r.scope END,
+        CASE WHEN r.scope = res.scope AND r.app_id = res.app_id THEN r.app_id END
+    FROM iam_role_permissions rp
+    JOIN iam_roles r ON rp.role_id = r.id
+    JOIN iam_permissions perm ON rp.permission_id = perm.id
+    JOIN iam_resources res ON perm.resource_id = res.id
+    WHERE rp.id = ANY(ids)
+    AND NOT coalesce(r.synthetic, false) AND NOT coalesce(res.synthetic, false);
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION iam_refresh_user_permission_tuples(ids UUID[]) RETURNS void AS $$
+BEGIN
+    DELETE FROM iam_policy_tuples WHERE source_kind = 'up' AND source_id = ANY(ids);
+
+    INSERT INTO iam_policy_tuples (source_kind, source_id, ptype, subject, object, action, effect, scope, app_id)
+    SELECT
+        'up',
+        up.id,
+        'p',
+        u.email,
+        res.scope || '/' || COALESCE(res.app_id::text, '') || '/' || res.resource_name,
+        perm.action,
+        COALESCE(up.effect, 'allow'),
+        res.scope,
+        res.app_id
+    FROM iam_user_permissions up
+    JOIN users u ON up.user_id = u.id
+    JOIN iam_permissions perm ON up.permission_id = perm.id
+    JOIN iam_resources res ON perm.resource_id = res.id
+    WHERE up.id = ANY(ids)
+    AND NOT coalesce(res.synthetic, false);
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION iam_refresh_user_role_tuples(ids UUID[]) RETURNS void AS $$
+BEGIN
+    DELETE FROM iam_policy_tuples WHERE source_kind = 'ur' AND source_id = ANY(ids);
+
+    INSERT INTO iam_policy_tuples (source_kind, source_id, ptype, subject, object, action, effect, scope, app_id)
+    SELECT
+        'ur',
+        ur.id,
+        'g',
+        u.email,
+        r.scope || '/' || COALESCE(r.app_id::text, '') || '/' || r.role_name,
+        NULL,
+        NULL,
+        r.scope,
+        r.app_id
+    FROM iam_user_roles ur
+    JOIN users u ON ur.user_id = u.id
+    JOIN iam_roles r ON ur.role_id = r.id
+    WHERE ur.id = ANY(ids)
+    AND NOT coalesce(r.synthetic, false);
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- ######### TRIGGERS ########## --
+-- Deletes of roles, resources, permissions and users cascade to the assignment tables,
+-- whose own triggers drop the tuples.
+
+CREATE OR REPLACE FUNCTION iam_role_permissions_tuples_trigger() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        DELETE FROM iam_policy_tuples WHERE source_kind = 'rp' AND source_id = OLD.id;
+        RETURN OLD;
+    END IF;
+    PERFORM iam_refresh_role_permission_tuples(ARRAY[NEW.id]);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION iam_user_permissions_tuples_trigger() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        DELETE FROM iam_policy_tuples WHERE source_kind = 'up' AND source_id = OLD.id;
+        RETURN OLD;
+    END IF;
+    PERFORM iam_refresh_user_permission_tuples(ARRAY[NEW.id]);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION iam_user_roles_tuples_trigger() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        DELETE FROM iam_policy_tuples WHERE source_kind = 'ur' AND source_id = OLD.id;
+        RETURN OLD;
+    END IF;
+    PERFORM iam_refresh_user_role_tuples(ARRAY[NEW.id]);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION iam_roles_tuples_trigger() RETURNS trigger AS $$
+BEGIN
+    PERFORM iam_refresh_role_permission_tuples(ARRAY(SELECT id FROM iam_role_permissions WHERE role_id = NEW.id));
+    PERFORM iam_refresh_user_role_tuples(ARRAY(SELECT id FROM iam_user_roles WHERE role_id = NEW.id));
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION iam_permissions_tuples_trigger() RETURNS trigger AS $$
+BEGIN
+    PERFORM iam_refresh_role_permission_tuples(ARRAY(SELECT id FROM iam_role_permissions WHERE permission_id = NEW.id));
+    PERFORM iam_refresh_user_permission_tuples(ARRAY(SELECT id FROM iam_user_permissions WHERE permission_id = NEW.id));
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION iam_resources_tuples_trigger() RETURNS trigger AS $$
+BEGIN
+    PERFORM iam_refresh_role_permission_tuples(ARRAY(
+        SELECT rp.id FROM iam_role_permissions rp
+        JOIN iam_permissions perm ON rp.permission_id = perm.id
+        WHERE perm.resource_id = NEW.id
+    ));
+    PERFORM iam_refresh_user_permission_tuples(ARRAY(
+        SELECT up.id FROM iam_user_permissions up
+        JOIN iam_permissions perm ON up.permission_id = perm.id
+        WHERE perm.resource_id = NEW.id
+    ));
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION iam_users_tuples_trigger() RETURNS trigger AS $$
+BEGIN
+    PERFORM iam_refresh_user_permission_tuples(ARRAY(SELECT id FROM iam_user_permissions WHERE user_id = NEW.id));
+    PERFORM iam_refresh_user_role_tuples(ARRAY(SELECT id FROM iam_user_roles WHERE user_id = NEW.id));
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_iam_role_permissions_tuples
+    AFTER INSERT OR UPDATE OR DELETE ON iam_role_permissions
+    FOR EACH ROW EXECUTE FUNCTION iam_role_permissions_tuples_trigger();
+
+CREATE TRIGGER trg_iam_user_permissions_tuples
+    AFTER INSERT OR UPDATE OR DELETE ON iam_user_permissions
+    FOR EACH ROW EXECUTE FUNCTION iam_user_permissions_tuples_trigger();
+
+CREATE TRIGGER trg_iam_user_roles_tuples
+    AFTER INSERT OR UPDATE OR DELETE ON iam_user_roles
+    FOR EACH ROW EXECUTE FUNCTION iam_user_roles_tuples_trigger();
+
+CREATE TRIGGER trg_iam_roles_tuples
+    AFTER UPDATE OF scope, app_id, role_name, synthetic ON iam_roles
+    FOR EACH ROW EXECUTE FUNCTION iam_roles_tuples_trigger();
+
+CREATE TRIGGER trg_iam_permissions_tuples
+    AFTER UPDATE OF resource_id, action ON iam_permissions
+    FOR EACH ROW EXECUTE FUNCTION iam_permissions_tuples_trigger();
+
+CREATE TRIGGER trg_iam_resources_tuples
+    AFTER UPDATE OF scope, app_id, resource_name, synthetic ON iam_resources
+    FOR EACH ROW EXECUTE FUNCTION iam_resources_tuples_trigger();
+
+CREATE TRIGGER trg_users_tuples
+    AFTER UPDATE OF email ON users
+    FOR EACH ROW EXECUTE FUNCTION iam_users_tuples_trigger();
+
+
+-- ######### BACKFILL ########## --
+
+SELECT iam_refresh_role_permission_tuples(ARRAY(SELECT id FROM iam_role_permissions));
+SELECT iam_refresh_user_permission_tuples(ARRAY(SELECT id FROM iam_user_permissions));
+SELECT iam_refresh_user_role_tuples(ARRAY(SELECT id FROM iam_user_roles));
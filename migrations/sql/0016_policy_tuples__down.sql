@@ -0,0 +1,21 @@
+DROP TRIGGER IF EXISTS trg_iam_role_permissions_tuples ON iam_role_permissions;
+DROP TRIGGER IF EXISTS trg_iam_user_permissions_tuples ON iam_user_permissions;
+DROP TRIGGER IF EXISTS trg_iam_user_roles_tuples ON iam_user_roles;
+DROP TRIGGER IF EXISTS trg_iam_roles_tuples ON iam_roles;
+DROP TRIGGER IF EXISTS trg_iam_permissions_tuples ON iam_permissions;
+DROP TRIGGER IF EXISTS trg_iam_resources_tuples ON iam_resources;
+DROP TRIGGER IF EXISTS trg_users_tuples ON users;
+
+DROP FUNCTION IF EXISTS iam_role_permissions_tuples_trigger();
+DROP FUNCTION IF EXISTS iam_user_permissions_tuples_trigger();
+DROP FUNCTION IF EXISTS iam_user_roles_tuples_trigger();
+DROP FUNCTION IF EXISTS iam_roles_tuples_trigger();
+DROP FUNCTION IF EXISTS iam_permissions_tuples_trigger();
+DROP FUNCTION IF EXISTS iam_resources_tuples_trigger();
+DROP FUNCTION IF EXISTS iam_users_tuples_trigger();
+
+DROP FUNCTION IF EXISTS iam_refresh_role_permission_tuples(UUID[]);
+DROP FUNCTION IF EXISTS iam_refresh_user_permission_tuples(UUID[]);
+DROP FUNCTION IF EXISTS iam_refresh_user_role_tuples(UUID[]);
+
+DROP TABLE IF EXISTS iam_policy_tuples;
@@ -0,0 +1,33 @@
+-- Policy refresh webhooks, written in the same transaction as the IAM mutation.
+-- Rows without hook_id are events of a (scope, app_id) still to be fanned out to its hooks;
+-- rows with hook_id are retries of a failed delivery to that hook.
+CREATE TABLE IF NOT EXISTS iam_policy_webhook_outbox (
+    id BIGSERIAL PRIMARY KEY,
+    scope VARCHAR(64) NOT NULL,
+    app_id UUID NOT NULL,
+    hook_id INTEGER NULL REFERENCES iam_policy_refresh_hooks(id) ON DELETE CASCADE,
+    events INTEGER NOT NULL DEFAULT 1,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+    claimed_at TIMESTAMP WITHOUT TIME ZONE NULL,
+    last_error TEXT NULL,
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS ix_iam_policy_webhook_outbox_next_attempt_at ON iam_policy_webhook_outbox (next_attempt_at);
+-- one open event per key: events committed while it waits are coalesced into it
+CREATE UNIQUE INDEX IF NOT EXISTS uix_iam_policy_webhook_outbox_open_event
+    ON iam_policy_webhook_outbox (scope, app_id)
+    WHERE hook_id IS NULL AND claimed_at IS NULL;
+
+CREATE TABLE IF NOT EXISTS iam_policy_webhook_dead_letters (
+    id BIGSERIAL PRIMARY KEY,
+    hook_id INTEGER NULL,
+    scope VARCHAR(64) NOT NULL,
+    app_id UUID NOT NULL,
+    url TEXT NULL,
+    events INTEGER NOT NULL,
+    attempts INTEGER NOT NULL,
+    last_error TEXT NULL,
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    failed_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now()
+);
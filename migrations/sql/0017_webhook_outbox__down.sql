@@ -0,0 +1,2 @@
+DROP TABLE IF EXISTS iam_policy_webhook_dead_letters;
+DROP TABLE IF EXISTS iam_policy_webhook_outbox;
@@ -0,0 +1,20 @@
+-- Every replica keeps the active policy refresh hooks in memory and reloads them
+-- when this channel is notified. Statement-level, so a bulk change notifies once;
+-- Postgres delivers the notification only if the transaction commits.
+
+CREATE OR REPLACE FUNCTION iam_policy_refresh_hooks_notify_trigger() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('iam_policy_hooks_changed', TG_OP);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_iam_policy_refresh_hooks_notify ON iam_policy_refresh_hooks;
+CREATE TRIGGER trg_iam_policy_refresh_hooks_notify
+    AFTER INSERT OR UPDATE OR DELETE ON iam_policy_refresh_hooks
+    FOR EACH STATEMENT EXECUTE FUNCTION iam_policy_refresh_hooks_notify_trigger();
+
+DROP TRIGGER IF EXISTS trg_iam_policy_refresh_hooks_notify_truncate ON iam_policy_refresh_hooks;
+CREATE TRIGGER trg_iam_policy_refresh_hooks_notify_truncate
+    AFTER TRUNCATE ON iam_policy_refresh_hooks
+    FOR EACH STATEMENT EXECUTE FUNCTION iam_policy_refresh_hooks_notify_trigger();
@@ -0,0 +1,3 @@
+DROP TRIGGER IF EXISTS trg_iam_policy_refresh_hooks_notify_truncate ON iam_policy_refresh_hooks;
+DROP TRIGGER IF EXISTS trg_iam_policy_refresh_hooks_notify ON iam_policy_refresh_hooks;
+DROP FUNCTION IF EXISTS iam_policy_refresh_hooks_notify_trigger();
@@ -0,0 +1,32 @@
+-- Append-only journal of the policy tuples added ('+') and removed ('-') by every IAM mutation,
+-- stamped with the generation of the (scope, app_id) it was committed under. A reset ('R') marks
+-- a change that can't be expressed as tuples; clients behind it need a full snapshot.
+-- app_id is '' for scope-wide keys, as in iam_policy_generations.
+CREATE TABLE IF NOT EXISTS iam_policy_journal (
+    id BIGSERIAL PRIMARY KEY,
+    scope VARCHAR(64) NOT NULL,
+    app_id VARCHAR(64) NOT NULL DEFAULT '',
+    generation BIGINT NOT NULL,
+    op CHAR(1) NOT NULL,
+    ptype VARCHAR(16) NULL,
+    subject TEXT NULL,
+    object TEXT NULL,
+    action TEXT NULL,
+    effect VARCHAR(16) NULL,
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS ix_iam_policy_journal_key_generation ON iam_policy_journal (scope, app_id, generation);
+CREATE INDEX IF NOT EXISTS ix_iam_policy_journal_created_at ON iam_policy_journal (created_at);
+
+-- Highest generation per key whose journal rows were compacted away (or that predates the journal):
+-- changes since an older generation can only be served as a snapshot.
+CREATE TABLE IF NOT EXISTS iam_policy_journal_horizon (
+    scope VARCHAR(64) NOT NULL,
+    app_id VARCHAR(64) NOT NULL DEFAULT '',
+    generation BIGINT NOT NULL,
+    CONSTRAINT iam_policy_journal_horizon_pkey PRIMARY KEY (scope, app_id)
+);
+
+INSERT INTO iam_policy_journal_horizon (scope, app_id, generation)
+SELECT scope, app_id, generation FROM iam_policy_generations
+ON CONFLICT (scope, app_id) DO NOTHING;
@@ -0,0 +1,2 @@
+DROP TABLE IF EXISTS iam_policy_journal_horizon;
+DROP TABLE IF EXISTS iam_policy_journal;
@@ -0,0 +1,24 @@
+-- Keyset pagination (utils/pagination.py) orders the IAM lists by (created_at, id) after their
+-- equality filters. created_at was nullable and rows without it never matched a cursor, so it is
+-- backfilled and made NOT NULL; the indexes serve the filters and the order, a page reads only its rows.
+UPDATE iam_resources SET created_at = 'epoch' WHERE created_at IS NULL;
+UPDATE iam_roles SET created_at = 'epoch' WHERE created_at IS NULL;
+UPDATE iam_permissions SET created_at = 'epoch' WHERE created_at IS NULL;
+UPDATE iam_role_permissions SET created_at = 'epoch' WHERE created_at IS NULL;
+UPDATE iam_user_permissions SET created_at = 'epoch' WHERE created_at IS NULL;
+UPDATE iam_user_roles SET created_at = 'epoch' WHERE created_at IS NULL;
+
+ALTER TABLE iam_resources ALTER COLUMN created_at SET NOT NULL;
+ALTER TABLE iam_roles ALTER COLUMN created_at SET NOT NULL;
+ALTER TABLE iam_permissions ALTER COLUMN created_at SET NOT NULL;
+ALTER TABLE iam_role_permissions ALTER COLUMN created_at SET NOT NULL;
+ALTER TABLE iam_user_permissions ALTER COLUMN created_at SET NOT NULL;
+ALTER TABLE iam_user_roles ALTER COLUMN created_at SET NOT NULL;
+
+CREATE INDEX IF NOT EXISTS ix_iam_resources_page ON iam_resources (created_at, id);
+CREATE INDEX IF NOT EXISTS ix_iam_resources_scope_app_page ON iam_resources (scope, app_id, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_iam_roles_scope_app_page ON iam_roles (scope, app_id, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_iam_permissions_resource_page ON iam_permissions (resource_id, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_iam_role_permissions_role_page ON iam_role_permissions (role_id, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_iam_user_permissions_user_page ON iam_user_permissions (user_id, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_iam_user_roles_user_page ON iam_user_roles (user_id, created_at, id);
@@ -0,0 +1,14 @@
+DROP INDEX IF EXISTS ix_iam_user_roles_user_page;
+DROP INDEX IF EXISTS ix_iam_user_permissions_user_page;
+DROP INDEX IF EXISTS ix_iam_role_permissions_role_page;
+DROP INDEX IF EXISTS ix_iam_permissions_resource_page;
+DROP INDEX IF EXISTS ix_iam_roles_scope_app_page;
+DROP INDEX IF EXISTS ix_iam_resources_scope_app_page;
+DROP INDEX IF EXISTS ix_iam_resources_page;
+
+ALTER TABLE iam_user_roles ALTER COLUMN created_at DROP NOT NULL;
+ALTER TABLE iam_user_permissions ALTER COLUMN created_at DROP NOT NULL;
+ALTER TABLE iam_role_permissions ALTER COLUMN created_at DROP NOT NULL;
+ALTER TABLE iam_permissions ALTER COLUMN created_at DROP NOT NULL;
+ALTER TABLE iam_roles ALTER COLUMN created_at DROP NOT NULL;
+ALTER TABLE iam_resources ALTER COLUMN created_at DROP NOT NULL;
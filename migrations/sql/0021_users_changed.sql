@@ -0,0 +1,15 @@
+-- Every replica caches the users resolved by the get_user dependency (infra/user_cache.py) and
+-- drops a user when this channel is notified with its id. users belongs to the core service, so
+-- the trigger catches its writes too; Postgres delivers the notification only if the transaction commits.
+
+CREATE OR REPLACE FUNCTION iam_users_changed_notify_trigger() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('iam_users_changed', OLD.id::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_users_changed_notify ON users;
+CREATE TRIGGER trg_users_changed_notify
+    AFTER UPDATE OF email, org_id, is_super_admin OR DELETE ON users
+    FOR EACH ROW EXECUTE FUNCTION iam_users_changed_notify_trigger();
@@ -0,0 +1,2 @@
+DROP TRIGGER IF EXISTS trg_users_changed_notify ON users;
+DROP FUNCTION IF EXISTS iam_users_changed_notify_trigger();
@@ -0,0 +1,31 @@
+"""create policy generations table
+
+Revision ID: 0014_policy_generations
+Revises: 0013_roles
+Create Date: 2026-10-18 09:12:40.511203
+
+"""
+import pathlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0014_policy_generations'
+down_revision: Union[str, None] = '0013_roles'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    sql_path = pathlib.Path(__file__).parent.parent / "sql" / "0014_policy_generations.sql"
+    with open(sql_path) as f:
+        op.execute(f.read())
+
+
+def downgrade() -> None:
+    sql_path = pathlib.Path(__file__).parent.parent / "sql" / "0014_policy_generations__down.sql"
+    with open(sql_path) as f:
+        op.execute(f.read())
@@ -0,0 +1,31 @@
+"""add user access indexes
+
+Revision ID: 0015_user_access_indexes
+Revises: 0014_policy_generations
+Create Date: 2026-10-18 11:02:17.384920
+
+"""
+import pathlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0015_user_access_indexes'
+down_revision: Union[str, None] = '0014_policy_generations'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    sql_path = pathlib.Path(__file__).parent.parent / "sql" / "0015_user_access_indexes.sql"
+    with open(sql_path) as f:
+        op.execute(f.read())
+
+
+def downgrade() -> None:
+    sql_path = pathlib.Path(__file__).parent.parent / "sql" / "0015_user_access_indexes__down.sql"
+    with open(sql_path) as f:
+        op.execute(f.read())
@@ -0,0 +1,31 @@
+"""create policy tuples table
+
+Revision ID: 0016_policy_tuples
+Revises: 0015_user_access_indexes
+Create Date: 2026-10-18 13:41:52.907315
+
+"""
+import pathlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0016_policy_tuples'
+down_revision: Union[str, None] = '0015_user_access_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    sql_path = pathlib.Path(__file__).parent.parent / "sql" / "0016_policy_tuples.sql"
+    with open(sql_path) as f:
+        op.execute(f.read())
+
+
+def downgrade() -> None:
+    sql_path = pathlib.Path(__file__).parent.parent / "sql" / "0016_policy_tuples__down.sql"
+    with open(sql_path) as f:
+        op.execute(f.read())
@@ -0,0 +1,31 @@
+"""create webhook outbox tables
+
+Revision ID: 0017_webhook_outbox
+Revises: 0016_policy_tuples
+Create Date: 2026-10-18 16:20:08.112734
+
+"""
+import pathlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0017_webhook_outbox'
+down_revision: Union[str, None] = '0016_policy_tuples'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    sql_path = pathlib.Path(__file__).parent.parent / "sql" / "0017_webhook_outbox.sql"
+    with open(sql_path) as f:
+        op.execute(f.read())
+
+
+def downgrade() -> None:
+    sql_path = pathlib.Path(__file__).parent.parent / "sql" / "0017_webhook_outbox__down.sql"
+    with open(sql_path) as f:
+        op.execute(f.read())
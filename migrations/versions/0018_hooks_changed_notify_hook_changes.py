@@ -0,0 +1,31 @@
+"""notify policy refresh hook changes
+
+Revision ID: 0018_hooks_changed
+Revises: 0017_webhook_outbox
+Create Date: 2026-10-18 17:05:41.538201
+
+"""
+import pathlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0018_hooks_changed'
+down_revision: Union[str, None] = '0017_webhook_outbox'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    sql_path = pathlib.Path(__file__).parent.parent / "sql" / "0018_hooks_changed.sql"
+    with open(sql_path) as f:
+        op.execute(f.read())
+
+
+def downgrade() -> None:
+    sql_path = pathlib.Path(__file__).parent.parent / "sql" / "0018_hooks_changed__down.sql"
+    with open(sql_path) as f:
+        op.execute(f.read())
@@ -0,0 +1,31 @@
+"""create policy journal tables
+
+Revision ID: 0019_policy_journal
+Revises: 0018_hooks_changed
+Create Date: 2026-10-18 18:12:27.904115
+
+"""
+import pathlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0019_policy_journal'
+down_revision: Union[str, None] = '0018_hooks_changed'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    sql_path = pathlib.Path(__file__).parent.parent / "sql" / "0019_policy_journal.sql"
+    with open(sql_path) as f:
+        op.execute(f.read())
+
+
+def downgrade() -> None:
+    sql_path = pathlib.Path(__file__).parent.parent / "sql" / "0019_policy_journal__down.sql"
+    with open(sql_path) as f:
+        op.execute(f.read())
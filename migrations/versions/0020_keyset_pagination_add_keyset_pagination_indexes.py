@@ -0,0 +1,31 @@
+"""add keyset pagination indexes
+
+Revision ID: 0020_keyset_pagination
+Revises: 0019_policy_journal
+Create Date: 2026-10-18 21:04:51.318204
+
+"""
+import pathlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0020_keyset_pagination'
+down_revision: Union[str, None] = '0019_policy_journal'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    sql_path = pathlib.Path(__file__).parent.parent / "sql" / "0020_keyset_pagination.sql"
+    with open(sql_path) as f:
+        op.execute(f.read())
+
+
+def downgrade() -> None:
+    sql_path = pathlib.Path(__file__).parent.parent / "sql" / "0020_keyset_pagination__down.sql"
+    with open(sql_path) as f:
+        op.execute(f.read())
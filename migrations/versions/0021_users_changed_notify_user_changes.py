@@ -0,0 +1,31 @@
+"""notify user changes
+
+Revision ID: 0021_users_changed
+Revises: 0020_keyset_pagination
+Create Date: 2026-10-18 21:37:12.604931
+
+"""
+import pathlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0021_users_changed'
+down_revision: Union[str, None] = '0020_keyset_pagination'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    sql_path = pathlib.Path(__file__).parent.parent / "sql" / "0021_users_changed.sql"
+    with open(sql_path) as f:
+        op.execute(f.read())
+
+
+def downgrade() -> None:
+    sql_path = pathlib.Path(__file__).parent.parent / "sql" / "0021_users_changed__down.sql"
+    with open(sql_path) as f:
+        op.execute(f.read())
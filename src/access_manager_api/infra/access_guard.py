@@ -1,4 +1,6 @@
 import logging
+import threading
+from typing import Dict, List, Optional
 
 from access_guard.authz import get_permissions_enforcer
 from access_guard.authz.loaders.policy_code_loader import PolicyCodeLoader
@@ -6,36 +8,205 @@ from access_guard.authz.loaders.policy_db_loader import PolicyDbLoader
 from access_guard.authz.models.permissions_enforcer_params import PermissionsEnforcerParams
 
 from access_manager_api.infra.app_context import get_access_manager_app_id
-from access_manager_api.infra.database import get_engine, get_db
+from access_manager_api.infra.config import settings
+from access_manager_api.infra.database import get_engine, SessionLocal, db_session_scope
+from access_manager_api.infra.decision_cache import CachedPermissionEnforcer, DecisionCache
+from access_manager_api.infra.enforcer_cache import EnforcerCache
+from access_manager_api.infra.policy_generations import GLOBAL_GENERATION_KEY, GenerationKey, PolicyGenerations
 from access_manager_api.models import Scope
 from access_manager_api.providers.db_policies_provider import DBPoliciesProvider
+from access_manager_api.providers.policy_deltas import PolicyDelta
 from access_manager_api.providers.policy_query_provider import AccessManagementQueryProvider
-from access_manager_api.providers.synthetic_policies_provider import load_synthetic_policies, SyntheticPoliciesProvider
+from access_manager_api.providers.synthetic_policies_applications_provider import SyntheticAppPoliciesProvider
+from access_manager_api.providers.synthetic_policies_provider import SyntheticPoliciesProvider
 
 logger = logging.getLogger(__name__)
 
+_registry: Optional["EnforcerRegistry"] = None
+
+
+class EnforcerRegistry:
+    """
+    Application-scoped owner of the enforcers.
+
+    Holds the SMC enforcer used to authorize IAM routes, fronted by a decision cache that is
+    cleared whenever its policies change, and the per-(scope, app_id) enforcers served by
+    the policies endpoints. Loader sessions belong to the registry
+    and are returned to the pool after every (re)load.
+    """
+
+    def __init__(self):
+        self._session = SessionLocal()
+        self._lock = threading.Lock()
+        self.app_enforcers = EnforcerCache(settings.AccessManager.EnforcerCacheSize)
+        # without the listener, changes made by other replicas are only seen by re-reading the generations
+        generation_ttl = None if settings.AccessManager.PolicyChangesListenerEnabled \
+            else settings.AccessManager.PolicyGenerationTTLSeconds
+        self.generations = PolicyGenerations(generation_ttl, on_advance=self._generation_advanced)
+        self.smc_enforcer = self._build_smc_enforcer()
+        self.decisions = DecisionCache(
+            settings.AccessManager.DecisionCacheSize, settings.AccessManager.DecisionCacheTTLSeconds
+        )
+        self.authorizer = CachedPermissionEnforcer(self.smc_enforcer, self.decisions)
+        self._release_session()
+
+    def refresh(self):
+        with self._lock:
+            try:
+                self.smc_enforcer.refresh_policies()
+            finally:
+                self._release_session()
+        self.decisions.clear()
+        self.app_enforcers.clear()
+
+    def get_app_enforcer(self, scope: str, app_id: Optional[str]):
+        return self.app_enforcers.get_or_create((scope, app_id), lambda: self._build_app_enforcer(scope, app_id))
+
+    def publish(self, deltas: List[PolicyDelta], generations: Dict[GenerationKey, int]):
+        # drop stale enforcers before exposing the new generations, so a matching ETag never maps to old policies
+        self.apply_deltas(deltas)
+        for key, generation in generations.items():
+            self.generations.observe(key, generation)
+
+    def apply_deltas(self, deltas: List[PolicyDelta]):
+        """
+        Apply committed policy deltas: the SMC enforcer is patched in place,
+        cached app enforcers of the affected keys are dropped.
+        """
+        self.app_enforcers.invalidate_for_deltas(deltas)
+
+        relevant = [d for d in deltas if _affects_smc_enforcer(d)]
+        if not relevant:
+            return
+
+        if any(d.requires_reload for d in relevant):
+            logger.info("Policy delta requires a full reload, refreshing policies")
+            self.refresh()
+            return
+
+        with self._lock:
+            model = self.smc_enforcer._model
+            for delta in relevant:
+                for policy in delta.removed:
+                    _remove_policy(model, policy)
+                for policy in delta.added:
+                    _add_policy(model, policy)
+            self.decisions.clear()
+
+    def _generation_advanced(self, key: GenerationKey):
+        # changed elsewhere without a delta reaching this process: drop what was built from the old policies
+        if key == GLOBAL_GENERATION_KEY:
+            self.app_enforcers.clear()
+        else:
+            self.app_enforcers.invalidate(key)
+
+    def close(self):
+        self.app_enforcers.clear()
+        self._session.close()
+
+    def _build_smc_enforcer(self):
+        policy_loaders = [
+            PolicyCodeLoader(SyntheticPoliciesProvider(self._session)),
+            PolicyCodeLoader(DBPoliciesProvider(self._session)),
+            PolicyDbLoader(AccessManagementQueryProvider(), get_engine()),
+        ]
+
+        params_dict = {
+            "filter": {
+                "policy_api_scope": Scope.SMC.name,
+                "policy_api_appid": get_access_manager_app_id()
+            }
+        }
+        params = PermissionsEnforcerParams(**params_dict)
+
+        return get_permissions_enforcer(settings=params, new_instance=True, policy_loaders=policy_loaders)
+
+    def _build_app_enforcer(self, scope: str, app_id: Optional[str]):
+        # the policy queries don't filter by user, so the enforcer is shared by every caller of (scope, app_id)
+        params_dict = {
+            "filter": {
+                "policy_api_scope": scope,
+                "policy_api_appid": app_id,
+            }
+        }
+        params = PermissionsEnforcerParams(**params_dict)
+
+        # app enforcers are never refreshed in place, the session is only needed while building
+        with db_session_scope() as db:
+            policy_loaders = [
+                PolicyDbLoader(AccessManagementQueryProvider(), get_engine()),
+            ]
+            if app_id:
+                policy_loaders.append(PolicyCodeLoader(policy_provider=SyntheticAppPoliciesProvider(db)))
+
+            return get_permissions_enforcer(settings=params, new_instance=True, policy_loaders=policy_loaders)
+
+    def _release_session(self):
+        # end the loader transaction so the connection goes back to the pool
+        self._session.close()
+
+
+def init_enforcer_registry() -> EnforcerRegistry:
+    global _registry
+    _registry = EnforcerRegistry()
+    return _registry
+
+
+def close_enforcer_registry():
+    global _registry
+    if _registry is not None:
+        _registry.close()
+        _registry = None
+
+
+def get_enforcer_registry() -> EnforcerRegistry:
+    if _registry is None:
+        raise RuntimeError("Enforcer registry is not initialized. Call init_enforcer_registry first.")
+    return _registry
+
 
 def get_access_guard_enforcer():
     """
     Get Access Guard Enforcer instance.
-    
-    Args:
-        
+
     Returns:
-        PermissionAdapter: A permissions adapter instance
+        CachedPermissionEnforcer: The SMC enforcer owned by the enforcer registry, behind its decision cache
     """
-    policy_loaders = [
-        PolicyCodeLoader(SyntheticPoliciesProvider(next(get_db()))),
-        PolicyCodeLoader(DBPoliciesProvider(next(get_db()))),
-        PolicyDbLoader(AccessManagementQueryProvider(), get_engine()),
-    ]
-
-    params_dict = {
-        "filter": {
-            "policy_api_scope": Scope.SMC.name,
-            "policy_api_appid": get_access_manager_app_id()
-        }
-    }
-    params = PermissionsEnforcerParams(**params_dict)
+    return get_enforcer_registry().authorizer
+
+
+def publish_policy_changes(deltas: List[PolicyDelta], generations: Dict[GenerationKey, int]):
+    if _registry is None:
+        logger.warning("Enforcer registry is not initialized, skipping policy deltas")
+        return
+    _registry.publish(deltas, generations)
+
+
+def _affects_smc_enforcer(delta: PolicyDelta) -> bool:
+    if delta.requires_reload or delta.synthetic:
+        return True
+    return delta.key == (Scope.SMC.name, get_access_manager_app_id())
+
+
+def _to_rule(policy) -> List[str]:
+    if policy.ptype.startswith("g"):
+        return [policy.sub, policy.obj]
+    return [policy.sub, policy.obj, policy.act, policy.effect]
+
+
+def _add_policy(model, policy):
+    sec, rule = policy.ptype[0], _to_rule(policy)
+    if model.has_policy(sec, policy.ptype, rule):
+        return
+    model.add_policy(sec, policy.ptype, rule)
+    if sec == "g":
+        model.model[sec][policy.ptype].rm.add_link(rule[0], rule[1])
+
 
-    return get_permissions_enforcer(settings=params, policy_loaders=policy_loaders)
+def _remove_policy(model, policy):
+    sec, rule = policy.ptype[0], _to_rule(policy)
+    if not model.has_policy(sec, policy.ptype, rule):
+        return
+    model.remove_policy(sec, policy.ptype, rule)
+    if sec == "g":
+        model.model[sec][policy.ptype].rm.delete_link(rule[0], rule[1])
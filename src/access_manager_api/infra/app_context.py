@@ -1,3 +1,6 @@
+import threading
+import time
+import uuid
 from typing import Optional
 
 from sqlalchemy.orm import Session
@@ -5,8 +8,15 @@ from sqlalchemy.orm import Session
 from access_manager_api.infra.constants import ACCESS_MANAGER_APP_NAME
 from access_manager_api.models.policy_webhook import PolicyWebhook
 
+# notified by the trigger on iam_policy_refresh_hooks (migration 0018_hooks_changed)
+HOOKS_CHANGED_CHANNEL = "iam_policy_hooks_changed"
+
 ACCESS_MANAGER_APP_ID: Optional[str] = None
-HOOK_CACHE: dict[tuple[str, int], list[dict]] = {}
+# active policy refresh hooks by (scope, app_id) and by id, replaced as a whole on reload
+HOOK_CACHE: dict[tuple[str, uuid.UUID], list[dict]] = {}
+HOOKS_BY_ID: dict[int, dict] = {}
+HOOK_CACHE_LOADED_AT: Optional[float] = None
+_hook_cache_lock = threading.Lock()
 
 
 def init_access_manager_id(db: Session):
@@ -25,15 +35,50 @@ def get_access_manager_app_id() -> str:
     return ACCESS_MANAGER_APP_ID
 
 
-# def load_hooks_into_memory(db: Session):
-#     rows = db.query(PolicyWebhook).filter_by(is_active=True).all()
-#     for row in rows:
-#         key = (row.scope, row.app_id)
-#         HOOK_CACHE.setdefault(key, []).append({
-#             "url": row.url,
-#             # "secret": decrypt_secret(row.secret_encrypted),
-#             "secret": row.secret,
-#         })
+def hook_key(scope: str, app_id) -> tuple[str, uuid.UUID]:
+    # app ids come as str, uuid.UUID or the asyncpg UUID type depending on the caller
+    return scope, uuid.UUID(str(app_id))
+
+
+def load_hooks_into_memory(db: Session):
+    """Load the active policy refresh hooks; the registry is swapped once fully built."""
+    global HOOK_CACHE, HOOKS_BY_ID, HOOK_CACHE_LOADED_AT
+    hooks: dict[tuple[str, uuid.UUID], list[dict]] = {}
+    by_id: dict[int, dict] = {}
+    rows = db.query(PolicyWebhook).filter_by(is_active=True).all()
+    for row in rows:
+        hook = {
+            "id": row.id,
+            "url": row.url,
+            # "secret": decrypt_secret(row.secret_encrypted),
+            "secret": row.secret,
+        }
+        hooks.setdefault(hook_key(row.scope, row.app_id), []).append(hook)
+        by_id[row.id] = hook
+
+    with _hook_cache_lock:
+        HOOK_CACHE, HOOKS_BY_ID = hooks, by_id
+        HOOK_CACHE_LOADED_AT = time.monotonic()
+
+
+def reload_hooks():
+    from access_manager_api.infra.database import db_session_scope
+
+    with db_session_scope() as db:
+        load_hooks_into_memory(db)
+
+
+def hooks_stale(ttl_seconds: float) -> bool:
+    # fallback for missed change notifications, e.g. when the listener is disabled
+    return HOOK_CACHE_LOADED_AT is None or time.monotonic() - HOOK_CACHE_LOADED_AT >= ttl_seconds
+
+
+def get_hooks(scope: str, app_id) -> list[dict]:
+    return HOOK_CACHE.get(hook_key(scope, app_id), [])
+
+
+def get_hook_by_id(hook_id: int) -> Optional[dict]:
+    return HOOKS_BY_ID.get(hook_id)
 
 
 def get_root_path() -> str:
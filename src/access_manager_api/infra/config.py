@@ -17,6 +17,43 @@ logger = logging.getLogger(__name__)
 
 class AccessManagerSettings(BaseModel):
     PolicyLoaderType: str
+    # Max number of per-(scope, app_id) enforcers kept by the policies service
+    EnforcerCacheSize: int = 128
+    # require_permission decisions of the SMC enforcer, cleared on every change of its policies
+    DecisionCacheSize: int = 10000
+    DecisionCacheTTLSeconds: float = 30.0
+    # Users resolved by the get_user dependency, by id. Changed users are dropped on notification;
+    # without the policy changes listener a change is only seen after the TTL
+    UserCacheSize: int = 10000
+    UserCacheTTLSeconds: float = 60.0
+    # Keyset pagination of the IAM list endpoints
+    DefaultPageSize: int = 100
+    MaxPageSize: int = 500
+    # Items per request of the bulk endpoints, keeps their statements under Postgres' 65535 bind parameters
+    MaxBulkItems: int = 1000
+    # Postgres channel used to propagate committed policy changes between replicas
+    PolicyChangesChannel: str = "iam_policy_changes"
+    PolicyChangesListenerEnabled: bool = True
+    # Without the listener, policy generations (and so the ETags of GET /iam/policies) are re-read this often
+    PolicyGenerationTTLSeconds: float = 5.0
+    # Policy refresh webhooks of a (scope, app_id) are coalesced over this window
+    WebhookDebounceSeconds: float = 1.0
+    # Webhook outbox delivery
+    WebhookWorkerEnabled: bool = True
+    WebhookPollSeconds: float = 5.0
+    WebhookBatchSize: int = 100
+    WebhookLeaseSeconds: float = 60.0
+    WebhookTimeoutSeconds: float = 5.0
+    WebhookMaxConnections: int = 100
+    WebhookPerHostConcurrency: int = 4
+    WebhookMaxAttempts: int = 8
+    WebhookBackoffSeconds: float = 2.0
+    WebhookMaxBackoffSeconds: float = 600.0
+    # Policy change journal served by GET /iam/policies?since=; older changes fall back to a snapshot
+    PolicyJournalRetentionSeconds: float = 86400.0
+    PolicyJournalCompactSeconds: float = 300.0
+    # The hook registry is reloaded on change notifications, and at least this often
+    HookCacheTTLSeconds: float = 300.0
 
     @property
     def policy_loader_type(self):
@@ -42,6 +79,17 @@ class CoreDBSettings(BaseModel):
     User: str
     Password: str
     Database: str
+    # Connection pool, per engine (sync and async); PoolSize 0 disables pooling
+    PoolSize: int = 10
+    MaxOverflow: int = 20
+    PoolTimeout: float = 10.0
+    PoolRecycle: int = 1800
+    PoolPrePing: bool = True
+    # Connections opened at startup, capped at PoolSize
+    PoolPrewarm: int = 5
+    # Behind PgBouncer in transaction mode: no server-side prepared statement caching.
+    # The policy changes listener needs a session-mode connection.
+    PgBouncerTransactionMode: bool = False
 
     @property
     def URI(self):
@@ -1,24 +1,91 @@
-from contextlib import contextmanager
-from typing import Generator
+from contextlib import asynccontextmanager, contextmanager
+import logging
+from typing import AsyncGenerator, Generator, Optional
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
+from access_manager_api.infra.db_pool import engine_options, pool_status
 from access_manager_api.models import Base
 
+logger = logging.getLogger(__name__)
+
 # Create session factory without engine
 SessionLocal = sessionmaker()
 _engine = None
 
+# Async counterpart (asyncpg) for async routes; objects stay usable after commit
+ASYNC_SESSION_INFO_KEY = "async_session"
+AsyncSessionLocal = async_sessionmaker(class_=AsyncSession, expire_on_commit=False,
+                                       info={ASYNC_SESSION_INFO_KEY: True})
+_async_engine = None
+
 
-def init_db(database_url: str):
+def init_db(database_url: str, db_settings=None):
     """Initialize the database connection"""
     global _engine
-    _engine = create_engine(database_url)
+    _engine = create_engine(database_url, **engine_options(db_settings))
     SessionLocal.configure(bind=_engine)
     return _engine
 
 
+def init_async_db(database_url: str, db_settings=None):
+    """Initialize the asyncpg connection used by async routes"""
+    global _async_engine
+    url = to_async_url(database_url)
+    if db_settings is not None and db_settings.PgBouncerTransactionMode:
+        url += "?prepared_statement_cache_size=0"
+    _async_engine = create_async_engine(url, **engine_options(db_settings, use_async=True))
+    AsyncSessionLocal.configure(bind=_async_engine)
+    return _async_engine
+
+
+def prewarm_db(count: int):
+    """Open `count` pooled connections up front so the first requests don't pay for the connects"""
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(get_engine().raw_connection())
+    except Exception as e:
+        logger.warning(f"Failed to prewarm the connection pool. System said: {e}")
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
+async def prewarm_async_db(count: int):
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(await _async_engine.connect())
+    except Exception as e:
+        logger.warning(f"Failed to prewarm the async connection pool. System said: {e}")
+    finally:
+        for connection in connections:
+            await connection.close()
+    return len(connections)
+
+
+def get_pool_status() -> dict:
+    status = {"sync": pool_status(get_engine().pool)}
+    if _async_engine is not None:
+        status["async"] = pool_status(_async_engine.pool)
+    return status
+
+
+async def close_async_db():
+    global _async_engine
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+
+
+def to_async_url(database_url: str) -> str:
+    return database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -27,6 +94,11 @@ def get_db():
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def get_engine():
     if _engine is None:
         raise RuntimeError("Database not initialized. Call init_db first.")
@@ -39,4 +111,10 @@ def db_session_scope() -> Generator:
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+@asynccontextmanager
+async def async_db_session_scope() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
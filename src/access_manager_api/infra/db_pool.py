@@ -0,0 +1,115 @@
+import threading
+import time
+import uuid
+from typing import Optional
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from sqlalchemy.pool.base import Pool
+
+
+class PoolWaitStats:
+    """Checkout wait times of a pool; a wait is how long _do_get took to hand out a connection."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+
+class _InstrumentedPoolMixin:
+    _wait_stats: Optional[PoolWaitStats] = None
+
+    @property
+    def wait_stats(self) -> PoolWaitStats:
+        if self._wait_stats is None:
+            self._wait_stats = PoolWaitStats()
+        return self._wait_stats
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.wait_stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # pool.recreate() (invalidation, dispose) keeps the accumulated stats
+        pool = super().recreate()
+        pool._wait_stats = self._wait_stats
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(db_settings, use_async: bool = False) -> dict:
+    """create_engine/create_async_engine keyword arguments for the CoreDB pool settings."""
+    if db_settings is None:
+        return {}
+
+    options = {"pool_pre_ping": db_settings.PoolPrePing}
+
+    if db_settings.PgBouncerTransactionMode and use_async:
+        # server-side prepared statements don't survive across pgbouncer transactions
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+
+    if db_settings.PoolSize <= 0:
+        options["poolclass"] = NullPool
+        return options
+
+    options.update({
+        "poolclass": InstrumentedAsyncQueuePool if use_async else InstrumentedQueuePool,
+        "pool_size": db_settings.PoolSize,
+        "max_overflow": db_settings.MaxOverflow,
+        "pool_timeout": db_settings.PoolTimeout,
+        "pool_recycle": db_settings.PoolRecycle,
+    })
+    return options
+
+
+def pool_status(pool: Pool) -> dict:
+    if not isinstance(pool, QueuePool):
+        return {"pool": type(pool).__name__}
+
+    status = {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": pool.overflow(),
+    }
+    if isinstance(pool, _InstrumentedPoolMixin):
+        status.update(pool.wait_stats.as_dict())
+    return status
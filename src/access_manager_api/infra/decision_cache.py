@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from access_guard.authz.exceptions import PermissionDeniedError
+from access_guard.authz.models.entities import User
+
+DecisionKey = Tuple[str, str, str]
+
+# (result, denial message): the message of a denial is None when access was granted
+Decision = Tuple[Any, Optional[str]]
+
+
+class DecisionCache:
+    """
+    Bounded LRU cache of authorization decisions keyed by (subject, resource_path, action).
+
+    Entries expire after ttl_seconds. Clearing bumps an epoch, so a decision computed while
+    the policies were changing is not stored.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[DecisionKey, Tuple[float, Decision]]" = OrderedDict()
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def epoch(self) -> int:
+        return self._epoch
+
+    def get(self, key: DecisionKey) -> Optional[Decision]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: DecisionKey, decision: Decision, epoch: int):
+        with self._lock:
+            if epoch != self._epoch:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, decision)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._epoch += 1
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+class CachedPermissionEnforcer:
+    """
+    Wraps an enforcer so require_permission answers repeated checks from a DecisionCache.
+    Only the decision is cached; a cached denial raises a new PermissionDeniedError with the
+    original message.
+    """
+
+    def __init__(self, enforcer, cache: DecisionCache):
+        self._enforcer = enforcer
+        self.decisions = cache
+
+    def require_permission(self, user, resource_path: str, action: str):
+        result, denial = self._decide(user, (str(user.id), resource_path, action))
+        if denial is not None:
+            raise PermissionDeniedError(denial)
+        return result
+
+    def batch_check(self, requests: Sequence[DecisionKey]) -> List[bool]:
+        """
+        Evaluate many (subject, resource_path, action) requests, returning one boolean per request.
+        Repeated requests are evaluated once and cached decisions are reused.
+        """
+        allowed: Dict[DecisionKey, bool] = {}
+        for key in requests:
+            if key not in allowed:
+                _, denial = self._decide(User(id=key[0]), key)
+                allowed[key] = denial is None
+        return [allowed[key] for key in requests]
+
+    def _decide(self, user, key: DecisionKey) -> Decision:
+        decision = self.decisions.get(key)
+        if decision is not None:
+            return decision
+
+        epoch = self.decisions.epoch
+        try:
+            decision = (self._enforcer.require_permission(user, key[1], key[2]), None)
+        except PermissionDeniedError as e:
+            decision = (None, str(e))
+        self.decisions.put(key, decision, epoch)
+        return decision
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._enforcer, name)
@@ -0,0 +1,72 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from access_manager_api.providers.policy_deltas import PolicyDelta
+
+logger = logging.getLogger(__name__)
+
+EnforcerKey = Tuple[str, Optional[str]]
+
+
+class EnforcerCache:
+    """
+    Bounded LRU cache of built enforcers keyed by (scope, app_id).
+
+    Every invalidation bumps a per-key version, so an enforcer built while its policies
+    were changing is not stored.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[EnforcerKey, Any]" = OrderedDict()
+        self._versions: Dict[EnforcerKey, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def get_or_create(self, key: EnforcerKey, factory: Callable[[], Any]):
+        with self._lock:
+            enforcer = self._entries.get(key)
+            if enforcer is not None:
+                self._entries.move_to_end(key)
+                return enforcer
+            version = self._version(key)
+
+        enforcer = factory()
+
+        with self._lock:
+            if self._version(key) == version:
+                self._entries[key] = enforcer
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    evicted, _ = self._entries.popitem(last=False)
+                    logger.debug(f"Evicted enforcer for {evicted}")
+        return enforcer
+
+    def invalidate(self, key: EnforcerKey):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._versions[key] = self._versions.get(key, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._epoch += 1
+
+    def invalidate_for_deltas(self, deltas: Iterable[PolicyDelta]):
+        deltas = list(deltas)
+        if any(d.requires_reload for d in deltas):
+            self.clear()
+            return
+        for delta in deltas:
+            self.invalidate(delta.key)
+            # enforcers built without an app_id hold every app of the scope
+            self.invalidate((delta.scope, None))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _version(self, key: EnforcerKey):
+        return self._epoch, self._versions.get(key, 0)
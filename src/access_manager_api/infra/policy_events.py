@@ -0,0 +1,79 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from access_manager_api.infra.database import ASYNC_SESSION_INFO_KEY
+from access_manager_api.infra.policy_generations import GenerationKey, bump_generations, changed_generation_keys
+from access_manager_api.infra.policy_journal import record_policy_journal
+from access_manager_api.infra.policy_notifications import notify_policy_changes
+from access_manager_api.infra.webhook_outbox import enqueue_webhook_events, wake_webhook_worker
+from access_manager_api.providers.policy_deltas import PolicyDelta
+
+logger = logging.getLogger(__name__)
+
+PENDING_DELTAS_KEY = "pending_policy_deltas"
+PENDING_GENERATIONS_KEY = "pending_policy_generations"
+
+# a single worker keeps the deltas committed by AsyncSessions in commit order
+_publish_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="policy-publish")
+
+
+def record_policy_delta(db: Session, delta: PolicyDelta):
+    """
+    Attach a policy delta to the session's current transaction.
+    It is published once the transaction commits and discarded on rollback.
+    """
+    db.info.setdefault(PENDING_DELTAS_KEY, []).append(delta)
+
+
+def publish_policy_deltas(deltas: List[PolicyDelta], generations: Dict[GenerationKey, int], offload: bool = False):
+    """
+    Apply committed deltas to the local enforcer registry. Sync sessions commit off the event loop
+    and publish inline, so the request that wrote the policies reads them back. AsyncSession commits
+    run on the event loop, and a reload rebuilds the SMC enforcer with blocking queries, so those
+    are offloaded to a worker thread.
+    """
+    if offload:
+        _publish_executor.submit(_publish, deltas, generations)
+    else:
+        _publish(deltas, generations)
+
+
+def _publish(deltas: List[PolicyDelta], generations: Dict[GenerationKey, int]):
+    from access_manager_api.infra.access_guard import publish_policy_changes
+
+    try:
+        publish_policy_changes(deltas, generations)
+    except Exception as e:
+        logger.exception(f"Failed to apply policy deltas. System said: {e}")
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_pending_generations(session: Session):
+    deltas = session.info.get(PENDING_DELTAS_KEY)
+    if deltas:
+        generations = bump_generations(session, changed_generation_keys(deltas))
+        session.info[PENDING_GENERATIONS_KEY] = generations
+        # delivered to the other replicas on commit
+        notify_policy_changes(session, deltas, generations)
+        # replayed by GET /iam/policies?since=
+        record_policy_journal(session, deltas, generations)
+        enqueue_webhook_events(session, deltas)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending_deltas(session: Session):
+    deltas = session.info.pop(PENDING_DELTAS_KEY, None)
+    generations = session.info.pop(PENDING_GENERATIONS_KEY, {})
+    if deltas:
+        publish_policy_deltas(deltas, generations, offload=session.info.get(ASYNC_SESSION_INFO_KEY, False))
+        wake_webhook_worker()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_deltas(session: Session):
+    session.info.pop(PENDING_DELTAS_KEY, None)
+    session.info.pop(PENDING_GENERATIONS_KEY, None)
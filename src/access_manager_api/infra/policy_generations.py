@@ -0,0 +1,172 @@
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+GenerationKey = Tuple[str, Optional[str]]
+
+# bumped by changes that can't be attributed to a single (scope, app_id), e.g. org admin roles
+GLOBAL_GENERATION_KEY: GenerationKey = ("*", None)
+
+# what a client holds of a key: its generation and the global generation
+PolicyVersion = Tuple[int, int]
+
+BUMP_GENERATION_SQL = text("""
+    INSERT INTO iam_policy_generations (scope, app_id, generation, updated_at)
+    VALUES (:scope, :app_id, 1, now())
+    ON CONFLICT (scope, app_id)
+    DO UPDATE SET generation = iam_policy_generations.generation + 1, updated_at = now()
+    RETURNING generation
+""")
+
+SELECT_GENERATION_SQL = text("""
+    SELECT generation FROM iam_policy_generations WHERE scope = :scope AND app_id = :app_id
+""")
+
+# app deltas only bump their own row; the policies of a whole scope change with any row of the
+# scope, and the sum of its generations grows with every one of those bumps
+SELECT_SCOPE_GENERATION_SQL = text("""
+    SELECT COALESCE(SUM(generation), 0) FROM iam_policy_generations WHERE scope = :scope
+""")
+
+
+class PolicyGenerations:
+    """
+    In-memory view of the policy generation of every (scope, app_id) served by this process.
+    The source of truth is iam_policy_generations, bumped in the same transaction as the mutation.
+
+    With a TTL, a generation is re-read from the database once it is older than the TTL, for
+    processes that don't receive change notifications. `on_advance` is called with a key whose
+    re-read generation moved forward, before the new generation is exposed.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None,
+                 on_advance: Optional[Callable[[GenerationKey], None]] = None):
+        self._generations: Dict[GenerationKey, int] = {}
+        self._loaded_at: Dict[GenerationKey, float] = {}
+        # bumped whenever a generation of an app of the scope moves forward
+        self._scope_changes: Dict[str, int] = {}
+        self._ttl_seconds = ttl_seconds
+        self._on_advance = on_advance
+        self._lock = threading.Lock()
+
+    def get(self, key: GenerationKey) -> Optional[int]:
+        return self._generations.get(key)
+
+    def observe(self, key: GenerationKey, generation: int):
+        """Record a generation bumped by a commit of this process or of a notifying replica."""
+        scope, app_id = key
+        with self._lock:
+            if app_id is None and key != GLOBAL_GENERATION_KEY:
+                # the row of the scope-wide deltas, not the scope-wide generation (the sum of every row)
+                self._scope_changed(scope)
+                return
+            # generations only move forward, late or duplicate notifications are ignored
+            if generation > self._generations.get(key, -1):
+                self._generations[key] = generation
+                if app_id is not None:
+                    self._scope_changed(scope)
+
+    def clear(self):
+        # generations are re-read from the database on next use
+        with self._lock:
+            self._generations.clear()
+            self._loaded_at.clear()
+
+    def get_or_load(self, db: Session, key: GenerationKey) -> int:
+        generation = self.get(key)
+        if generation is not None and not self._expired(key):
+            return generation
+
+        scope, app_id = key
+        scope_changes = self._scope_changes.get(scope, 0)
+        loaded = load_generation(db, key)
+        if generation is not None and loaded > generation and self._on_advance:
+            self._on_advance(key)
+        with self._lock:
+            if app_id is None and self._scope_changes.get(scope, 0) != scope_changes:
+                # an app of the scope moved forward while the sum was read, it may not include it
+                return loaded
+            self._loaded_at[key] = time.monotonic()
+            if loaded > self._generations.get(key, -1):
+                self._generations[key] = loaded
+            return self._generations[key]
+
+    def version(self, db: Session, key: GenerationKey) -> PolicyVersion:
+        """Version of the policies of a key; the db session is only used for generations not held (or past the TTL)."""
+        return self.get_or_load(db, key), self.get_or_load(db, GLOBAL_GENERATION_KEY)
+
+    def etag(self, db: Session, key: GenerationKey, representation: Optional[str] = None) -> str:
+        return build_etag(key, self.version(db, key), representation)
+
+    def _scope_changed(self, scope: str):
+        # called with the lock held; the scope-wide generation is re-read on next use
+        self._generations.pop((scope, None), None)
+        self._scope_changes[scope] = self._scope_changes.get(scope, 0) + 1
+
+    def _expired(self, key: GenerationKey) -> bool:
+        if self._ttl_seconds is None:
+            return False
+        loaded_at = self._loaded_at.get(key)
+        return loaded_at is None or time.monotonic() - loaded_at > self._ttl_seconds
+
+
+def changed_generation_keys(deltas) -> Set[GenerationKey]:
+    keys = set()
+    for delta in deltas:
+        # the scope-wide generation is the sum of the app rows, app deltas don't touch its row
+        keys.add(delta.key)
+        if delta.requires_reload:
+            keys.add(GLOBAL_GENERATION_KEY)
+    return keys
+
+
+def bump_generations(db: Session, keys: Iterable[GenerationKey]) -> Dict[GenerationKey, int]:
+    """Bump the generation of every key; the row lock serializes concurrent writers of the same key."""
+    generations = {}
+    # sorted to take the row locks in a stable order
+    for scope, app_id in sorted(set(keys), key=lambda k: (k[0], k[1] or "")):
+        generations[(scope, app_id)] = db.execute(
+            BUMP_GENERATION_SQL, {"scope": scope, "app_id": app_id or ""}
+        ).scalar_one()
+    return generations
+
+
+def load_generation(db: Session, key: GenerationKey) -> int:
+    scope, app_id = key
+    if app_id is None and key != GLOBAL_GENERATION_KEY:
+        return int(db.execute(SELECT_SCOPE_GENERATION_SQL, {"scope": scope}).scalar() or 0)
+    generation = db.execute(SELECT_GENERATION_SQL, {"scope": scope, "app_id": app_id or ""}).scalar()
+    return generation or 0
+
+
+def build_policy_version(version: PolicyVersion) -> str:
+    generation, global_generation = version
+    return f"{generation}.{global_generation}"
+
+
+def parse_policy_version(value: str) -> Optional[PolicyVersion]:
+    try:
+        generation, global_generation = value.split(".")
+        return int(generation), int(global_generation)
+    except ValueError:
+        return None
+
+
+def build_etag(key: GenerationKey, version: PolicyVersion, representation: Optional[str] = None) -> str:
+    """Strong ETag of one representation (JSON when None) of the policies of a key."""
+    scope, app_id = key
+    suffix = f"+{representation}" if representation else ""
+    return f'"{scope}:{app_id or ""}:{build_policy_version(version)}{suffix}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip().removeprefix("W/")
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
@@ -0,0 +1,156 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from access_manager_api.infra.config import settings
+from access_manager_api.infra.database import db_session_scope
+from access_manager_api.infra.policy_generations import GenerationKey, PolicyVersion
+from access_manager_api.providers.policy_deltas import PolicyDelta
+
+logger = logging.getLogger(__name__)
+
+OP_ADDED = "+"
+OP_REMOVED = "-"
+OP_RESET = "R"
+
+# (ptype, subject, object, action, effect)
+JournalTuple = Tuple[str, str, str, Optional[str], Optional[str]]
+
+INSERT_SQL = text("""
+    INSERT INTO iam_policy_journal (scope, app_id, generation, op, ptype, subject, object, action, effect)
+    VALUES (:scope, :app_id, :generation, :op, :ptype, :subject, :object, :action, :effect)
+""")
+
+HORIZON_SQL = text("""
+    SELECT generation FROM iam_policy_journal_horizon WHERE scope = :scope AND app_id = :app_id
+""")
+
+CHANGES_SQL = text("""
+    SELECT op, ptype, subject, object, action, effect FROM iam_policy_journal
+    WHERE scope = :scope AND app_id = :app_id AND generation > :since AND generation <= :generation
+    ORDER BY id
+""")
+
+# the rows of a generation share created_at (now() of their transaction), so they go away together
+COMPACT_SQL = text("""
+    WITH deleted AS (
+        DELETE FROM iam_policy_journal
+        WHERE created_at < now() - make_interval(secs => :retention)
+        RETURNING scope, app_id, generation
+    )
+    INSERT INTO iam_policy_journal_horizon (scope, app_id, generation)
+    SELECT scope, app_id, max(generation) FROM deleted GROUP BY scope, app_id
+    ON CONFLICT (scope, app_id)
+    DO UPDATE SET generation = GREATEST(iam_policy_journal_horizon.generation, EXCLUDED.generation)
+""")
+
+_compaction_task: Optional[asyncio.Task] = None
+
+
+def record_policy_journal(db: Session, deltas: List[PolicyDelta], generations: Dict[GenerationKey, int]):
+    """
+    Journal the tuples of the deltas under the generation bumped for their app. Scope-wide
+    versions are sums of generations and are always answered with a snapshot, so the
+    deltas without an app_id aren't journaled.
+    """
+    rows = []
+    for (scope, app_id), generation in generations.items():
+        if app_id is None:
+            continue
+        base = {"scope": scope, "app_id": app_id, "generation": generation}
+        for delta in deltas:
+            if delta.key != (scope, app_id):
+                continue
+            if delta.synthetic or delta.requires_reload:
+                # synthetic tuples are expanded by the providers, they can't be replayed
+                rows.append({**base, "op": OP_RESET, "ptype": None, "subject": None, "object": None,
+                             "action": None, "effect": None})
+                continue
+            rows.extend({**base, "op": OP_ADDED, **_tuple_params(p)} for p in delta.added)
+            rows.extend({**base, "op": OP_REMOVED, **_tuple_params(p)} for p in delta.removed)
+
+    if rows:
+        db.execute(INSERT_SQL, rows)
+
+
+def load_policy_changes(db: Session, key: GenerationKey, since: PolicyVersion, current: PolicyVersion) \
+        -> Optional[Tuple[List[JournalTuple], List[JournalTuple]]]:
+    """
+    Net tuples added and removed for a key after version `since` up to `current`.
+    Returns None when the journal can't answer (global reload, compacted, reset, unknown
+    generation) and a snapshot is needed.
+    """
+    since_generation, since_global = since
+    generation, global_generation = current
+    if since_global != global_generation:
+        # a reload only bumps the global generation and rebuilds the enforcers of every key,
+        # it isn't journaled under the keys it changes
+        return None
+    if since_generation < 0 or since_generation > generation:
+        return None
+    if since_generation == generation:
+        return [], []
+
+    scope, app_id = key
+    if app_id is None:
+        # a sum of the generations of the scope, it doesn't map to journal rows
+        return None
+    params = {"scope": scope, "app_id": app_id or ""}
+    horizon = db.execute(HORIZON_SQL, params).scalar() or 0
+    if since_generation < horizon:
+        return None
+
+    last_op: Dict[JournalTuple, str] = {}
+    for row in db.execute(CHANGES_SQL, {**params, "since": since_generation, "generation": generation}):
+        if row.op == OP_RESET:
+            return None
+        last_op[(row.ptype, row.subject, row.object, row.action, row.effect)] = row.op
+
+    added = [t for t, op in last_op.items() if op == OP_ADDED]
+    removed = [t for t, op in last_op.items() if op == OP_REMOVED]
+    return added, removed
+
+
+def compact_policy_journal(db: Session, retention_seconds: float):
+    db.execute(COMPACT_SQL, {"retention": float(retention_seconds)})
+    db.commit()
+
+
+async def _compact_periodically():
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(settings.AccessManager.PolicyJournalCompactSeconds)
+        try:
+            await loop.run_in_executor(None, _compact_once)
+        except Exception as e:
+            logger.warning(f"Failed to compact the policy journal. System said: {e}")
+
+
+def _compact_once():
+    with db_session_scope() as db:
+        compact_policy_journal(db, settings.AccessManager.PolicyJournalRetentionSeconds)
+
+
+def start_journal_compaction():
+    global _compaction_task
+    _compaction_task = asyncio.create_task(_compact_periodically())
+
+
+def stop_journal_compaction():
+    global _compaction_task
+    if _compaction_task is not None:
+        _compaction_task.cancel()
+        _compaction_task = None
+
+
+def _tuple_params(policy) -> dict:
+    return {
+        "ptype": policy.ptype,
+        "subject": policy.sub,
+        "object": policy.obj,
+        "action": getattr(policy, "act", None),
+        "effect": getattr(policy, "effect", None),
+    }
@@ -0,0 +1,215 @@
+import asyncio
+import json
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import psycopg2
+from psycopg2 import sql
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from access_manager_api.infra.app_context import HOOKS_CHANGED_CHANNEL, reload_hooks
+from access_manager_api.infra.config import settings
+from access_manager_api.infra.policy_generations import GenerationKey
+from access_manager_api.infra.user_cache import USERS_CHANGED_CHANNEL, clear_user_cache, invalidate_cached_user
+from access_manager_api.providers.policy_deltas import PolicyDelta
+
+logger = logging.getLogger(__name__)
+
+# identifies this process, so a replica skips the notifications of its own commits
+INSTANCE_ID = uuid.uuid4().hex
+
+# Postgres rejects NOTIFY payloads from 8000 bytes on
+MAX_PAYLOAD_BYTES = 7500
+RECONNECT_DELAY_SECONDS = 2
+
+NOTIFY_SQL = text("SELECT pg_notify(:channel, :payload)")
+
+_listener: Optional["PolicyChangesListener"] = None
+
+
+def build_notification_payload(deltas: List[PolicyDelta], generations: Dict[GenerationKey, int]) -> str:
+    """
+    Serialize committed deltas and generations. When the tuples don't fit in a notification,
+    the deltas are sent without them, which flags them requires_reload: listeners then rebuild
+    the SMC enforcer and drop every cached app enforcer. When even that doesn't fit, a bare
+    reload message is sent and listeners also re-read every generation.
+    """
+    message = {
+        "origin": INSTANCE_ID,
+        "generations": [[scope, app_id, generation] for (scope, app_id), generation in generations.items()],
+        "deltas": [d.to_dict() for d in deltas],
+    }
+    payload = json.dumps(message, separators=(",", ":"))
+    if len(payload.encode()) <= MAX_PAYLOAD_BYTES:
+        return payload
+
+    message["deltas"] = [d.to_dict(with_tuples=False) for d in deltas]
+    payload = json.dumps(message, separators=(",", ":"))
+    if len(payload.encode()) <= MAX_PAYLOAD_BYTES:
+        return payload
+
+    # bounded whatever the size of the mutation, e.g. bulk endpoints touching many apps
+    return json.dumps({"origin": INSTANCE_ID, "reload": True}, separators=(",", ":"))
+
+
+def parse_notification_payload(payload: str):
+    message = json.loads(payload)
+    deltas = [PolicyDelta.from_dict(d) for d in message.get("deltas", [])]
+    generations = {(scope, app_id): generation for scope, app_id, generation in message.get("generations", [])}
+    return message.get("origin"), message.get("reload", False), deltas, generations
+
+
+def notify_policy_changes(db: Session, deltas: List[PolicyDelta], generations: Dict[GenerationKey, int]):
+    """
+    Queue a notification in the current transaction; Postgres delivers it to the listeners
+    only if the transaction commits.
+    """
+    db.execute(NOTIFY_SQL, {
+        "channel": settings.AccessManager.PolicyChangesChannel,
+        "payload": build_notification_payload(deltas, generations),
+    })
+
+
+class PolicyChangesListener:
+    """
+    LISTENs on the policy changes channel with a dedicated connection driven by the event loop.
+    Changes committed by other replicas are applied to the local enforcer registry, changes
+    of iam_policy_refresh_hooks reload the hook registry and changed users are dropped from the
+    user cache; after a reconnect all of them are refreshed since notifications may have been missed.
+    """
+
+    def __init__(self, dsn: str, channel: str, hooks_channel: str = HOOKS_CHANGED_CHANNEL,
+                 users_channel: str = USERS_CHANGED_CHANNEL):
+        self.dsn = dsn
+        self.channel = channel
+        self.hooks_channel = hooks_channel
+        self.users_channel = users_channel
+        self._conn = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # a single worker keeps the deltas in commit order and off the event loop
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="policy-changes")
+        self._closed = False
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._connect()
+
+    def close(self):
+        self._closed = True
+        self._disconnect()
+        self._executor.shutdown(wait=False)
+
+    def _connect(self, resync: bool = False):
+        if self._closed:
+            return
+        try:
+            conn = psycopg2.connect(self.dsn)
+            conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cursor:
+                cursor.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+                cursor.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.hooks_channel)))
+                cursor.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.users_channel)))
+        except psycopg2.Error as e:
+            logger.warning(f"Failed to listen for policy changes, retrying. System said: {e}")
+            self._schedule_reconnect()
+            return
+
+        self._conn = conn
+        self._loop.add_reader(conn.fileno(), self._on_readable)
+        logger.info(f"Listening for policy changes on '{self.channel}'")
+
+        if resync:
+            clear_user_cache()
+            self._executor.submit(self._resync)
+
+    def _disconnect(self):
+        if self._conn is None:
+            return
+        try:
+            self._loop.remove_reader(self._conn.fileno())
+            self._conn.close()
+        except Exception as e:
+            logger.debug(f"Failed to close policy changes connection. System said: {e}")
+        self._conn = None
+
+    def _schedule_reconnect(self):
+        if not self._closed:
+            self._loop.call_later(RECONNECT_DELAY_SECONDS, self._connect, True)
+
+    def _on_readable(self):
+        try:
+            self._conn.poll()
+        except psycopg2.Error as e:
+            logger.warning(f"Policy changes connection lost. System said: {e}")
+            self._disconnect()
+            self._schedule_reconnect()
+            return
+
+        while self._conn.notifies:
+            notification = self._conn.notifies.pop(0)
+            if notification.channel == self.hooks_channel:
+                self._executor.submit(self._reload_hooks)
+            elif notification.channel == self.users_channel:
+                self._invalidate_user(notification.payload)
+            else:
+                self._executor.submit(self._apply, notification.payload)
+
+    def _apply(self, payload: str):
+        from access_manager_api.infra.access_guard import publish_policy_changes
+
+        try:
+            origin, reload_all, deltas, generations = parse_notification_payload(payload)
+            if origin == INSTANCE_ID:
+                return
+            if reload_all:
+                self._reload_policies()
+                return
+            publish_policy_changes(deltas, generations)
+        except Exception as e:
+            logger.exception(f"Failed to apply policy changes notification. System said: {e}")
+
+    def _resync(self):
+        self._reload_policies()
+        self._reload_hooks()
+
+    def _reload_policies(self):
+        from access_manager_api.infra.access_guard import get_enforcer_registry
+
+        try:
+            registry = get_enforcer_registry()
+            registry.refresh()
+            registry.generations.clear()
+        except Exception as e:
+            logger.exception(f"Failed to refresh policies. System said: {e}")
+
+    def _invalidate_user(self, payload: str):
+        try:
+            invalidate_cached_user(uuid.UUID(payload))
+        except ValueError:
+            logger.warning(f"Ignoring user change notification '{payload}'")
+
+    def _reload_hooks(self):
+        try:
+            reload_hooks()
+        except Exception as e:
+            logger.exception(f"Failed to reload policy refresh hooks. System said: {e}")
+
+
+def start_policy_changes_listener() -> Optional[PolicyChangesListener]:
+    global _listener
+    if not settings.AccessManager.PolicyChangesListenerEnabled:
+        return None
+    _listener = PolicyChangesListener(settings.CoreDB.URI, settings.AccessManager.PolicyChangesChannel)
+    _listener.start(asyncio.get_running_loop())
+    return _listener
+
+
+def stop_policy_changes_listener():
+    global _listener
+    if _listener is not None:
+        _listener.close()
+        _listener = None
@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from uuid import UUID
+
+from access_manager_api.infra.config import settings
+
+# notified with the id of a user whose email, org or super admin flag changed, or who was deleted
+USERS_CHANGED_CHANNEL = "iam_users_changed"
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """The fields of a users row needed to authorize a request."""
+    id: UUID
+    email: str
+    org_id: Optional[UUID]
+    is_super_admin: bool
+
+    @classmethod
+    def from_model(cls, user) -> "CachedUser":
+        return cls(id=user.id, email=user.email, org_id=user.org_id, is_super_admin=user.is_super_admin)
+
+
+class UserCache:
+    """
+    Bounded LRU cache of resolved users with a short TTL. The users table is owned by the core
+    service; a trigger notifies its changes and the policy changes listener invalidates them.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[UUID, Tuple[float, CachedUser]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: UUID) -> Optional[CachedUser]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user: CachedUser):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self.ttl_seconds, user)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: UUID):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_user_cache = UserCache(settings.AccessManager.UserCacheSize, settings.AccessManager.UserCacheTTLSeconds)
+
+
+def get_user_cache() -> UserCache:
+    return _user_cache
+
+
+def invalidate_cached_user(user_id: UUID):
+    """Drop a user from the cache, e.g. after its email or org changed."""
+    _user_cache.invalidate(user_id)
+
+
+def clear_user_cache():
+    _user_cache.clear()
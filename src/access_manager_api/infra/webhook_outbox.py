@@ -0,0 +1,334 @@
+import asyncio
+import logging
+import random
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from access_manager_api.infra.app_context import get_hook_by_id, get_hooks, hook_key, hooks_stale, reload_hooks
+from access_manager_api.infra.config import settings
+from access_manager_api.infra.database import async_db_session_scope
+from access_manager_api.providers.policy_deltas import PolicyDelta
+
+logger = logging.getLogger(__name__)
+
+# events of a key that is still waiting are merged into its open row (see uix_iam_policy_webhook_outbox_open_event)
+ENQUEUE_SQL = text("""
+    INSERT INTO iam_policy_webhook_outbox (scope, app_id, next_attempt_at)
+    VALUES (:scope, :app_id, now() + make_interval(secs => :delay))
+    ON CONFLICT (scope, app_id) WHERE hook_id IS NULL AND claimed_at IS NULL
+    DO UPDATE SET events = iam_policy_webhook_outbox.events + 1
+""")
+
+# rows claimed by a worker that died are claimed again once the lease expires
+CLAIM_SQL = text("""
+    UPDATE iam_policy_webhook_outbox o SET claimed_at = now()
+    WHERE o.id IN (
+        SELECT id FROM iam_policy_webhook_outbox
+        WHERE (claimed_at IS NULL AND next_attempt_at <= now())
+           OR claimed_at < now() - make_interval(secs => :lease)
+        ORDER BY next_attempt_at
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING o.id, o.scope, o.app_id, o.hook_id, o.events, o.attempts, o.created_at,
+              EXTRACT(EPOCH FROM now() - o.created_at) AS age
+""")
+
+# renewed while a batch is being delivered, so a slow host doesn't let another replica re-claim it
+RENEW_LEASE_SQL = text("UPDATE iam_policy_webhook_outbox SET claimed_at = now() WHERE id = ANY(:ids)")
+
+NEXT_DUE_SQL = text("""
+    SELECT EXTRACT(EPOCH FROM min(next_attempt_at) - now()) FROM iam_policy_webhook_outbox WHERE claimed_at IS NULL
+""")
+
+INSERT_RETRY_SQL = text("""
+    INSERT INTO iam_policy_webhook_outbox (scope, app_id, hook_id, events, attempts, next_attempt_at, last_error, created_at)
+    VALUES (:scope, :app_id, :hook_id, :events, :attempts, now() + make_interval(secs => :delay), :last_error, :created_at)
+""")
+
+RESCHEDULE_SQL = text("""
+    UPDATE iam_policy_webhook_outbox
+    SET attempts = :attempts, next_attempt_at = now() + make_interval(secs => :delay),
+        claimed_at = NULL, last_error = :last_error
+    WHERE id = :id
+""")
+
+DEAD_LETTER_SQL = text("""
+    INSERT INTO iam_policy_webhook_dead_letters (hook_id, scope, app_id, url, events, attempts, last_error, created_at)
+    VALUES (:hook_id, :scope, :app_id, :url, :events, :attempts, :last_error, :created_at)
+""")
+
+DELETE_SQL = text("DELETE FROM iam_policy_webhook_outbox WHERE id = ANY(:ids)")
+
+BACKLOG_SQL = text("""
+    SELECT
+        (SELECT count(*) FROM iam_policy_webhook_outbox WHERE hook_id IS NULL) AS pending_events,
+        (SELECT count(*) FROM iam_policy_webhook_outbox WHERE hook_id IS NOT NULL) AS pending_retries,
+        (SELECT EXTRACT(EPOCH FROM now() - min(created_at)) FROM iam_policy_webhook_outbox) AS oldest_age,
+        (SELECT count(*) FROM iam_policy_webhook_dead_letters) AS dead_letters
+""")
+
+_worker: Optional["WebhookOutboxWorker"] = None
+
+
+def enqueue_webhook_events(db: Session, deltas: List[PolicyDelta]):
+    """Write one outbox event per affected (scope, app_id) in the current transaction."""
+    keys = sorted({d.key for d in deltas if d.app_id})
+    for scope, app_id in keys:
+        db.execute(ENQUEUE_SQL, {
+            "scope": scope,
+            "app_id": app_id,
+            "delay": float(settings.AccessManager.WebhookDebounceSeconds),
+        })
+
+
+class _Delivery:
+    def __init__(self, hook: dict, row, attempts: int, events: int):
+        self.hook = hook
+        self.row = row
+        self.attempts = attempts
+        self.events = events
+        self.error: Optional[str] = None
+
+
+class WebhookOutboxWorker:
+    """
+    Delivers the outbox with a shared HTTP client: hooks are called concurrently with a per-host
+    limit, failures are retried with exponential backoff and parked in the dead letters after
+    WebhookMaxAttempts.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.client: Optional[httpx.AsyncClient] = None
+        self.stats = defaultdict(float)
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._wakeup = asyncio.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self.client = httpx.AsyncClient(
+            timeout=self.config.WebhookTimeoutSeconds,
+            limits=httpx.Limits(max_connections=self.config.WebhookMaxConnections),
+        )
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._stopping = True
+        self._wakeup.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout=self.config.WebhookTimeoutSeconds + 1)
+            except asyncio.TimeoutError:
+                # claimed rows are picked up again when their lease expires
+                self._task.cancel()
+        if self.client is not None:
+            await self.client.aclose()
+
+    def wake(self):
+        """Thread-safe: look at the outbox now instead of at the next poll."""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def backlog(self) -> dict:
+        async with async_db_session_scope() as db:
+            row = (await db.execute(BACKLOG_SQL)).one()
+        return {
+            "pending_events": row.pending_events,
+            "pending_retries": row.pending_retries,
+            "oldest_age_seconds": float(row.oldest_age) if row.oldest_age is not None else 0.0,
+            "dead_letters": row.dead_letters,
+        }
+
+    def delivery_stats(self) -> dict:
+        delivered = self.stats["delivered"]
+        return {
+            "delivered": int(delivered),
+            "failed": int(self.stats["failed"]),
+            "retries_scheduled": int(self.stats["retries_scheduled"]),
+            "dead_lettered": int(self.stats["dead_lettered"]),
+            "coalesced_events": int(self.stats["coalesced_events"]),
+            "avg_latency_ms": round(self.stats["latency_total"] / delivered * 1000, 1) if delivered else 0.0,
+            "max_latency_ms": round(self.stats["latency_max"] * 1000, 1),
+        }
+
+    async def _run(self):
+        while not self._stopping:
+            # cleared before looking at the outbox, so a wake-up during the batch isn't lost
+            self._wakeup.clear()
+            try:
+                if hooks_stale(self.config.HookCacheTTLSeconds):
+                    await self._loop.run_in_executor(None, reload_hooks)
+                claimed = await self._process_batch()
+                if claimed:
+                    continue
+                timeout = await self._seconds_until_next_due()
+            except Exception as e:
+                logger.exception(f"Webhook outbox worker failed. System said: {e}")
+                timeout = self.config.WebhookPollSeconds
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _seconds_until_next_due(self) -> float:
+        async with async_db_session_scope() as db:
+            due_in = (await db.execute(NEXT_DUE_SQL)).scalar()
+        if due_in is None:
+            return self.config.WebhookPollSeconds
+        return min(max(float(due_in), 0.05), self.config.WebhookPollSeconds)
+
+    async def _process_batch(self) -> int:
+        async with async_db_session_scope() as db:
+            rows = (await db.execute(CLAIM_SQL, {
+                "lease": float(self.config.WebhookLeaseSeconds),
+                "limit": self.config.WebhookBatchSize,
+            })).all()
+            await db.commit()
+        if not rows:
+            return 0
+
+        # no connection is held while the hooks are called
+        deliveries = self._plan_deliveries(rows)
+        renewal = asyncio.create_task(self._renew_lease([r.id for r in rows]))
+        started = time.perf_counter()
+        try:
+            await asyncio.gather(*(self._deliver(d) for d in deliveries))
+        finally:
+            renewal.cancel()
+        elapsed = time.perf_counter() - started
+
+        async with async_db_session_scope() as db:
+            done_ids = []
+            for delivery in deliveries:
+                if delivery.error is None:
+                    latency = float(delivery.row.age) + elapsed
+                    self.stats["delivered"] += 1
+                    self.stats["latency_total"] += latency
+                    self.stats["latency_max"] = max(self.stats["latency_max"], latency)
+                else:
+                    self.stats["failed"] += 1
+                    await self._schedule_retry(db, delivery)
+                if delivery.row.hook_id is not None and delivery.error is None:
+                    done_ids.append(delivery.row.id)
+
+            # events are fanned out (failures now live in retry rows); retries without an active hook are dropped
+            planned_retries = {d.row.id for d in deliveries if d.row.hook_id is not None}
+            done_ids.extend(r.id for r in rows if r.hook_id is None or r.id not in planned_retries)
+            await db.execute(DELETE_SQL, {"ids": done_ids})
+            await db.commit()
+        return len(rows)
+
+    async def _renew_lease(self, ids: List[int]):
+        while True:
+            await asyncio.sleep(self.config.WebhookLeaseSeconds / 3)
+            try:
+                async with async_db_session_scope() as db:
+                    await db.execute(RENEW_LEASE_SQL, {"ids": ids})
+                    await db.commit()
+            except Exception as e:
+                logger.warning(f"Failed to renew the webhook outbox lease. System said: {e}")
+
+    def _plan_deliveries(self, rows) -> List[_Delivery]:
+        events_by_key: Dict[tuple, int] = defaultdict(int)
+        first_row_by_key = {}
+        retry_rows = []
+        for row in rows:
+            if row.hook_id is None:
+                key = hook_key(row.scope, row.app_id)
+                events_by_key[key] += row.events
+                first_row_by_key.setdefault(key, row)
+            else:
+                retry_rows.append(row)
+
+        deliveries: List[_Delivery] = []
+        for key, events in events_by_key.items():
+            for hook in get_hooks(*key):
+                deliveries.append(_Delivery(hook, first_row_by_key[key], attempts=0, events=events))
+            self.stats["coalesced_events"] += events - 1
+
+        for row in retry_rows:
+            hook = get_hook_by_id(row.hook_id)
+            if hook is not None:
+                deliveries.append(_Delivery(hook, row, attempts=row.attempts, events=row.events))
+
+        return deliveries
+
+    async def _deliver(self, delivery: _Delivery):
+        from access_manager_api.utils.webhooks import post_policy_refresh_webhook
+
+        host = urlsplit(delivery.hook["url"]).netloc
+        limit = self._host_limits.setdefault(host, asyncio.Semaphore(self.config.WebhookPerHostConcurrency))
+        async with limit:
+            try:
+                response = await post_policy_refresh_webhook(self.client, delivery.hook, delivery.events)
+                response.raise_for_status()
+            except Exception as e:
+                delivery.error = f"{type(e).__name__}: {e}"
+                logger.warning(f"Failed to send webhook to {delivery.hook['url']}: {e}")
+
+    async def _schedule_retry(self, db, delivery: _Delivery):
+        attempts = delivery.attempts + 1
+        row = delivery.row
+        if attempts >= self.config.WebhookMaxAttempts:
+            self.stats["dead_lettered"] += 1
+            await db.execute(DEAD_LETTER_SQL, {
+                "hook_id": delivery.hook["id"], "scope": row.scope, "app_id": row.app_id, "url": delivery.hook["url"],
+                "events": delivery.events, "attempts": attempts, "last_error": delivery.error,
+                "created_at": row.created_at,
+            })
+            if row.hook_id is not None:
+                await db.execute(DELETE_SQL, {"ids": [row.id]})
+            return
+
+        self.stats["retries_scheduled"] += 1
+        delay = self._backoff(attempts)
+        if row.hook_id is None:
+            await db.execute(INSERT_RETRY_SQL, {
+                "scope": row.scope, "app_id": row.app_id, "hook_id": delivery.hook["id"], "events": delivery.events,
+                "attempts": attempts, "delay": delay, "last_error": delivery.error, "created_at": row.created_at,
+            })
+        else:
+            await db.execute(RESCHEDULE_SQL, {
+                "id": row.id, "attempts": attempts, "delay": delay, "last_error": delivery.error,
+            })
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.config.WebhookBackoffSeconds * (2 ** (attempts - 1)), self.config.WebhookMaxBackoffSeconds)
+        # jitter spreads the retries of hooks that failed together
+        return delay * random.uniform(0.8, 1.2)
+
+
+def start_webhook_worker() -> Optional[WebhookOutboxWorker]:
+    global _worker
+    if not settings.AccessManager.WebhookWorkerEnabled:
+        return None
+    _worker = WebhookOutboxWorker(settings.AccessManager)
+    _worker.start()
+    return _worker
+
+
+async def stop_webhook_worker():
+    global _worker
+    if _worker is not None:
+        await _worker.stop()
+        _worker = None
+
+
+def get_webhook_worker() -> Optional[WebhookOutboxWorker]:
+    return _worker
+
+
+def wake_webhook_worker():
+    if _worker is not None:
+        _worker.wake()
@@ -1,10 +1,15 @@
 import logging
 
-from access_manager_api.infra.access_guard import get_access_guard_enforcer
-from access_manager_api.infra.app_context import init_access_manager_id
+from access_manager_api.infra.access_guard import init_enforcer_registry, close_enforcer_registry, get_enforcer_registry
+from access_manager_api.infra.app_context import init_access_manager_id, load_hooks_into_memory
 from access_manager_api.infra.config import settings
-from access_manager_api.infra.database import init_db, get_db
+from access_manager_api.infra.database import (
+    init_db, init_async_db, close_async_db, db_session_scope, prewarm_db, prewarm_async_db, get_pool_status
+)
 from access_manager_api.infra.error_handling import ErrorHandlerMiddleware
+from access_manager_api.infra.policy_journal import start_journal_compaction, stop_journal_compaction
+from access_manager_api.infra.policy_notifications import start_policy_changes_listener, stop_policy_changes_listener
+from access_manager_api.infra.webhook_outbox import start_webhook_worker, stop_webhook_worker, get_webhook_worker
 from access_manager_api.routes import router
 from fastapi import FastAPI
 
@@ -31,16 +36,43 @@ async def startup_event():
     # subprocess.run(["alembic", "upgrade", "head"], check=True)
 
     # Initialize database
-    init_db(settings.CoreDB.URI)
+    init_db(settings.CoreDB.URI, settings.CoreDB)
+    init_async_db(settings.CoreDB.URI, settings.CoreDB)
+    prewarm = min(settings.CoreDB.PoolPrewarm, settings.CoreDB.PoolSize)
+    if prewarm > 0:
+        prewarm_db(prewarm)
+        await prewarm_async_db(prewarm)
     logger.info("Database initialized")
 
-    # set access manager app id
-    init_access_manager_id(next(get_db()))
+    # set access manager app id, load the policy refresh hooks
+    with db_session_scope() as db:
+        init_access_manager_id(db)
+        load_hooks_into_memory(db)
 
     # Initialize access guard service
-    get_access_guard_enforcer()
+    app.state.enforcer_registry = init_enforcer_registry()
     logger.info("Permissions service initialized")
 
+    # Apply policy changes committed by other replicas
+    start_policy_changes_listener()
+
+    # Deliver the policy refresh webhooks of the outbox
+    start_webhook_worker()
+
+    # Drop policy journal entries past their retention
+    start_journal_compaction()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    stop_journal_compaction()
+    await stop_webhook_worker()
+    stop_policy_changes_listener()
+    close_enforcer_registry()
+    logger.info("Permissions service closed")
+
+    await close_async_db()
+
 
 @app.get("/status/live", include_in_schema=False)
 def get_status_live():
@@ -50,3 +82,21 @@ def get_status_live():
 @app.get("/status/ready", include_in_schema=False)
 def get_status_ready():
     return {"message": "OK"}
+
+
+@app.get("/status/db-pool", include_in_schema=False)
+def get_status_db_pool():
+    return get_pool_status()
+
+
+@app.get("/status/decision-cache", include_in_schema=False)
+def get_status_decision_cache():
+    return get_enforcer_registry().decisions.stats()
+
+
+@app.get("/status/webhooks", include_in_schema=False)
+async def get_status_webhooks():
+    worker = get_webhook_worker()
+    if worker is None:
+        return {"worker": "disabled"}
+    return {"delivery": worker.delivery_stats(), "backlog": await worker.backlog()}
@@ -12,7 +12,7 @@ class IAMPermission(Base):
     id = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     resource_id = Column(UUID(as_uuid=True), ForeignKey('iam_resources.id', ondelete='CASCADE'), nullable=False)
     action = Column(String(50), nullable=False)
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
 
     # Relationships
     resource = relationship("IAMResource", back_populates="permissions")
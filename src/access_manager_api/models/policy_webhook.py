@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index, Uuid
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 
@@ -10,7 +10,7 @@ class PolicyWebhook(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     scope = Column(String(64), nullable=False)
-    app_id = Column(Integer, nullable=False)
+    app_id = Column(Uuid, nullable=False)
     url = Column(String, nullable=False)
     secret = Column(String, nullable=False)  # Encrypted + Base64 string
     is_active = Column(Boolean, nullable=False, default=True)
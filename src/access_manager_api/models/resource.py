@@ -15,7 +15,7 @@ class IAMResource(Base):
     description = Column(Text, nullable=True)
     synthetic = mapped_column(Boolean, default=False)
     synthetic_data = Column(JSONB, nullable=True)
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
 
     # Relationships
     app = relationship("App", back_populates="resources")
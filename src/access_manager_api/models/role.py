@@ -15,7 +15,7 @@ class IAMRole(Base):
     description = Column(Text, nullable=True)
     synthetic = Column(Boolean, nullable=True)
     synthetic_data = Column(JSONB, nullable=True)
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
 
     # Relationships
     app = relationship("App", back_populates="roles")
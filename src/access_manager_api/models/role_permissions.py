@@ -14,7 +14,7 @@ class IAMRolePermission(Base):
     role_id = Column(UUID(as_uuid=True), ForeignKey('iam_roles.id', ondelete='CASCADE'), nullable=False)
     permission_id = Column(UUID(as_uuid=True), ForeignKey('iam_permissions.id', ondelete='CASCADE'), nullable=False)
     effect = Column(String, nullable=False, default="allow")
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # Relationships
     role = relationship("IAMRole", back_populates="role_permissions")
@@ -15,7 +15,7 @@ class IAMUserPermission(Base):
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     permission_id = Column(UUID(as_uuid=True), ForeignKey('iam_permissions.id', ondelete='CASCADE'), nullable=False)
     effect = Column(String, nullable=False, default="allow")
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # Relationships
     user = relationship("User", back_populates="user_permissions")
@@ -0,0 +1,213 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from access_guard.authz.models.casbin_policy import CasbinPolicy
+
+from access_manager_api.infra.app_context import get_access_manager_app_id
+from access_manager_api.infra.constants import ROLE_AM_ADMIN, ROLE_ORG_ADMIN, ROLE_SUPERADMIN
+from access_manager_api.models import IAMPermission, IAMResource, IAMRole, Scope
+from access_manager_api.providers.synthetic_policies_provider import (
+    APP_ROLE_NAMES,
+    handle_am_admin_role,
+    handle_app_scoped_role,
+    handle_superadmin_role,
+)
+
+
+@dataclass
+class PolicyDelta:
+    """
+    A set of Casbin tuples added/removed by a single mutation of (scope, app_id).
+
+    `synthetic` marks tuples produced by the synthetic policies provider (they live in the
+    SMC enforcer regardless of scope). `requires_reload` is set when the change cannot be
+    expressed as tuples and the affected enforcers must be rebuilt.
+    """
+    scope: str
+    app_id: Optional[str]
+    added: List[CasbinPolicy] = field(default_factory=list)
+    removed: List[CasbinPolicy] = field(default_factory=list)
+    synthetic: bool = False
+    requires_reload: bool = False
+
+    @property
+    def key(self):
+        return self.scope, self.app_id
+
+    def is_empty(self) -> bool:
+        return not self.added and not self.removed and not self.requires_reload
+
+    def to_dict(self, with_tuples: bool = True) -> dict:
+        """JSON-friendly form; without tuples the delta is downgraded to requires_reload."""
+        return {
+            "scope": self.scope,
+            "app_id": self.app_id,
+            "added": [_policy_to_list(p) for p in self.added] if with_tuples else [],
+            "removed": [_policy_to_list(p) for p in self.removed] if with_tuples else [],
+            "synthetic": self.synthetic,
+            "requires_reload": self.requires_reload or (not with_tuples and not self.is_empty()),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PolicyDelta":
+        return cls(
+            scope=data["scope"],
+            app_id=data.get("app_id"),
+            added=[_policy_from_list(p) for p in data.get("added", [])],
+            removed=[_policy_from_list(p) for p in data.get("removed", [])],
+            synthetic=data.get("synthetic", False),
+            requires_reload=data.get("requires_reload", False),
+        )
+
+
+def delta_for(scope, app_id, synthetic: bool = False, requires_reload: bool = False) -> PolicyDelta:
+    return PolicyDelta(
+        scope=_scope_name(scope),
+        app_id=str(app_id) if app_id else None,
+        synthetic=synthetic,
+        requires_reload=requires_reload,
+    )
+
+
+def merge_deltas(deltas: Iterable[PolicyDelta]) -> List[PolicyDelta]:
+    """Fold the deltas of a bulk mutation into one delta per (scope, app_id) and kind."""
+    merged: Dict[tuple, PolicyDelta] = {}
+    for delta in deltas:
+        key = (delta.scope, delta.app_id, delta.synthetic)
+        if key not in merged:
+            merged[key] = delta_for(delta.scope, delta.app_id, synthetic=delta.synthetic)
+        merged[key].added.extend(delta.added)
+        merged[key].removed.extend(delta.removed)
+        merged[key].requires_reload = merged[key].requires_reload or delta.requires_reload
+    return list(merged.values())
+
+
+# === Paths (must match providers/queries/*.sql) ===
+
+def role_subject(role: IAMRole) -> str:
+    return f"{_scope_name(role.scope)}/{role.app_id or ''}/{role.role_name}"
+
+
+def resource_object(resource: IAMResource) -> str:
+    return f"{_scope_name(resource.scope)}/{resource.app_id or ''}/{resource.resource_name}"
+
+
+# === Tuple builders ===
+
+def role_permission_policies(role: IAMRole, permission: IAMPermission, effect: str) -> List[CasbinPolicy]:
+    """
+    p tuple for a role permission, as loaded by filtered_policies.sql: role and resource must
+    both be non-synthetic and belong to the same scope/app.
+    """
+    resource = permission.resource
+    if role.synthetic or resource.synthetic:
+        return []
+    if _scope_name(role.scope) != _scope_name(resource.scope) or role.app_id != resource.app_id:
+        return []
+    return [CasbinPolicy(ptype="p", sub=role_subject(role), obj=resource_object(resource),
+                         act=permission.action, effect=effect or "allow")]
+
+
+def user_permission_policies(email: str, permission: IAMPermission, effect: str) -> List[CasbinPolicy]:
+    resource = permission.resource
+    if resource.synthetic:
+        return []
+    return [CasbinPolicy(ptype="p", sub=email, obj=resource_object(resource),
+                         act=permission.action, effect=effect or "allow")]
+
+
+def user_role_policies(email: str, role: IAMRole) -> List[CasbinPolicy]:
+    if role.synthetic:
+        return []
+    return [CasbinPolicy(ptype="g", sub=email, obj=role_subject(role))]
+
+
+def synthetic_user_role_policies(email: str, role: IAMRole) -> Optional[List[CasbinPolicy]]:
+    """
+    Tuples the synthetic policies provider produces for one user of a synthetic role.
+    Returns None when the role can't be expanded per user (org admin roles depend on org_apps).
+    """
+    policies: List[CasbinPolicy] = []
+    scope = _scope_name(role.scope)
+    synthetic_data = role.synthetic_data or {}
+
+    if scope == Scope.SMC.name and role.role_name == ROLE_ORG_ADMIN:
+        return None
+
+    if scope == Scope.APP.name and role.role_name in APP_ROLE_NAMES:
+        handle_app_scoped_role(
+            policies,
+            role.role_name,
+            role.app_id,
+            synthetic_data.get("resource", None),
+            tuple(synthetic_data.get("actions", [])),
+            [email],
+        )
+    elif scope == Scope.SMC.name and str(role.app_id) == get_access_manager_app_id():
+        if role.role_name == ROLE_AM_ADMIN:
+            handle_am_admin_role(policies, role.role_name, [email])
+        elif role.role_name == ROLE_SUPERADMIN:
+            handle_superadmin_role(policies, role.role_name, [email])
+
+    return policies
+
+
+def user_role_delta(email: str, role: IAMRole, assigned: bool) -> PolicyDelta:
+    if not role.synthetic:
+        delta = delta_for(role.scope, role.app_id)
+        policies = user_role_policies(email, role)
+    else:
+        policies = synthetic_user_role_policies(email, role)
+        delta = delta_for(role.scope, role.app_id, synthetic=True, requires_reload=policies is None)
+        policies = policies or []
+
+    if assigned:
+        delta.added.extend(policies)
+    else:
+        # role-level p tuples may still be used by other members, only drop the assignment
+        delta.removed.extend(p for p in policies if p.ptype == "g")
+    return delta
+
+
+def permission_policies(permission: IAMPermission) -> List[CasbinPolicy]:
+    """All p tuples derived from a permission through its role and user assignments."""
+    policies: List[CasbinPolicy] = []
+    for rp in permission.role_permissions:
+        policies.extend(role_permission_policies(rp.role, permission, rp.effect))
+    for up in permission.user_permissions:
+        policies.extend(user_permission_policies(up.user.email, permission, up.effect))
+    return policies
+
+
+def resource_policies(resource: IAMResource) -> List[CasbinPolicy]:
+    policies: List[CasbinPolicy] = []
+    for permission in resource.permissions:
+        policies.extend(permission_policies(permission))
+    return policies
+
+
+def role_policies(role: IAMRole) -> List[CasbinPolicy]:
+    policies: List[CasbinPolicy] = []
+    for rp in role.role_permissions:
+        if rp.permission:
+            policies.extend(role_permission_policies(role, rp.permission, rp.effect))
+    for ur in role.user_roles:
+        policies.extend(user_role_policies(ur.user.email, role))
+    return policies
+
+
+def _policy_to_list(policy: CasbinPolicy) -> list:
+    return [policy.ptype, policy.sub, policy.obj, getattr(policy, "act", None), getattr(policy, "effect", None)]
+
+
+def _policy_from_list(values: list) -> CasbinPolicy:
+    ptype, sub, obj, act, effect = values
+    if ptype.startswith("g"):
+        return CasbinPolicy(ptype=ptype, sub=sub, obj=obj)
+    return CasbinPolicy(ptype=ptype, sub=sub, obj=obj, act=act, effect=effect)
+
+
+def _scope_name(scope) -> str:
+    if isinstance(scope, Scope):
+        return scope.name
+    return str(scope)
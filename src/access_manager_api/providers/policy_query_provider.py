@@ -10,6 +10,7 @@ QUERY_ALL_POLICIES = load_sql("all_policies")
 QUERY_FILTERED_POLICIES = load_sql("filtered_policies")
 QUERY_USER_POLICIES = load_sql("user_policies")
 QUERY_ROLE_POLICIES = load_sql("role_policies")
+QUERY_USER_ACCESS = load_sql("user_access")
 
 
 class AccessManagementQueryProvider(PolicyQueryProvider):
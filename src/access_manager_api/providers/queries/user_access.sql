@@ -0,0 +1,79 @@
+-- Policies of a single user within (scope, app_id), same tuples as the app enforcer holds for that user.
+-- Every branch starts from the user's rows (uix_user_role / uix_user_permission lead with user_id).
+WITH user_row AS (
+    SELECT u.id, u.email, u.org_id
+    FROM users u
+    WHERE u.id = :user_id
+),
+user_roles AS (
+    SELECT
+        r.id AS role_id,
+        r.scope,
+        r.app_id,
+        r.scope || '/' || COALESCE(r.app_id::text, '') || '/' || r.role_name AS role_path
+    FROM user_row u
+    JOIN iam_user_roles ur ON ur.user_id = u.id
+    JOIN iam_roles r ON ur.role_id = r.id
+    WHERE r.scope = :policy_api_scope AND (:policy_api_appid IS NULL OR r.app_id = :policy_api_appid)
+    AND NOT coalesce(r.synthetic, false)
+),
+role_permissions AS (
+    SELECT DISTINCT
+        'p' AS ptype,
+        ur.role_path AS subject,
+        res.scope || '/' || COALESCE(res.app_id::text, '') || '/' || res.resource_name AS object,
+        perm.action AS action,
+        COALESCE(rp.effect, 'allow') AS effect
+    FROM user_roles ur
+    JOIN iam_role_permissions rp ON rp.role_id = ur.role_id
+    JOIN iam_permissions perm ON rp.permission_id = perm.id
+    JOIN iam_resources res ON perm.resource_id = res.id
+    WHERE res.scope = :policy_api_scope AND (:policy_api_appid IS NULL OR res.app_id = :policy_api_appid)
+    AND NOT coalesce(res.synthetic, false)
+),
+user_permissions AS (
+    SELECT DISTINCT
+        'p' AS ptype,
+        u.email AS subject,
+        res.scope || '/' || COALESCE(res.app_id::text, '') || '/' || res.resource_name AS object,
+        perm.action AS action,
+        COALESCE(up.effect, 'allow') AS effect
+    FROM user_row u
+    JOIN iam_user_permissions up ON up.user_id = u.id
+    JOIN iam_permissions perm ON up.permission_id = perm.id
+    JOIN iam_resources res ON perm.resource_id = res.id
+    WHERE res.scope = :policy_api_scope AND (:policy_api_appid IS NULL OR res.app_id = :policy_api_appid)
+    AND NOT coalesce(res.synthetic, false)
+),
+user_role_mappings AS (
+    SELECT DISTINCT
+        'g' AS ptype,
+        u.email AS subject,
+        ur.role_path AS object,
+        NULL AS action,
+        NULL AS effect
+    FROM user_row u
+    CROSS JOIN user_roles ur
+),
+org_admin_apps AS (
+    -- synthetic org admin role, expanded per linked app (see SyntheticAppPoliciesProvider)
+    SELECT DISTINCT u.email, 'APP/' || oa.app_id::text || '/' || r.role_name AS role_path, oa.app_id
+    FROM user_row u
+    JOIN iam_user_roles ur ON ur.user_id = u.id
+    JOIN iam_roles r ON ur.role_id = r.id
+    JOIN org_apps oa ON oa.org_id = u.org_id
+    WHERE r.synthetic = TRUE
+      AND r.scope = 'SMC'
+      AND r.role_name = :org_admin_role_name
+      AND :policy_api_scope = 'APP'
+      AND oa.app_id = :policy_api_appid
+)
+SELECT ptype, subject, object, action, effect FROM role_permissions
+UNION ALL
+SELECT ptype, subject, object, action, effect FROM user_permissions
+UNION ALL
+SELECT 'p', role_path, 'APP/' || app_id::text || '/*', '*', 'allow' FROM org_admin_apps
+UNION ALL
+SELECT ptype, subject, object, action, effect FROM user_role_mappings
+UNION ALL
+SELECT 'g', email, role_path, NULL, NULL FROM org_admin_apps
@@ -24,9 +24,48 @@ INHERITS: Dict[str, List[str]] = {
         ROLE_IAM_VIEWER
     ]
 }
-# Will be filled by create_role_inheritance_cache
+# Will be filled by load_synthetic_policies
 INHERITED_ROLES_MAP: Dict[str, Dict[str, Any]] = None
 
+# Synthetic roles that are expanded per app (scope APP)
+APP_ROLE_NAMES = (ROLE_IAM_MANAGER, ROLE_POLICY_READER, ROLE_PRODUCT_OWNER)
+# Synthetic roles that are expanded for the Access Manager app itself (scope SMC)
+AM_ROLE_NAMES = (ROLE_AM_ADMIN, ROLE_SUPERADMIN)
+
+
+SYNTHETIC_ROLES_SQL = text("""
+    WITH assignments AS (
+        SELECT r.id, r.scope, r.app_id, r.org_id, r.role_name, r.synthetic_data, u.email::text AS email
+        FROM iam_roles r
+        JOIN iam_user_roles ur ON ur.role_id = r.id
+        JOIN users u ON u.id = ur.user_id
+        WHERE r.synthetic = TRUE
+    )
+    SELECT 'am' AS kind, a.role_name, a.app_id, a.scope, a.org_id, a.synthetic_data,
+           array_agg(DISTINCT a.email) AS emails, NULL::text[] AS linked_app_ids
+    FROM assignments a
+    WHERE a.scope = 'SMC' AND a.app_id = :access_manager_app_id AND a.role_name = ANY(:am_role_names)
+    GROUP BY a.id, a.role_name, a.app_id, a.scope, a.org_id, a.synthetic_data
+    UNION ALL
+    SELECT 'app', a.role_name, a.app_id, a.scope, a.org_id, a.synthetic_data,
+           array_agg(DISTINCT a.email), NULL::text[]
+    FROM assignments a
+    WHERE a.scope = 'APP' AND a.role_name = ANY(:app_role_names)
+    GROUP BY a.id, a.role_name, a.app_id, a.scope, a.org_id, a.synthetic_data
+    UNION ALL
+    SELECT 'org', a.role_name, a.app_id, a.scope, a.org_id, NULL::jsonb,
+           array_agg(DISTINCT a.email), array_agg(DISTINCT oa.app_id::text)
+    FROM assignments a
+    JOIN org_apps oa ON oa.org_id = a.org_id
+    WHERE a.scope = 'SMC' AND a.role_name = :org_admin_role_name
+    GROUP BY a.id, a.role_name, a.app_id, a.scope, a.org_id
+    UNION ALL
+    -- roles inherited by other synthetic roles, whether assigned or not
+    SELECT 'inherited', r.role_name, r.app_id, r.scope, r.org_id, r.synthetic_data, NULL::text[], NULL::text[]
+    FROM iam_roles r
+    WHERE r.synthetic = TRUE AND r.role_name = ANY(:inherited_role_names)
+""")
+
 
 class SyntheticPoliciesProvider(CasbinPolicyProvider):
     def __init__(self, db: Session):
@@ -37,154 +76,84 @@ class SyntheticPoliciesProvider(CasbinPolicyProvider):
 
 
 def load_synthetic_policies(db: Session) -> List[CasbinPolicy]:
-    policies: List[CasbinPolicy] = []
-
-    if not INHERITED_ROLES_MAP:
-        create_role_inheritance_cache(db)
-
-    load_am_synthetic_roles(db, policies)
-    load_app_synthetic_roles(db, policies)
-    load_org_admin_roles(db, policies)
-
-    return policies
-
-
-def create_role_inheritance_cache(db: Session):
+    """
+    Load every synthetic role assignment in one round-trip, already grouped per role,
+    and expand them into policies. The role inheritance cache is refreshed from the same result.
+    """
     global INHERITED_ROLES_MAP
 
-    roles_set = _get_unique_inherited_set()
+    rows = db.execute(
+        SYNTHETIC_ROLES_SQL,
+        {
+            "access_manager_app_id": get_access_manager_app_id(),
+            "am_role_names": list(AM_ROLE_NAMES),
+            "app_role_names": list(APP_ROLE_NAMES),
+            "org_admin_role_name": ROLE_ORG_ADMIN,
+            "inherited_role_names": _get_unique_inherited_set(),
+        },
+    ).fetchall()
+
+    rows_by_kind = defaultdict(list)
+    for row in rows:
+        rows_by_kind[row.kind].append(row)
 
-    inheritance_sql = text("""
-            SELECT role_name, synthetic_data
-            FROM iam_roles
-            WHERE synthetic = TRUE
-              AND role_name = ANY(:role_names)
-        """)
-    inheritance_rows = db.execute(inheritance_sql, {"role_names": roles_set}).fetchall()
     INHERITED_ROLES_MAP = {
-        row.role_name: row.synthetic_data or {} for row in inheritance_rows
+        row.role_name: row.synthetic_data or {} for row in rows_by_kind["inherited"]
     }
 
+    policies: List[CasbinPolicy] = []
+    expand_am_synthetic_roles(policies, rows_by_kind["am"])
+    expand_app_synthetic_roles(policies, rows_by_kind["app"])
+    expand_org_admin_roles(policies, rows_by_kind["org"])
 
-def load_app_synthetic_roles(db: Session, policies: List[CasbinPolicy]):
-    APP_ROLE_HANDLERS: Dict[str, Callable] = {
-        ROLE_IAM_MANAGER: handle_app_scoped_role,
-        ROLE_POLICY_READER: handle_app_scoped_role,
-        ROLE_PRODUCT_OWNER: handle_app_scoped_role,
-    }
+    return policies
 
-    sql = """
-    SELECT r.id, r.app_id, r.role_name, r.synthetic_data, ur.user_id, u.email
-    FROM iam_roles r
-    JOIN iam_user_roles ur ON ur.role_id = r.id
-    JOIN users u ON u.id = ur.user_id
-    WHERE r.synthetic = TRUE
-      AND r.scope = 'APP'
-      AND r.role_name IN :role_names
-    """
-    rows = db.execute(text(sql), {"role_names": tuple(APP_ROLE_HANDLERS.keys())}).fetchall()
 
-    grouped = defaultdict(list)
+def expand_app_synthetic_roles(policies: List[CasbinPolicy], rows):
+    APP_ROLE_HANDLERS: Dict[str, Callable] = {role_name: handle_app_scoped_role for role_name in APP_ROLE_NAMES}
+
     for row in rows:
-        role_name = row.role_name
-        app_id = row.app_id
-        synthetic_resource = row.synthetic_data.get("resource", None)
-        synthetic_actions = tuple(row.synthetic_data.get("actions", []))
-        user_email = row.email
-        grouped_key = (role_name, app_id, synthetic_resource, synthetic_actions)
-        grouped[grouped_key].append(user_email)
-
-    for (role_name, app_id, synthetic_resource, synthetic_actions), user_ids in grouped.items():
-        handler = APP_ROLE_HANDLERS.get(role_name)
+        handler = APP_ROLE_HANDLERS.get(row.role_name)
         if handler:
+            synthetic_data = row.synthetic_data or {}
             handler(
                 policies,
-                role_name,
-                app_id,
-                synthetic_resource,
-                synthetic_actions,
-                user_ids,
+                row.role_name,
+                row.app_id,
+                synthetic_data.get("resource", None),
+                tuple(synthetic_data.get("actions", [])),
+                list(row.emails),
             )
 
 
-def load_am_synthetic_roles(
-        db: Session, policies: List[CasbinPolicy]
-):
+def expand_am_synthetic_roles(policies: List[CasbinPolicy], rows):
     AM_ROLE_HANDLERS: Dict[str, Callable] = {
         ROLE_AM_ADMIN: handle_am_admin_role,
         ROLE_SUPERADMIN: handle_superadmin_role,
     }
 
-    sql = """
-    SELECT r.id, r.app_id, r.role_name, r.synthetic_data, ur.user_id, u.email
-    FROM iam_roles r
-    JOIN iam_user_roles ur ON ur.role_id = r.id
-    JOIN users u ON u.id = ur.user_id
-    WHERE r.synthetic = TRUE
-      AND r.scope = 'SMC'
-      AND r.app_id = :access_manager_app_id
-      AND r.role_name IN :role_names
-    """
-    rows = db.execute(
-        text(sql),
-        {
-            "role_names": tuple(AM_ROLE_HANDLERS.keys()),
-            "access_manager_app_id": get_access_manager_app_id(),
-        },
-    ).fetchall()
-
-    grouped = defaultdict(list)
     for row in rows:
-        role_name = row.role_name
-        app_id = row.app_id
-        synthetic_resource = row.synthetic_data.get("resource", None)
-        synthetic_actions = tuple(row.synthetic_data.get("actions", []))
-        user_email = row.email
-        grouped_key = (role_name, app_id, synthetic_resource, synthetic_actions)
-        grouped[grouped_key].append(user_email)
-
-    for (role_name, app_id, synthetic_resource, synthetic_actions), user_ids in grouped.items():
-        handler = AM_ROLE_HANDLERS.get(role_name)
+        handler = AM_ROLE_HANDLERS.get(row.role_name)
         if handler:
             handler(
                 policies,
-                role_name,
-                user_ids
+                row.role_name,
+                list(row.emails)
             )
 
 
-def load_org_admin_roles(db: Session, policies: List[CasbinPolicy]):
-    sql = text("""
-        SELECT r.role_name, r.app_id, r.scope, u.email, r.org_id, oa.app_id AS linked_app_id
-        FROM iam_roles r
-        JOIN iam_user_roles ur ON ur.role_id = r.id
-        JOIN users u ON u.id = ur.user_id
-        JOIN org_apps oa ON r.org_id = oa.org_id
-        WHERE r.synthetic = TRUE
-          AND r.scope = 'SMC'
-          AND r.role_name = :role_name
-    """)
-    rows = db.execute(sql, {"role_name": ROLE_ORG_ADMIN}).fetchall()
-
-    grouped = defaultdict(lambda: {"user_ids": set(), "app_ids": set()})
+def expand_org_admin_roles(policies: List[CasbinPolicy], rows):
     for row in rows:
-        key = (row.role_name, row.app_id, row.scope, row.org_id)
-        grouped[key]["user_ids"].add(row.email)
-        grouped[key]["app_ids"].add(row.linked_app_id)
-
-    for (role_name, app_id, scope, org_id), data in grouped.items():
         handle_org_admin_role(
             policies=policies,
-            role_name=role_name,
-            app_id=app_id,
-            scope=scope,
-            org_id=org_id,
-            user_ids=list(data["user_ids"]),
-            linked_app_ids=list(data["app_ids"]),
+            role_name=row.role_name,
+            app_id=row.app_id,
+            scope=row.scope,
+            org_id=row.org_id,
+            user_ids=list(row.emails),
+            linked_app_ids=list(row.linked_app_ids),
         )
 
-    return policies
-
 
 # === Role Handlers ===
 
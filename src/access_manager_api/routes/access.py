@@ -1,12 +1,14 @@
 import logging
 
+from typing import List
+
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
 from access_manager_api.infra.error_handling import UnknownException
-from access_manager_api.schemas import UserAccess
-from access_manager_api.services import get_user_access
-from access_manager_api.infra.access_guard import get_access_guard_enforcer
+from access_manager_api.schemas import UserAccess, UserAccessBatchRequest
+from access_manager_api.services import get_user_access, get_users_access
+from access_manager_api.infra.access_guard import get_enforcer_registry
 from access_manager_api.infra.database import get_db
 
 logger = logging.getLogger(__name__)
@@ -26,13 +28,24 @@ def get_user_access_info(
         raise UnknownException(str(e))
 
 
+@router.post("/user-access/batch", response_model=List[UserAccess])
+def get_users_access_info(
+        request: UserAccessBatchRequest,
+        db: Session = Depends(get_db)
+):
+    try:
+        return get_users_access(db, request.user_ids, request.scope, request.app_id)
+    except Exception as e:
+        raise UnknownException(str(e))
+
+
 @router.post("/refresh")
-async def refresh_policies(
-        access_guard_enforcer=Depends(get_access_guard_enforcer)
+def refresh_policies(
+        enforcer_registry=Depends(get_enforcer_registry)
 ):
     """
     Refresh the in-memory policies from the database.
     Use this endpoint when policies have been updated and need to be reloaded.
     """
-    access_guard_enforcer.refresh_policies()
+    enforcer_registry.refresh()
     return {"message": "Policies refreshed successfully"}
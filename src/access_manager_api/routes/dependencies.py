@@ -2,22 +2,31 @@ from typing import Optional, Tuple
 from uuid import UUID
 
 from fastapi import Header, HTTPException, Depends, Request
-from sqlalchemy.orm import Session
 
 from access_manager_api.infra.app_context import get_access_manager_app_id
 from access_manager_api.models import User as UserModel, Scope
-from access_manager_api.infra.database import get_db
+from access_manager_api.infra.database import db_session_scope
+from access_manager_api.infra.user_cache import CachedUser, get_user_cache
 
 
-def get_user(request: Request, db: Session = Depends(get_db)) -> UserModel:
+def get_user(request: Request) -> CachedUser:
     try:
         user_id = UUID(request.headers["user_id"])
     except (KeyError, ValueError):
         raise HTTPException(status_code=400, detail="Invalid or missing user_id header")
 
-    user = db.query(UserModel).filter(UserModel.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail=f"User with id {user_id} not found")
+    # only a cache miss takes a connection from the pool
+    cache = get_user_cache()
+    user = cache.get(user_id)
+    if user is not None:
+        return user
+
+    with db_session_scope() as db:
+        row = db.query(UserModel).filter(UserModel.id == user_id).first()
+        if not row:
+            raise HTTPException(status_code=404, detail=f"User with id {user_id} not found")
+        user = CachedUser.from_model(row)
+    cache.put(user)
     return user
 
 
@@ -2,7 +2,7 @@ from typing import List
 
 from access_guard.authz.exceptions import PermissionDeniedError
 from access_guard.authz.models.entities import User
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.orm import Session
 
 from access_manager_api.infra.access_guard import get_access_guard_enforcer
@@ -11,7 +11,7 @@ from access_manager_api.infra.error_handling import (
     NotFoundException,
     UnauthorizedException,
 )
-from access_manager_api.models import User as UserModel
+from access_manager_api.infra.user_cache import CachedUser
 from access_manager_api.routes.dependencies import get_user
 from access_manager_api.schemas.permission import (
     IAMPermission,
@@ -20,16 +20,16 @@ from access_manager_api.schemas.permission import (
 )
 from access_manager_api.services import IAMResourceService
 from access_manager_api.services.permission import IAMPermissionService
+from access_manager_api.utils.pagination import PageParams, get_page_params, set_next_cursor
 from access_manager_api.utils.utils import build_resource_path
-from access_manager_api.utils.webhooks import send_policy_refresh_webhook
 
 router = APIRouter(prefix="/iam/permissions", tags=["iam-permissions"])
 
 
 @router.post("/", response_model=IAMPermission)
-async def create_permission(
+def create_permission(
         permission: IAMPermissionCreate,
-        user: UserModel = Depends(get_user),
+        user: CachedUser = Depends(get_user),
         access_guard_service=Depends(get_access_guard_enforcer),
         db: Session = Depends(get_db),
 ):
@@ -37,7 +37,7 @@ async def create_permission(
 
     # Step 1: Load the resource
     resource_service = IAMResourceService(db)
-    resource = await resource_service.get_resource_by_id(permission.resource_id)
+    resource = resource_service.get_resource_by_id(permission.resource_id)
     if not resource:
         raise NotFoundException(f"IAM resource with id {permission.resource_id} not found")
 
@@ -49,16 +49,16 @@ async def create_permission(
         raise UnauthorizedException(str(e))
 
     # Step 3: Create permission
-    permission_service = IAMPermissionService(db, send_policy_refresh_webhook)
-    db_permission = await permission_service.create_permission(permission)
+    permission_service = IAMPermissionService(db)
+    db_permission = permission_service.create_permission(permission)
     return IAMPermission.from_orm(db_permission)
 
 
 @router.get("/{permission_id}", response_model=IAMPermission)
-async def read_permission_by_id(
+def read_permission_by_id(
         permission_id: str,
         db: Session = Depends(get_db),
-        user: UserModel = Depends(get_user),
+        user: CachedUser = Depends(get_user),
         access_guard_service=Depends(get_access_guard_enforcer),
 ):
     permission_service = IAMPermissionService(db)
@@ -76,14 +76,16 @@ async def read_permission_by_id(
 
 
 @router.get("/resource/{resource_id}", response_model=List[IAMPermission])
-async def read_permissions_by_resource(
+def read_permissions_by_resource(
         resource_id: str,
+        response: Response,
+        page: PageParams = Depends(get_page_params),
         db: Session = Depends(get_db),
-        user: UserModel = Depends(get_user),
+        user: CachedUser = Depends(get_user),
         access_guard_service=Depends(get_access_guard_enforcer),
 ):
     resource_service = IAMResourceService(db)
-    resource = await resource_service.get_resource_by_id(resource_id)
+    resource = resource_service.get_resource_by_id(resource_id)
     if not resource:
         raise NotFoundException(f"Resource with id {resource_id} not found")
 
@@ -94,18 +96,20 @@ async def read_permissions_by_resource(
         raise UnauthorizedException(str(e))
 
     permission_service = IAMPermissionService(db)
-    return [IAMPermission.from_orm(p) for p in permission_service.get_permissions_by_resource(resource_id)]
+    permissions = permission_service.get_permissions_by_resource(resource_id, page)
+    set_next_cursor(response, permissions)
+    return [IAMPermission.from_orm(p) for p in permissions]
 
 
 @router.put("/{permission_id}", response_model=IAMPermission)
-async def update_permission(
+def update_permission(
         permission_id: str,
         permission_data: IAMPermissionUpdate,
-        user: UserModel = Depends(get_user),
+        user: CachedUser = Depends(get_user),
         access_guard_service=Depends(get_access_guard_enforcer),
         db: Session = Depends(get_db),
 ):
-    permission_service = IAMPermissionService(db, send_policy_refresh_webhook)
+    permission_service = IAMPermissionService(db)
     db_permission = permission_service.get_permission_by_id(permission_id)
 
     if not db_permission:
@@ -117,17 +121,17 @@ async def update_permission(
     except PermissionDeniedError as e:
         raise UnauthorizedException(str(e))
 
-    return await permission_service.update_permission(db_permission, permission_data)
+    return permission_service.update_permission(db_permission, permission_data)
 
 
 @router.delete("/{permission_id}", status_code=204)
-async def delete_permission(
+def delete_permission(
         permission_id: str,
-        user: UserModel = Depends(get_user),
+        user: CachedUser = Depends(get_user),
         access_guard_service=Depends(get_access_guard_enforcer),
         db: Session = Depends(get_db),
 ):
-    permission_service = IAMPermissionService(db, send_policy_refresh_webhook)
+    permission_service = IAMPermissionService(db)
     db_permission = permission_service.get_permission_by_id(permission_id)
     if not db_permission:
         raise NotFoundException(f"IAM permission with id {permission_id} not found")
@@ -138,4 +142,4 @@ async def delete_permission(
     except PermissionDeniedError as e:
         raise UnauthorizedException(str(e))
 
-    await permission_service.delete_permission(db_permission)
+    permission_service.delete_permission(db_permission)
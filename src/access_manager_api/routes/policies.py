@@ -1,21 +1,33 @@
 import logging
-from typing import Tuple
+from typing import Optional, Tuple
 
 import jwt
 from access_guard.authz.exceptions import PermissionDeniedError
 from access_guard.authz.models.entities import User
-from fastapi import APIRouter, Depends, HTTPException, Header
-from fastapi import Request
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from fastapi import Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 
 from access_manager_api.infra.access_guard import get_access_guard_enforcer
 from access_manager_api.infra.config import settings
-from access_manager_api.models import User as UserModel
+from access_manager_api.infra.error_handling import InvalidFormatException
+from access_manager_api.infra.policy_generations import build_policy_version, etag_matches, parse_policy_version
+from access_manager_api.infra.user_cache import CachedUser
 from access_manager_api.routes.dependencies import get_request_headers, get_user
 from access_manager_api.schemas.policies import PoliciesParams
 from access_manager_api.services.policies import get_policies_service
+from access_manager_api.utils.content_negotiation import negotiate_media_type
+from access_manager_api.utils.policy_codec import MSGPACK_MEDIA_TYPE, MSGPACK_MEDIA_TYPES
 from access_manager_api.utils.utils import build_resource_path
 
 router = APIRouter(prefix="/iam")
+JSON_MEDIA_TYPE = "application/json"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# JSON comes first: it wins ties, e.g. */*, and is served when nothing offered is acceptable
+POLICIES_MEDIA_TYPES = (JSON_MEDIA_TYPE, *MSGPACK_MEDIA_TYPES, NDJSON_MEDIA_TYPE)
+NDJSON_REPRESENTATION = "ndjson"
+MSGPACK_REPRESENTATION = "msgpack"
 logger = logging.getLogger(__name__)
 
 
@@ -45,10 +57,13 @@ async def validate_jwt(authorization: str = Header(...)) -> dict:
 async def get_policies(
         # jwt_claims: dict = Depends(validate_jwt),
         request: Request,
+        response: Response,
         headers: Tuple[str, str, str] = Depends(get_request_headers),
+        if_none_match: str = Header(None, alias="If-None-Match"),
+        since: Optional[str] = Query(None, description="Policy version the client holds; only later changes are returned"),
         access_guard_service=Depends(get_access_guard_enforcer),
         policies_service=Depends(get_policies_service),
-        user: UserModel = Depends(get_user)
+        user: CachedUser = Depends(get_user)
 ):
     # Extract claims
     # user_id = jwt_claims["sub"]
@@ -73,6 +88,54 @@ async def get_policies(
         app_id=app_id
     )
 
+    # Every representation has its own validator, so a 304 never revalidates another one
+    representation = _policies_representation(request.headers.get("accept"), since)
+    response_headers = {"Vary": "Accept"}
+
+    # Unchanged since the client's last poll: no enforcer, no policy queries.
+    # The policies service is synchronous (generation lookups, enforcer builds), it runs off the event loop.
+    response_headers["ETag"] = await run_in_threadpool(
+        policies_service.get_etag, params.scope, params.app_id, representation
+    )
+    if etag_matches(if_none_match, response_headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=response_headers)
+
+    # Incremental sync: tuples added/removed after the client's version, or a snapshot
+    if since is not None:
+        changes = await run_in_threadpool(policies_service.get_policy_changes, params, since)
+        response.headers.update(response_headers)
+        return changes
+
+    # Opt-in compact binary format for SDKs, with a string table instead of repeated paths
+    if representation == MSGPACK_REPRESENTATION:
+        packed = await run_in_threadpool(policies_service.pack_policies, params)
+        return Response(content=packed, media_type=MSGPACK_MEDIA_TYPE, headers=response_headers)
+
+    # Opt-in streaming: one JSON policy per line, the resource prefix travels in a header
+    if representation == NDJSON_REPRESENTATION:
+        lines, resource_prefix = await run_in_threadpool(policies_service.stream_policies, params)
+        return StreamingResponse(
+            lines,
+            media_type=NDJSON_MEDIA_TYPE,
+            headers={**response_headers, "X-Resource-Prefix": resource_prefix}
+        )
+
     # If access granted, fetch policies
-    policies = policies_service.get_policies(params)
+    policies = await run_in_threadpool(policies_service.get_policies, params)
+    response.headers.update(response_headers)
     return policies
+
+
+def _policies_representation(accept: Optional[str], since: Optional[str]) -> Optional[str]:
+    """ETag suffix of the representation a request selects, None for the JSON document."""
+    if since is not None:
+        since_version = parse_policy_version(since)
+        if since_version is None:
+            raise InvalidFormatException(f"Invalid policy version '{since}'")
+        return f"since-{build_policy_version(since_version)}"
+    media_type = negotiate_media_type(accept, POLICIES_MEDIA_TYPES)
+    if media_type in MSGPACK_MEDIA_TYPES:
+        return MSGPACK_REPRESENTATION
+    if media_type == NDJSON_MEDIA_TYPE:
+        return NDJSON_REPRESENTATION
+    return None
@@ -2,19 +2,21 @@ from typing import List, Tuple
 
 from access_guard.authz.exceptions import PermissionDeniedError
 from access_guard.authz.models.entities import User
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from access_manager_api.infra.error_handling import UnauthorizedException, NotFoundException
-from access_manager_api.models import User as UserModel
+from access_manager_api.infra.user_cache import CachedUser
 from access_manager_api.routes.dependencies import get_user, get_request_headers
 from access_manager_api.schemas import IAMResource, IAMResourceCreate
 from access_manager_api.schemas.resource import IAMResourceUpdate
 from access_manager_api.infra.access_guard import get_access_guard_enforcer
-from access_manager_api.infra.database import get_db
-from access_manager_api.services.resource import IAMResourceService
+from access_manager_api.infra.database import db_session_scope, get_async_db, get_db
+from access_manager_api.services.resource import AsyncIAMResourceService, IAMResourceService
+from access_manager_api.utils.pagination import PageParams, get_page_params, set_next_cursor
 from access_manager_api.utils.utils import build_resource_path
-from access_manager_api.utils.webhooks import send_policy_refresh_webhook
 
 router = APIRouter(prefix="/iam/resources", tags=["iam-resources"])
 
@@ -22,9 +24,9 @@ router = APIRouter(prefix="/iam/resources", tags=["iam-resources"])
 @router.post("/", response_model=IAMResource)
 async def create_resource(
         resource: IAMResourceCreate,
-        user: UserModel = Depends(get_user),
+        user: CachedUser = Depends(get_user),
         access_guard_service=Depends(get_access_guard_enforcer),
-        db: Session = Depends(get_db)
+        async_db: AsyncSession = Depends(get_async_db)
 ):
     try:
         resource_path = build_resource_path("iam", resource.app_id)
@@ -32,25 +34,30 @@ async def create_resource(
     except PermissionDeniedError as e:
         raise UnauthorizedException(str(e))
 
-    resource_service = IAMResourceService(db, policy_refresh_hook=send_policy_refresh_webhook)
-
     if resource.actions:
-        db_resource = await resource_service.create_or_get_resource_with_actions(resource)
-    else:
-        db_resource = await resource_service.create_resource(resource)
+        # the resource/permission upsert is on the sync services, keep it off the event loop
+        return await run_in_threadpool(_create_resource_with_actions, resource)
 
+    resource_service = AsyncIAMResourceService(async_db)
+    db_resource = await resource_service.create_resource(resource)
     return IAMResource.from_orm(db_resource)
 
 
+def _create_resource_with_actions(resource: IAMResourceCreate) -> IAMResource:
+    with db_session_scope() as db:
+        db_resource = IAMResourceService(db).create_or_get_resource_with_actions(resource)
+        return IAMResource.from_orm(db_resource)
+
+
 @router.get("/{resource_id}", response_model=IAMResource)
-async def read_resource_by_id(
+def read_resource_by_id(
         resource_id: str,
-        user: UserModel = Depends(get_user),
+        user: CachedUser = Depends(get_user),
         access_guard_service=Depends(get_access_guard_enforcer),
         db: Session = Depends(get_db)
 ):
     resource_service = IAMResourceService(db)
-    resource = await resource_service.get_resource_by_id(resource_id)
+    resource = resource_service.get_resource_by_id(resource_id)
     if not resource:
         raise NotFoundException(f"IAM resource with id {resource_id} not found")
 
@@ -64,9 +71,11 @@ async def read_resource_by_id(
 
 
 @router.get("/", response_model=List[IAMResource])
-async def read_resources_by_scope_app(
+def read_resources_by_scope_app(
+        response: Response,
         headers: Tuple[str, int, str] = Depends(get_request_headers),
-        user: UserModel = Depends(get_user),
+        page: PageParams = Depends(get_page_params),
+        user: CachedUser = Depends(get_user),
         access_guard_service=Depends(get_access_guard_enforcer),
         db: Session = Depends(get_db)
 ):
@@ -78,20 +87,21 @@ async def read_resources_by_scope_app(
         raise UnauthorizedException(str(e))
 
     resource_service = IAMResourceService(db)
-    resources = await resource_service.get_resources_by_scope_app(scope, app_id)
+    resources = resource_service.get_resources_by_scope_app(scope, app_id, page)
+    set_next_cursor(response, resources)
     return [IAMResource.from_orm(resource) for resource in resources]
 
 
 @router.put("/{resource_id}", response_model=IAMResource)
-async def update_resource(
+def update_resource(
         resource_id: str,
         resource_data: IAMResourceUpdate,
-        user: UserModel = Depends(get_user),
+        user: CachedUser = Depends(get_user),
         access_guard_service=Depends(get_access_guard_enforcer),
         db: Session = Depends(get_db)
 ):
-    resource_service = IAMResourceService(db, policy_refresh_hook=send_policy_refresh_webhook)
-    existing = await resource_service.get_resource_by_id(resource_id)
+    resource_service = IAMResourceService(db)
+    existing = resource_service.get_resource_by_id(resource_id)
     if not existing:
         raise NotFoundException(f"IAM resource with id {resource_id} not found")
 
@@ -102,18 +112,18 @@ async def update_resource(
     except PermissionDeniedError as e:
         raise UnauthorizedException(str(e))
 
-    return await resource_service.update_resource(existing, resource_data)
+    return resource_service.update_resource(existing, resource_data)
 
 
 @router.delete("/{resource_id}", status_code=204)
-async def delete_resource(
+def delete_resource(
         resource_id: str,
-        user: UserModel = Depends(get_user),
+        user: CachedUser = Depends(get_user),
         access_guard_service=Depends(get_access_guard_enforcer),
         db: Session = Depends(get_db)
 ):
-    resource_service = IAMResourceService(db, policy_refresh_hook=send_policy_refresh_webhook)
-    existing = await resource_service.get_resource_by_id(resource_id)
+    resource_service = IAMResourceService(db)
+    existing = resource_service.get_resource_by_id(resource_id)
     if not existing:
         raise NotFoundException(f"IAM resource with id {resource_id} not found")
 
@@ -123,4 +133,4 @@ async def delete_resource(
     except PermissionDeniedError as e:
         raise UnauthorizedException(str(e))
 
-    await resource_service.delete_resource(existing)
+    resource_service.delete_resource(existing)
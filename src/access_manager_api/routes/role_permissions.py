@@ -2,26 +2,27 @@ from typing import List
 
 from access_guard.authz.exceptions import PermissionDeniedError
 from access_guard.authz.models.entities import User
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.orm import Session, joinedload
 
 from access_manager_api.infra.error_handling import UnauthorizedException, NotFoundException, ValidationException
-from access_manager_api.models import User as UserModel, IAMRole, IAMPermission
+from access_manager_api.models import IAMRole, IAMPermission
+from access_manager_api.infra.user_cache import CachedUser
 from access_manager_api.routes.dependencies import get_user
 from access_manager_api.schemas.role_permissions import IAMRolePermission, IAMRolePermissionCreate
 from access_manager_api.infra.access_guard import get_access_guard_enforcer
 from access_manager_api.infra.database import get_db
 from access_manager_api.services.role_permissions import IAMRolePermissionsService
+from access_manager_api.utils.pagination import PageParams, get_page_params, set_next_cursor
 from access_manager_api.utils.utils import build_resource_path
-from access_manager_api.utils.webhooks import send_policy_refresh_webhook
 
 router = APIRouter(prefix="/iam/role-permissions", tags=["iam-role-permissions"])
 
 
 @router.post("/", response_model=IAMRolePermission)
-async def create_role_permission(
+def create_role_permission(
         payload: IAMRolePermissionCreate,
-        user: UserModel = Depends(get_user),
+        user: CachedUser = Depends(get_user),
         access_guard_service=Depends(get_access_guard_enforcer),
         db: Session = Depends(get_db),
 ):
@@ -54,8 +55,8 @@ async def create_role_permission(
         raise UnauthorizedException(str(e))
 
     # Step 5: Proceed with creation
-    service = IAMRolePermissionsService(db, policy_refresh_hook=send_policy_refresh_webhook)
-    db_obj = await service.create_role_permission(payload)
+    service = IAMRolePermissionsService(db)
+    db_obj = service.create_role_permission(payload)
     return IAMRolePermission.from_orm(db_obj)
 
 
@@ -63,7 +64,7 @@ async def create_role_permission(
 def read_role_permission(
         rp_id: str,
         db: Session = Depends(get_db),
-        user: UserModel = Depends(get_user),
+        user: CachedUser = Depends(get_user),
         access_guard_service=Depends(get_access_guard_enforcer),
 ):
     service = IAMRolePermissionsService(db)
@@ -87,8 +88,10 @@ def read_role_permission(
 @router.get("/role/{role_id}", response_model=List[IAMRolePermission])
 def read_role_permissions_by_role(
         role_id: str,
+        response: Response,
+        page: PageParams = Depends(get_page_params),
         db: Session = Depends(get_db),
-        user: UserModel = Depends(get_user),
+        user: CachedUser = Depends(get_user),
         access_guard_service=Depends(get_access_guard_enforcer),
 ):
     from access_manager_api.services.role import IAMRoleService
@@ -104,17 +107,19 @@ def read_role_permissions_by_role(
         raise UnauthorizedException(str(e))
 
     service = IAMRolePermissionsService(db)
-    return [IAMRolePermission.from_orm(rp) for rp in service.get_role_permissions_by_role_id(role_id)]
+    role_permissions = service.get_role_permissions_by_role_id(role_id, page)
+    set_next_cursor(response, role_permissions)
+    return [IAMRolePermission.from_orm(rp) for rp in role_permissions]
 
 
 @router.delete("/{rp_id}", status_code=204)
-async def delete_role_permission(
+def delete_role_permission(
         rp_id: str,
-        user: UserModel = Depends(get_user),
+        user: CachedUser = Depends(get_user),
         access_guard_service=Depends(get_access_guard_enforcer),
         db: Session = Depends(get_db),
 ):
-    service = IAMRolePermissionsService(db, policy_refresh_hook=send_policy_refresh_webhook)
+    service = IAMRolePermissionsService(db)
     db_obj = service.get_role_permission_by_id(rp_id)
     if not db_obj:
         raise NotFoundException(f"IAM role permission with id {rp_id} not found")
@@ -129,4 +134,4 @@ async def delete_role_permission(
     except PermissionDeniedError as e:
         raise UnauthorizedException(str(e))
 
-    await service.delete_role_permission(db_obj)
+    service.delete_role_permission(db_obj)
@@ -3,26 +3,36 @@ from typing import Dict, List
 
 from access_guard.authz.exceptions import PermissionDeniedError
 from access_guard.authz.models.entities import User
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 
 from access_manager_api.infra.error_handling import UnauthorizedException, NotFoundException
-from access_manager_api.models import IAMPermission, IAMUserPermission, User as UserModel
+from access_manager_api.models import IAMPermission, IAMUserPermission
+from access_manager_api.infra.user_cache import CachedUser
 from access_manager_api.routes.dependencies import get_user
-from access_manager_api.schemas.user_permissions import IAMUserPermission, IAMUserPermissionCreate
+from access_manager_api.schemas.common import BulkItemStatus
+from access_manager_api.schemas.user_permissions import (
+    IAMUserPermission,
+    IAMUserPermissionBulkCreate,
+    IAMUserPermissionBulkDelete,
+    IAMUserPermissionBulkItemResult,
+    IAMUserPermissionBulkResult,
+    IAMUserPermissionCreate,
+)
 from access_manager_api.infra.access_guard import get_access_guard_enforcer
-from access_manager_api.infra.database import get_db
-from access_manager_api.services.user_permissions import IAMUserPermissionsService
+from access_manager_api.infra.database import get_async_db, get_db
+from access_manager_api.services.user_permissions import AsyncIAMUserPermissionsService, IAMUserPermissionsService
+from access_manager_api.utils.pagination import PageParams, get_page_params, set_next_cursor
 from access_manager_api.utils.utils import build_resource_path
-from access_manager_api.utils.webhooks import send_policy_refresh_webhook
 
 router = APIRouter(prefix="/iam/user-permissions", tags=["iam-user-permissions"])
 
 
 @router.post("/", response_model=IAMUserPermission)
-async def create_user_permission(
+def create_user_permission(
         payload: IAMUserPermissionCreate,
-        user: UserModel = Depends(get_user),
+        user: CachedUser = Depends(get_user),
         access_guard_service=Depends(get_access_guard_enforcer),
         db: Session = Depends(get_db),
 ):
@@ -45,15 +55,88 @@ async def create_user_permission(
     except PermissionDeniedError as e:
         raise UnauthorizedException(str(e))
 
-    service = IAMUserPermissionsService(db, policy_refresh_hook=send_policy_refresh_webhook)
-    db_obj = await service.create_user_permission(payload)
+    service = IAMUserPermissionsService(db)
+    db_obj = service.create_user_permission(payload)
     return IAMUserPermission.from_orm(db_obj)
 
 
+@router.post("/bulk", response_model=IAMUserPermissionBulkResult)
+async def create_user_permissions_bulk(
+        payload: IAMUserPermissionBulkCreate,
+        user: CachedUser = Depends(get_user),
+        access_guard_service=Depends(get_access_guard_enforcer),
+        async_db: AsyncSession = Depends(get_async_db),
+):
+    service = AsyncIAMUserPermissionsService(async_db)
+    permissions, denied = await _split_writable_permissions(payload.items, user, access_guard_service, service)
+
+    allowed = [item for item in payload.items if item.permission_id in permissions]
+    statuses = await service.create_user_permissions_bulk(allowed, permissions)
+    return _bulk_result(payload.items, statuses, denied)
+
+
+@router.delete("/bulk", response_model=IAMUserPermissionBulkResult)
+async def delete_user_permissions_bulk(
+        payload: IAMUserPermissionBulkDelete,
+        user: CachedUser = Depends(get_user),
+        access_guard_service=Depends(get_access_guard_enforcer),
+        async_db: AsyncSession = Depends(get_async_db),
+):
+    service = AsyncIAMUserPermissionsService(async_db)
+    permissions, denied = await _split_writable_permissions(payload.items, user, access_guard_service, service)
+
+    keys = [(item.user_id, item.permission_id) for item in payload.items if item.permission_id in permissions]
+    statuses = await service.delete_user_permissions_bulk(keys, permissions)
+    return _bulk_result(payload.items, statuses, denied)
+
+
+async def _split_writable_permissions(items, user: CachedUser, access_guard_service,
+                                      service: AsyncIAMUserPermissionsService):
+    """
+    Resolve the permissions of the items with their resources in one query and check write
+    access once per distinct app. Returns the writable permissions and the ids of denied ones,
+    which are reported per item (unlike the user-roles bulk routes, whose count-only result
+    makes them all-or-nothing).
+    """
+    permissions = await service.get_permissions_with_resources({item.permission_id for item in items})
+
+    app_ids = list({p.resource.app_id for p in permissions.values()})
+    allowed = access_guard_service.batch_check(
+        [(user.email, build_resource_path("iam", app_id), "write") for app_id in app_ids]
+    )
+    writable = dict(zip(app_ids, allowed))
+
+    denied = {pid for pid, p in permissions.items() if not writable[p.resource.app_id]}
+    return {pid: p for pid, p in permissions.items() if pid not in denied}, denied
+
+
+def _bulk_result(items, statuses, denied) -> IAMUserPermissionBulkResult:
+    results = []
+    seen = set()
+    for item in items:
+        key = (item.user_id, item.permission_id)
+        if item.permission_id in denied:
+            status, detail = BulkItemStatus.FORBIDDEN, f"No write access to the app of permission {item.permission_id}"
+        elif key in seen:
+            status, detail = BulkItemStatus.CONFLICT, "Duplicate item in request"
+        else:
+            status = statuses.get(key, BulkItemStatus.NOT_FOUND)
+            detail = None
+            if status == BulkItemStatus.NOT_FOUND:
+                detail = "User, permission or grant not found"
+            elif status == BulkItemStatus.CONFLICT:
+                detail = "User already assigned to this permission"
+        seen.add(key)
+        results.append(IAMUserPermissionBulkItemResult(
+            user_id=item.user_id, permission_id=item.permission_id, status=status, detail=detail
+        ))
+    return IAMUserPermissionBulkResult(items=results)
+
+
 @router.get("/{up_id}", response_model=IAMUserPermission)
 def read_user_permission(
         up_id: str,
-        user: UserModel = Depends(get_user),
+        user: CachedUser = Depends(get_user),
         access_guard_service=Depends(get_access_guard_enforcer),
         db: Session = Depends(get_db)
 ):
@@ -75,12 +158,16 @@ def read_user_permission(
 @router.get("/user/{user_id}", response_model=List[IAMUserPermission])
 def read_user_permissions_by_user(
         user_id: str,
-        user: UserModel = Depends(get_user),
+        response: Response,
+        page: PageParams = Depends(get_page_params),
+        user: CachedUser = Depends(get_user),
         access_guard_service=Depends(get_access_guard_enforcer),
         db: Session = Depends(get_db)
 ):
     service = IAMUserPermissionsService(db)
-    user_permissions = service.get_user_permissions_by_user(user_id)
+    # the cursor follows the fetched rows, a page may come back shorter after the access filter
+    user_permissions = service.get_user_permissions_by_user(user_id, page)
+    set_next_cursor(response, user_permissions)
 
     grouped: Dict[str, List[IAMUserPermission]] = defaultdict(list)
     for up in user_permissions:
@@ -88,26 +175,26 @@ def read_user_permissions_by_user(
             app_id = str(up.permission.resource.app_id)
             grouped[app_id].append(up)
 
+    app_ids = list(grouped.keys())
+    allowed = access_guard_service.batch_check(
+        [(user.email, build_resource_path("iam", app_id), "read") for app_id in app_ids]
+    )
     result: List[IAMUserPermission] = []
-    for app_id, policies in grouped.items():
-        try:
-            resource_path = build_resource_path("iam", app_id)
-            access_guard_service.require_permission(User(id=user.email), resource_path, "read")
-            result.extend(policies)
-        except PermissionDeniedError:
-            continue
+    for app_id, is_allowed in zip(app_ids, allowed):
+        if is_allowed:
+            result.extend(grouped[app_id])
 
     return [IAMUserPermission.from_orm(p) for p in result]
 
 
 @router.delete("/{up_id}", status_code=204)
-async def delete_user_permission(
+def delete_user_permission(
         up_id: str,
-        user: UserModel = Depends(get_user),
+        user: CachedUser = Depends(get_user),
         access_guard_service=Depends(get_access_guard_enforcer),
         db: Session = Depends(get_db)
 ):
-    service = IAMUserPermissionsService(db, send_policy_refresh_webhook)
+    service = IAMUserPermissionsService(db)
     db_obj = service.get_user_permission_by_id(up_id)
     if not db_obj:
         raise NotFoundException(f"IAM user permission with id {up_id} not found")
@@ -119,4 +206,4 @@ async def delete_user_permission(
     except PermissionDeniedError as e:
         raise UnauthorizedException(str(e))
 
-    await service.delete_user_permission(db_obj)
+    service.delete_user_permission(db_obj)
@@ -4,21 +4,23 @@ from typing import Dict, List
 from access_guard.authz.exceptions import PermissionDeniedError
 from access_guard.authz.models.entities import User
 from fastapi import APIRouter
-from fastapi import Depends, Request
+from fastapi import Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from access_manager_api.infra.access_guard import get_access_guard_enforcer
+from access_manager_api.infra.database import get_async_db
 from access_manager_api.infra.error_handling import (
     NotFoundException,
     UnauthorizedException,
 )
-from access_manager_api.models import User as UserModel
+from access_manager_api.infra.user_cache import CachedUser
 from access_manager_api.routes.dependencies import get_db, get_user
-from access_manager_api.schemas.user_roles import UserRole, UserRoleCreate
-from access_manager_api.services import IAMRoleService
-from access_manager_api.services.user_roles import IAMUserRolesService
+from access_manager_api.schemas.user_roles import UserRole, UserRoleBulkRequest, UserRoleBulkResult, UserRoleCreate
+from access_manager_api.services.role import AsyncIAMRoleService
+from access_manager_api.services.user_roles import AsyncIAMUserRolesService, IAMUserRolesService
+from access_manager_api.utils.pagination import PageParams, get_page_params, set_next_cursor
 from access_manager_api.utils.utils import build_resource_path
-from access_manager_api.utils.webhooks import send_policy_refresh_webhook
 
 router = APIRouter(prefix="/iam/user-roles", tags=["iam-user-roles"])
 
@@ -26,15 +28,15 @@ router = APIRouter(prefix="/iam/user-roles", tags=["iam-user-roles"])
 @router.post("/", response_model=UserRole)
 async def assign_user_role(
     payload: UserRoleCreate,
-    user: UserModel = Depends(get_user),
+    user: CachedUser = Depends(get_user),
     access_guard_service=Depends(get_access_guard_enforcer),
-    db: Session = Depends(get_db),
+    async_db: AsyncSession = Depends(get_async_db),
 ):
-    role_service = IAMRoleService(db)
-    user_role_service = IAMUserRolesService(db, send_policy_refresh_webhook)
+    role_service = AsyncIAMRoleService(async_db)
+    user_role_service = AsyncIAMUserRolesService(async_db)
 
     # Step 1: Check if the role exists
-    role = role_service.get_role_by_id(payload.role_id)
+    role = await role_service.get_role_by_id(payload.role_id)
     if not role:
         raise NotFoundException(f"Role with id {payload.role_id} not found")
 
@@ -52,10 +54,62 @@ async def assign_user_role(
     return UserRole.from_orm(db_obj)
 
 
+@router.post("/bulk", response_model=UserRoleBulkResult)
+async def assign_user_roles_bulk(
+    payload: UserRoleBulkRequest,
+    user: CachedUser = Depends(get_user),
+    access_guard_service=Depends(get_access_guard_enforcer),
+    async_db: AsyncSession = Depends(get_async_db),
+):
+    user_role_service = AsyncIAMUserRolesService(async_db)
+    pairs = [(item.user_id, item.role_id) for item in payload.items]
+    roles = await _load_writable_roles(pairs, user, access_guard_service, user_role_service)
+
+    applied = await user_role_service.create_user_roles_bulk(pairs, roles)
+    return UserRoleBulkResult(requested=len(pairs), applied=applied)
+
+
+@router.delete("/bulk", response_model=UserRoleBulkResult)
+async def delete_user_roles_bulk(
+    payload: UserRoleBulkRequest,
+    user: CachedUser = Depends(get_user),
+    access_guard_service=Depends(get_access_guard_enforcer),
+    async_db: AsyncSession = Depends(get_async_db),
+):
+    user_role_service = AsyncIAMUserRolesService(async_db)
+    pairs = [(item.user_id, item.role_id) for item in payload.items]
+    roles = await _load_writable_roles(pairs, user, access_guard_service, user_role_service)
+
+    applied = await user_role_service.delete_user_roles_bulk(pairs, roles)
+    return UserRoleBulkResult(requested=len(pairs), applied=applied)
+
+
+async def _load_writable_roles(pairs, user: CachedUser, access_guard_service,
+                               user_role_service: AsyncIAMUserRolesService):
+    """
+    Load the roles of the pairs and check write access once per distinct app. A missing role or
+    a denied app fails the whole batch, the result only counts what was applied.
+    """
+    role_ids = {role_id for _, role_id in pairs}
+    roles = await user_role_service.get_roles_by_ids(role_ids)
+    missing = {str(role_id) for role_id in role_ids if role_id not in roles}
+    if missing:
+        raise NotFoundException(f"Roles not found: {', '.join(sorted(missing))}")
+
+    app_ids = list({role.app_id for role in roles.values()})
+    allowed = access_guard_service.batch_check(
+        [(user.email, build_resource_path("iam", app_id), "write") for app_id in app_ids]
+    )
+    denied = {str(app_id) for app_id, is_allowed in zip(app_ids, allowed) if not is_allowed}
+    if denied:
+        raise UnauthorizedException(f"No write access to the apps: {', '.join(sorted(denied))}")
+    return roles
+
+
 @router.get("/{user_role_id}", response_model=UserRole)
 def read_user_role_by_id(
     user_role_id: str,
-    user: UserModel = Depends(get_user),
+    user: CachedUser = Depends(get_user),
     access_guard_service=Depends(get_access_guard_enforcer),
     db: Session = Depends(get_db),
 ):
@@ -79,8 +133,10 @@ def read_user_role_by_id(
 @router.get("/user/{user_id}", response_model=List[UserRole])
 def read_user_roles_by_user_id(
     request: Request,
+    response: Response,
     user_id: str,
-    user: UserModel = Depends(get_user),
+    page: PageParams = Depends(get_page_params),
+    user: CachedUser = Depends(get_user),
     access_guard_service=Depends(get_access_guard_enforcer),
     db: Session = Depends(get_db),
 ):
@@ -88,7 +144,9 @@ def read_user_roles_by_user_id(
 
     app_id = request.headers.get("app_id", None)
 
-    user_roles = user_role_service.get_user_roles_by_user(user_id, app_id)
+    # the cursor follows the fetched rows, a page may come back shorter after the access filter
+    user_roles = user_role_service.get_user_roles_by_user(user_id, app_id, page)
+    set_next_cursor(response, user_roles)
 
     # Group roles by app_id
     roles_by_app: Dict[str, List[UserRole]] = defaultdict(list)
@@ -96,29 +154,27 @@ def read_user_roles_by_user_id(
         if ur.role and ur.role.app_id:
             roles_by_app[str(ur.role.app_id)].append(ur)
 
-    # Filter by access
+    # Filter by access, skipping roles of apps the user can't read
+    app_ids = list(roles_by_app.keys())
+    allowed = access_guard_service.batch_check(
+        [(user.email, build_resource_path("iam", app_id), "read") for app_id in app_ids]
+    )
     result: List[UserRole] = []
-    for app_id, roles in roles_by_app.items():
-        try:
-            resource_path = build_resource_path("iam", app_id)
-            access_guard_service.require_permission(
-                User(id=user.email), resource_path, "read"
-            )
-            result.extend(roles)
-        except PermissionDeniedError:
-            continue  # skip roles for app_id user doesn't have access to
+    for app_id, is_allowed in zip(app_ids, allowed):
+        if is_allowed:
+            result.extend(roles_by_app[app_id])
 
     return [UserRole.from_orm(ur) for ur in result]
 
 
 @router.delete("/{user_role_id}", status_code=204)
-async def delete_user_role(
+def delete_user_role(
     user_role_id: str,
-    user: UserModel = Depends(get_user),
+    user: CachedUser = Depends(get_user),
     access_guard_service=Depends(get_access_guard_enforcer),
     db: Session = Depends(get_db),
 ):
-    user_role_service = IAMUserRolesService(db, send_policy_refresh_webhook)
+    user_role_service = IAMUserRolesService(db)
     db_user_role = user_role_service.get_user_role_by_id(user_role_id)
     if not db_user_role:
         raise NotFoundException(f"IAM user role with id {user_role_id} not found")
@@ -132,4 +188,4 @@ async def delete_user_role(
     except PermissionDeniedError as e:
         raise UnauthorizedException(str(e))
 
-    await user_role_service.delete_user_role(db_user_role)
+    user_role_service.delete_user_role(db_user_role)
@@ -1,11 +1,12 @@
 from access_manager_api.schemas import user_permissions, role_permissions, common, user_roles, role, permission, resource
-from access_manager_api.schemas.access import UserAccess, Permission
+from access_manager_api.schemas.access import UserAccess, UserAccessBatchRequest, Permission
 from access_manager_api.schemas.permission import IAMPermission, IAMPermissionCreate, IAMPermissionBase
 from access_manager_api.schemas.resource import IAMResource, IAMResourceCreate, IAMResourceBase
 from access_manager_api.schemas.role import IAMRole, IAMRoleCreate, IAMRoleBase
 from access_manager_api.schemas.role_permissions import IAMRolePermission, IAMRolePermissionCreate, IAMRolePermissionBase
-from access_manager_api.schemas.user_permissions import IAMUserPermission, IAMUserPermissionCreate, IAMUserPermissionBase
-from access_manager_api.schemas.user_roles import UserRole, UserRoleBase, UserRoleCreate
+from access_manager_api.schemas.user_permissions import IAMUserPermission, IAMUserPermissionCreate, IAMUserPermissionBase, \
+    IAMUserPermissionBulkCreate, IAMUserPermissionBulkDelete, IAMUserPermissionBulkResult
+from access_manager_api.schemas.user_roles import UserRole, UserRoleBase, UserRoleCreate, UserRoleBulkRequest, UserRoleBulkResult
 
 __all__ = [
     'IAMResource', 'IAMResourceCreate', 'IAMResourceBase',
@@ -13,5 +14,7 @@ __all__ = [
     'IAMPermission', 'IAMPermissionCreate', 'IAMPermissionBase',
     'IAMRolePermission', 'IAMRolePermissionCreate', 'IAMRolePermissionBase',
     'IAMUserPermission', 'IAMUserPermissionCreate', 'IAMUserPermissionBase',
-    'UserRole', 'UserAccess', 'UserRoleCreate', 'UserRoleBase', "Permission"
+    'IAMUserPermissionBulkCreate', 'IAMUserPermissionBulkDelete', 'IAMUserPermissionBulkResult',
+    'UserRole', 'UserAccess', 'UserAccessBatchRequest', 'UserRoleCreate', 'UserRoleBase', "Permission",
+    'UserRoleBulkRequest', 'UserRoleBulkResult'
 ]
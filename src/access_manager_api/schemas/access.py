@@ -1,5 +1,5 @@
 import uuid
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 from pydantic import BaseModel
 
@@ -15,3 +15,9 @@ class UserAccess(BaseModel):
     scope: str
     roles: List[str]
     permissions: Dict[str, List[Permission]]
+
+
+class UserAccessBatchRequest(BaseModel):
+    user_ids: List[uuid.UUID]
+    scope: str
+    app_id: Optional[str] = None
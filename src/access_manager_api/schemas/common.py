@@ -4,3 +4,11 @@ from enum import Enum
 class PolicyEffect(str, Enum):
     ALLOW = "allow"
     DENY = "deny"
+
+
+class BulkItemStatus(str, Enum):
+    CREATED = "created"
+    DELETED = "deleted"
+    CONFLICT = "conflict"
+    NOT_FOUND = "not_found"
+    FORBIDDEN = "forbidden"
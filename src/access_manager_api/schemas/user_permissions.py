@@ -1,8 +1,9 @@
 import uuid
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
-from access_manager_api.schemas.common import PolicyEffect
+from access_manager_api.infra.config import settings
+from access_manager_api.schemas.common import BulkItemStatus, PolicyEffect
 from access_manager_api.schemas.permission import IAMPermission
 from pydantic import BaseModel, Field
 
@@ -17,6 +18,29 @@ class IAMUserPermissionCreate(IAMUserPermissionBase):
     pass
 
 
+class IAMUserPermissionKey(BaseModel):
+    user_id: uuid.UUID
+    permission_id: uuid.UUID
+
+
+class IAMUserPermissionBulkCreate(BaseModel):
+    items: List[IAMUserPermissionCreate] = Field(max_length=settings.AccessManager.MaxBulkItems)
+
+
+class IAMUserPermissionBulkDelete(BaseModel):
+    items: List[IAMUserPermissionKey] = Field(max_length=settings.AccessManager.MaxBulkItems)
+
+
+class IAMUserPermissionBulkItemResult(IAMUserPermissionKey):
+    status: BulkItemStatus
+    detail: Optional[str] = None
+
+
+class IAMUserPermissionBulkResult(BaseModel):
+    # one entry per requested item, in request order
+    items: List[IAMUserPermissionBulkItemResult]
+
+
 class IAMUserPermissionUpdate(BaseModel):
     effect: Optional[str] = None
 
@@ -1,7 +1,8 @@
 from datetime import datetime
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 import uuid
+from access_manager_api.infra.config import settings
 from access_manager_api.schemas.role import IAMRole
 
 
@@ -14,6 +15,16 @@ class UserRoleCreate(UserRoleBase):
     pass
 
 
+class UserRoleBulkRequest(BaseModel):
+    items: List[UserRoleBase] = Field(max_length=settings.AccessManager.MaxBulkItems)
+
+
+class UserRoleBulkResult(BaseModel):
+    requested: int
+    # pairs actually assigned/revoked, the others already were in the requested state
+    applied: int
+
+
 class UserRoleUpdate(BaseModel):
     role_id: Optional[uuid.UUID] = None
 
@@ -1,4 +1,4 @@
-from access_manager_api.services.access import get_user_access
+from access_manager_api.services.access import get_user_access, get_users_access
 from access_manager_api.services.permission import IAMPermissionService
 from access_manager_api.services.resource import IAMResourceService
 from access_manager_api.services.role import IAMRoleService
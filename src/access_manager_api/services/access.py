@@ -1,15 +1,46 @@
-from typing import Optional, List, Dict
+from collections import defaultdict
+from typing import Optional, List, Dict, Iterable, Tuple
 from typing import Set
 
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+from access_manager_api.infra.constants import ROLE_ORG_ADMIN
 from access_manager_api.models import Scope
 from access_manager_api.models import User
+from access_manager_api.providers.policy_query_provider import QUERY_USER_ACCESS
 from access_manager_api.schemas import UserAccess, Permission
 from access_manager_api.schemas.policies import PoliciesParams
 from access_manager_api.services.policies import PoliciesService
 
 
+class UserPolicyIndex:
+    """
+    Policies of one (scope, app_id) grouped by subject, so any number of users can be
+    resolved against a single load of the policy set.
+    """
+
+    def __init__(self, policies: Iterable[dict]):
+        self._roles: Dict[str, List[str]] = defaultdict(list)
+        # policies keep their load position: the first grant of an action wins
+        self._grants: Dict[str, List[Tuple[int, dict]]] = defaultdict(list)
+
+        for position, policy in enumerate(policies):
+            if policy["ptype"] == "g":
+                self._roles[policy["subject"]].append(policy["object"])
+            elif policy["ptype"] == "p":
+                self._grants[policy["subject"]].append((position, policy))
+
+    def roles_of(self, subject: str) -> List[str]:
+        return self._roles.get(subject, [])
+
+    def grants_of(self, subjects: Iterable[str]) -> List[dict]:
+        grants = []
+        for subject in set(subjects):
+            grants.extend(self._grants.get(subject, []))
+        return [policy for _, policy in sorted(grants, key=lambda g: g[0])]
+
+
 def get_user_access(
         db: Session,
         user_id: str,
@@ -20,43 +51,86 @@ def get_user_access(
     if not user:
         return None
 
-    policies_service = PoliciesService(db)
-    policies_params = PoliciesParams(scope=Scope.APP.name, app_id=app_id, user_id=user_id)
-    policies_result = policies_service.get_policies(policies_params)
+    # only the user's own grants are loaded, not the app's whole policy set
+    index = UserPolicyIndex(load_user_policies(db, user_id, Scope.APP.name, app_id))
+    resource_prefix = f"{Scope.APP.name}/{app_id}/" if app_id else ""
+
+    return build_user_access(user_id, user.email, scope, index, resource_prefix)
+
+
+def get_users_access(
+        db: Session,
+        user_ids: List[str],
+        scope: str,
+        app_id: Optional[str] = None
+) -> List[UserAccess]:
+    """
+    Access of many users of one app. The app policies are loaded once (from the cached app
+    enforcer) and every user is resolved against the same index. Unknown users are skipped.
+    """
+    users = db.query(User.id, User.email).filter(User.id.in_(user_ids)).all()
+    if not users:
+        return []
 
+    policies_params = PoliciesParams(scope=Scope.APP.name, app_id=app_id)
+    policies_result = PoliciesService(db).get_policies(policies_params)
+    index = UserPolicyIndex(policies_result["policies"])
     resource_prefix = policies_result.get("resource_prefix", "")
+
+    users_by_id = {str(user.id): user for user in users}
+    return [
+        build_user_access(user.id, user.email, scope, index, resource_prefix)
+        for user in (users_by_id.get(str(user_id)) for user_id in dict.fromkeys(user_ids))
+        if user
+    ]
+
+
+def load_user_policies(db: Session, user_id: str, scope: str, app_id: Optional[str] = None) -> List[dict]:
+    """
+    Policies of one user within (scope, app_id): the user's role assignments, the permissions of
+    those roles, the user's direct permissions and the synthetic org admin role of the app.
+    """
+    rows = db.execute(text(QUERY_USER_ACCESS), {
+        "user_id": str(user_id),
+        "policy_api_scope": scope,
+        "policy_api_appid": str(app_id) if app_id else None,
+        "org_admin_role_name": ROLE_ORG_ADMIN,
+    }).mappings().all()
+    return [dict(row) for row in rows]
+
+
+def build_user_access(
+        user_id: str,
+        user_email: str,
+        scope: str,
+        index: UserPolicyIndex,
+        resource_prefix: str = ""
+) -> UserAccess:
     roles: List[str] = []
     user_roles: Set[str] = set()
     permissions: Dict[str, List[Permission]] = {}
 
-    # Pass 1: g-policies (role assignment)
-    for policy in policies_result["policies"]:
-        if policy["ptype"] == "g":
-            if policy["subject"] == user.email:
-                role_path = policy["object"]
-                role_name = extract_role_name(role_path, resource_prefix)
-                roles.append(role_name)
-                user_roles.add(role_path)
-
-    # Pass 2: p-policies (permissions)
-    for policy in policies_result["policies"]:
-        if policy["ptype"] == "p":
-            subject = policy["subject"]
-            if subject == user.email or subject in user_roles:
-                resource_path = policy["object"]
-                action = policy.get("action", "*")
-                effect = policy.get("effect", "allow")
-                resource_name = extract_resource_name(resource_path, resource_prefix)
-
-                if resource_name not in permissions:
-                    permissions[resource_name] = []
-
-                if not any(p.action == action for p in permissions[resource_name]):
-                    permissions[resource_name].append(Permission(action=action, effect=effect))
+    # g-policies (role assignment)
+    for role_path in index.roles_of(user_email):
+        roles.append(extract_role_name(role_path, resource_prefix))
+        user_roles.add(role_path)
+
+    # p-policies (permissions) of the user and of its roles
+    for policy in index.grants_of([user_email, *user_roles]):
+        resource_path = policy["object"]
+        action = policy.get("action") or "*"
+        effect = policy.get("effect") or "allow"
+        resource_name = extract_resource_name(resource_path, resource_prefix)
+
+        if resource_name not in permissions:
+            permissions[resource_name] = []
+
+        if not any(p.action == action for p in permissions[resource_name]):
+            permissions[resource_name].append(Permission(action=action, effect=effect))
 
     return UserAccess(
         user_id=user_id,
-        user_email=user.email,
+        user_email=user_email,
         scope=scope,
         roles=roles,
         permissions=permissions
@@ -0,0 +1,15 @@
+from typing import Dict, Set
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from access_manager_api.models import User
+
+
+async def get_user_emails(db: AsyncSession, user_ids: Set[UUID]) -> Dict[UUID, str]:
+    """Emails of the users of a bulk request by id; unknown ids are left out."""
+    if not user_ids:
+        return {}
+    return dict((await db.execute(select(User.id, User.email).where(User.id.in_(list(user_ids))))).all())
+
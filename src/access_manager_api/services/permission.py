@@ -1,40 +1,38 @@
-import asyncio
 import logging
-from typing import List, Optional, Callable, Awaitable
+from typing import List, Optional
 
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
 
 from access_manager_api.infra.error_handling import AlreadyExistsException, UnknownException, NotFoundException
-from access_manager_api.models import IAMPermission
+from access_manager_api.infra.policy_events import record_policy_delta
+from access_manager_api.models import IAMPermission, IAMResource
+from access_manager_api.providers.policy_deltas import delta_for, permission_policies
 from access_manager_api.schemas.permission import IAMPermissionCreate, IAMPermissionUpdate
+from access_manager_api.utils.pagination import PageParams, paginate
 
 logger = logging.getLogger(__name__)
-PolicyRefreshHookType = Callable[[str, int, Session], Awaitable[None]]
 
 
 class IAMPermissionService:
-    def __init__(self, db: Session,
-                 policy_refresh_hook: Optional[PolicyRefreshHookType] = None):
+    def __init__(self, db: Session):
         self.db = db
-        self.policy_refresh_hook = policy_refresh_hook
 
-    async def create_permission(self, permission: IAMPermissionCreate, commit: bool = True) -> IAMPermission:
+    def create_permission(self, permission: IAMPermissionCreate, commit: bool = True) -> IAMPermission:
         db_permission = IAMPermission(
             resource_id=permission.resource_id,
             action=permission.action
         )
 
+        resource = self.db.get(IAMResource, permission.resource_id)
         self.db.add(db_permission)
+        if resource:
+            record_policy_delta(self.db, delta_for(resource.scope, resource.app_id))
 
         if commit:
             try:
                 self.db.commit()
                 self.db.refresh(db_permission)
-                if self.policy_refresh_hook:
-                    asyncio.create_task(
-                        self.policy_refresh_hook(db_permission.resource.scope, db_permission.resource.app_id, self.db)
-                    )
             except IntegrityError:
                 self.db.rollback()
                 raise AlreadyExistsException(f"Permission already exists {permission.action}")
@@ -53,8 +51,9 @@ class IAMPermissionService:
             .filter(IAMPermission.id == permission_id) \
             .first()
 
-    def get_permissions_by_resource(self, resource_id: str) -> List[IAMPermission]:
-        return self.db.query(IAMPermission).filter(IAMPermission.resource_id == resource_id).all()
+    def get_permissions_by_resource(self, resource_id: str, page: Optional[PageParams] = None) -> List[IAMPermission]:
+        query = self.db.query(IAMPermission).filter(IAMPermission.resource_id == resource_id)
+        return paginate(query, IAMPermission, page)
 
     def get_permissions_by_resource_and_actions(self, resource_id: str, action_names: List[str]) -> List[IAMPermission]:
         return self.db.query(IAMPermission).filter(
@@ -80,33 +79,32 @@ class IAMPermissionService:
         if not db_permission:
             raise NotFoundException("Entry not found")
 
+        delta = delta_for(db_permission.resource.scope, db_permission.resource.app_id)
+        delta.removed.extend(permission_policies(db_permission))
         for key, value in permission_data.model_dump().items():
             setattr(db_permission, key, value)
+        delta.added.extend(permission_policies(db_permission))
+        record_policy_delta(self.db, delta)
         try:
             self.db.commit()
             self.db.refresh(db_permission)
-            if self.policy_refresh_hook:
-                asyncio.create_task(
-                    self.policy_refresh_hook(db_permission.resource.scope, db_permission.resource.app_id, self.db)
-                )
         except Exception as e:
             self.db.rollback()
             logger.warning(f"Failed to update permission. System said: {e}")
             raise UnknownException()
         return db_permission
 
-    async def delete_permission(self, db_permission: IAMPermission):
+    def delete_permission(self, db_permission: IAMPermission):
         if not db_permission:
             raise NotFoundException("Entry not found")
 
         resource = db_permission.resource
+        delta = delta_for(resource.scope, resource.app_id)
+        delta.removed.extend(permission_policies(db_permission))
         try:
             self.db.delete(db_permission)
+            record_policy_delta(self.db, delta)
             self.db.commit()
-            if self.policy_refresh_hook:
-                asyncio.create_task(
-                    self.policy_refresh_hook(resource.scope, resource.app_id, self.db)
-                )
         except Exception as e:
             self.db.rollback()
             logger.warning(f"Failed to delete permission. System said: {e}")
@@ -1,46 +1,29 @@
-from typing import Optional
+import json
+from typing import Iterator, Optional, Tuple
+from uuid import UUID
 
-from access_guard.authz.factory import get_permissions_enforcer
-from access_guard.authz.loaders.policy_code_loader import PolicyCodeLoader
-from access_guard.authz.loaders.policy_db_loader import PolicyDbLoader
-from access_guard.authz.models.permissions_enforcer_params import PermissionsEnforcerParams
 from fastapi import Depends
 from sqlalchemy.orm import Session
 
+from access_manager_api.infra.access_guard import get_enforcer_registry
 from access_manager_api.infra.database import get_db
-from access_manager_api.providers.policy_query_provider import AccessManagementQueryProvider
-from access_manager_api.providers.synthetic_policies_applications_provider import SyntheticAppPoliciesProvider
+from access_manager_api.infra.error_handling import InvalidFormatException
+from access_manager_api.infra.policy_generations import GenerationKey, build_policy_version, parse_policy_version
+from access_manager_api.infra.policy_journal import load_policy_changes
 from access_manager_api.schemas.policies import PoliciesParams
+from access_manager_api.utils.policy_codec import encode_policies
 
 
 class PoliciesService:
     def __init__(self, db: Session):
         self.db = db
 
-    def get_policies(self, policiesParams: PoliciesParams):
-        policy_loaders = [
-            PolicyDbLoader(AccessManagementQueryProvider(), self.db.bind),
-        ]
-        if policiesParams.app_id:
-            policy_loaders.append(PolicyCodeLoader(policy_provider=SyntheticAppPoliciesProvider(self.db)))
-
-        params_dict = {
-            "filter": {
-                "policy_api_scope": policiesParams.scope,
-                "policy_api_appid": str(policiesParams.app_id) if policiesParams.app_id is not None else None,
-                "policy_api_userid": str(policiesParams.user_id) if policiesParams.user_id is not None else None,
-            }
-        }
+    def get_etag(self, scope: str, app_id: Optional[str], representation: Optional[str] = None) -> str:
+        key = _generation_key(scope, app_id)
+        return get_enforcer_registry().generations.etag(self.db, key, representation)
 
-        enforcer_settings = PermissionsEnforcerParams(**params_dict);
-
-        enforcer = get_permissions_enforcer(
-            settings=enforcer_settings,
-            new_instance=True,
-            policy_loaders=policy_loaders
-        )
-
-        resource_prefix = f"{policiesParams.scope}/{policiesParams.app_id}/"
+    def get_policies(self, policiesParams: PoliciesParams):
+        enforcer, resource_prefix = self._get_enforcer(policiesParams)
 
         response = {
             "resource_prefix": "",
@@ -52,41 +35,132 @@ class PoliciesService:
 
         return response
 
+    def stream_policies(self, policiesParams: PoliciesParams) -> Tuple[Iterator[bytes], str]:
+        """
+        NDJSON variant of get_policies: one policy per line, encoded while the enforcer model is walked.
+        Returns the line iterator and the resource prefix.
+        """
+        enforcer, resource_prefix = self._get_enforcer(policiesParams)
+
+        lines = (
+            json.dumps(policy, separators=(",", ":")).encode() + b"\n"
+            for policy in self._iter_policies(enforcer, resource_prefix)
+        )
+
+        if policiesParams.scope and policiesParams.app_id:
+            return lines, resource_prefix
+        return lines, ""
+
+    def pack_policies(self, policiesParams: PoliciesParams) -> bytes:
+        """MessagePack variant of get_policies, see utils.policy_codec for the format."""
+        enforcer, resource_prefix = self._get_enforcer(policiesParams)
+        if not (policiesParams.scope and policiesParams.app_id):
+            resource_prefix = ""
+        return encode_policies(self._iter_rules(enforcer), resource_prefix)
+
+    def get_policy_changes(self, policiesParams: PoliciesParams, since: str) -> dict:
+        """
+        Tuples added and removed after version `since`, from the policy journal. Falls back to
+        a full snapshot when the journal can't answer, e.g. when it was compacted past `since`.
+        """
+        since_version = parse_policy_version(since)
+        if since_version is None:
+            raise InvalidFormatException(f"Invalid policy version '{since}'")
+
+        key = _generation_key(policiesParams.scope, policiesParams.app_id)
+        _, app_id = key
+        # the version the local enforcer reflects, the snapshot below can't be older than it
+        version = get_enforcer_registry().generations.version(self.db, key)
+
+        changes = load_policy_changes(self.db, key, since_version, version)
+        if changes is None:
+            response = self.get_policies(policiesParams)
+            response.update({"snapshot": True, "since": since, "version": build_policy_version(version)})
+            return response
+
+        resource_prefix = f"{policiesParams.scope}/{app_id}/" if app_id else ""
+        strip_prefix = _prefix_stripper(resource_prefix)
+        added, removed = changes
+        return {
+            "resource_prefix": resource_prefix,
+            "snapshot": False,
+            "since": since,
+            "version": build_policy_version(version),
+            "added": [_policy_dict(t[0], _journal_rule(t), strip_prefix) for t in added],
+            "removed": [_policy_dict(t[0], _journal_rule(t), strip_prefix) for t in removed],
+        }
+
+    def _get_enforcer(self, policiesParams: PoliciesParams):
+        scope, app_id = _generation_key(policiesParams.scope, policiesParams.app_id)
+        enforcer = get_enforcer_registry().get_app_enforcer(scope, app_id)
+        return enforcer, f"{scope}/{app_id}/"
+
     def _extract_policies(self, enforcer, resource_prefix="") -> list:
-        policies = []
+        return list(self._iter_policies(enforcer, resource_prefix))
 
-        def strip_prefix(value: Optional[str]) -> Optional[str]:
-            if value and resource_prefix and value.startswith(resource_prefix):
-                return value[len(resource_prefix):]
-            return value
+    def _iter_policies(self, enforcer, resource_prefix="") -> Iterator[dict]:
+        strip_prefix = _prefix_stripper(resource_prefix)
+        for ptype, rule in self._iter_rules(enforcer):
+            yield _policy_dict(ptype, rule, strip_prefix)
 
+    def _iter_rules(self, enforcer) -> Iterator[Tuple[str, list]]:
         for sec in ["p", "g"]:
             for ptype, ast in enforcer._model.model.get(sec, {}).items():
                 for rule in ast.policy:
-                    _subject = rule[0] if len(rule) > 0 else None
-                    _object = rule[1] if len(rule) > 1 else None
-                    _action = rule[2] if len(rule) > 2 else None
-                    _effect = rule[3] if len(rule) > 3 else None
-
-                    stripped_subject = strip_prefix(_subject)
-                    stripped_object = strip_prefix(_object)
-
-                    _description = None
-                    if ptype == "p":
-                        _description = f"{_effect} {_action} access for {stripped_subject} to resource {stripped_object}"
-                    elif ptype == "g":
-                        _description = f"assign {stripped_subject} to role {stripped_object}"
-
-                    policies.append({
-                        "ptype": ptype,
-                        "subject": _subject,
-                        "object": _object,
-                        "action": _action,
-                        "effect": _effect,
-                        "description": _description
-                    })
-
-        return policies
+                    yield ptype, rule
+
+
+def _generation_key(scope: str, app_id: Optional[str]) -> GenerationKey:
+    """
+    (scope, app_id) with the app_id in its canonical UUID form, so every spelling of an app_id
+    header shares one enforcer, generation and ETag. Raises InvalidFormatException otherwise.
+    """
+    if not app_id:
+        return scope, None
+    try:
+        return scope, str(UUID(str(app_id)))
+    except ValueError:
+        raise InvalidFormatException(f"Invalid app_id '{app_id}'")
+
+
+def _prefix_stripper(resource_prefix: str):
+    def strip_prefix(value: Optional[str]) -> Optional[str]:
+        if value and resource_prefix and value.startswith(resource_prefix):
+            return value[len(resource_prefix):]
+        return value
+    return strip_prefix
+
+
+def _journal_rule(journal_tuple) -> list:
+    ptype, subject, obj, action, effect = journal_tuple
+    if ptype.startswith("g"):
+        return [subject, obj]
+    return [subject, obj, action, effect]
+
+
+def _policy_dict(ptype: str, rule, strip_prefix) -> dict:
+    _subject = rule[0] if len(rule) > 0 else None
+    _object = rule[1] if len(rule) > 1 else None
+    _action = rule[2] if len(rule) > 2 else None
+    _effect = rule[3] if len(rule) > 3 else None
+
+    stripped_subject = strip_prefix(_subject)
+    stripped_object = strip_prefix(_object)
+
+    _description = None
+    if ptype == "p":
+        _description = f"{_effect} {_action} access for {stripped_subject} to resource {stripped_object}"
+    elif ptype == "g":
+        _description = f"assign {stripped_subject} to role {stripped_object}"
+
+    return {
+        "ptype": ptype,
+        "subject": _subject,
+        "object": _object,
+        "action": _action,
+        "effect": _effect,
+        "description": _description
+    }
 
 
 def get_policies_service(db: Session = Depends(get_db)):
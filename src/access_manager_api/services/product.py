@@ -12,7 +12,7 @@ from access_manager_api.services import IAMUserRolesService
 from access_manager_api.services.role import IAMRoleService
 
 
-async def onboard_product(db: Session, app_id: UUID, request: ProductOnboard, initiated_by: User):
+def onboard_product(db: Session, app_id: UUID, request: ProductOnboard, initiated_by: User):
     role_service = IAMRoleService(db)
     user_role_service = IAMUserRolesService(db)
 
@@ -33,26 +33,26 @@ async def onboard_product(db: Session, app_id: UUID, request: ProductOnboard, in
     try:
 
         try:
-            created_product_owner_role = await role_service.create_role(product_owner_role, commit=False)
+            created_product_owner_role = role_service.create_role(product_owner_role, commit=False)
         except IntegrityError:
             raise AlreadyExistsException(f"{ROLE_PRODUCT_OWNER} role already exists for app {app_id}")
 
         try:
-            await user_role_service.assign_user_to_role(request.product_owner_id, created_product_owner_role.id, commit=False)
+            user_role_service.assign_user_to_role(request.product_owner_id, created_product_owner_role.id, commit=False)
         except IntegrityError:
             raise AlreadyExistsException(f"User {request.product_owner_id} is already assigned to {ROLE_PRODUCT_OWNER}")
 
         try:
-            created_policy_reader_role = await role_service.create_role(policy_reader_role, commit=False)
+            created_policy_reader_role = role_service.create_role(policy_reader_role, commit=False)
         except IntegrityError:
             raise AlreadyExistsException(f"{ROLE_POLICY_READER} role already exists for app {app_id}")
 
         # audit_log(db, action="product_onboard_assign_product_owner", user_id=initiated_by, app_id=app_id)
 
         try:
-            await user_role_service.assign_user_to_role(request.system_user_id,
-                                                        created_policy_reader_role.id,
-                                                        commit=False)
+            user_role_service.assign_user_to_role(request.system_user_id,
+                                                  created_policy_reader_role.id,
+                                                  commit=False)
         except IntegrityError:
             raise AlreadyExistsException(f"User {request.system_user_id} is already assigned to {ROLE_POLICY_READER}")
 
@@ -1,47 +1,51 @@
-import asyncio
 import logging
-from typing import List, Optional, Callable, Awaitable
+from typing import List, Optional
 from uuid import UUID
 
 from access_manager_api.services import IAMPermissionService
 from access_manager_api.utils import utils
 
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
 from access_manager_api.infra.error_handling import AlreadyExistsException, UnknownException, NotFoundException
+from access_manager_api.infra.policy_events import record_policy_delta
 from access_manager_api.models import IAMResource, Scope
+from access_manager_api.providers.policy_deltas import delta_for, resource_policies
 from access_manager_api.schemas import IAMResourceCreate, IAMPermissionCreate
 from access_manager_api.schemas.resource import IAMResourceUpdate
+from access_manager_api.utils.pagination import PageParams, paginate
 
-PolicyRefreshHookType = Callable[[str, int, Session], Awaitable[None]]
 logger = logging.getLogger(__name__)
 
 
+def build_resource(resource: IAMResourceCreate) -> IAMResource:
+    return IAMResource(
+        scope=resource.scope,
+        app_id=utils.ensure_uuid(resource.app_id) if resource.app_id else None,
+        resource_name=resource.resource_name,
+        description=resource.description,
+        synthetic=resource.synthetic,
+        synthetic_data=resource.synthetic_data
+    )
+
+
 class IAMResourceService:
-    def __init__(self, db: Session
-                 , policy_refresh_hook: Optional[PolicyRefreshHookType] = None):
+    def __init__(self, db: Session):
         self.db = db
-        self.policy_refresh_hook = policy_refresh_hook
-
-    async def create_resource(self, resource: IAMResourceCreate, commit: bool = True) -> IAMResource:
-        db_resource = IAMResource(
-            scope=resource.scope,
-            app_id=utils.ensure_uuid(resource.app_id) if resource.app_id else None,
-            resource_name=resource.resource_name,
-            description=resource.description,
-            synthetic=resource.synthetic,
-            synthetic_data=resource.synthetic_data
-        )
+
+    def create_resource(self, resource: IAMResourceCreate, commit: bool = True) -> IAMResource:
+        db_resource = build_resource(resource)
 
         self.db.add(db_resource)
+        record_policy_delta(self.db, delta_for(db_resource.scope, db_resource.app_id))
 
         if commit:
             try:
                 self.db.commit()
                 self.db.refresh(db_resource)
-                if self.policy_refresh_hook:
-                    asyncio.create_task(self.policy_refresh_hook(db_resource.scope, db_resource.app_id, self.db))
             except IntegrityError as e:
                 self.db.rollback()
                 raise AlreadyExistsException(f"IAM resource {resource.resource_name} already exists ")
@@ -53,13 +57,13 @@ class IAMResourceService:
             self.db.flush()
         return db_resource
 
-    async def create_or_get_resource_with_actions(self, data: IAMResourceCreate) -> IAMResource:
+    def create_or_get_resource_with_actions(self, data: IAMResourceCreate) -> IAMResource:
         try:
             # Try to create resource (may raise if exists)
-            resource = await self.create_resource(data, commit=False)
+            resource = self.create_resource(data, commit=False)
         except IntegrityError:
             self.db.rollback()
-            resource = await self.get_resource_by_name(
+            resource = self.get_resource_by_name(
                 scope=data.scope,
                 app_id=data.app_id,
                 resource_name=data.resource_name
@@ -72,7 +76,7 @@ class IAMResourceService:
             permission_service = IAMPermissionService(self.db)
             for action in data.actions:
                 try:
-                    await permission_service.create_permission(
+                    permission_service.create_permission(
                         IAMPermissionCreate(resource_id=resource.id, action=action),
                         commit=False)
                 except:
@@ -85,8 +89,6 @@ class IAMResourceService:
         try:
             self.db.commit()
             self.db.refresh(resource)
-            if self.policy_refresh_hook:
-                asyncio.create_task(self.policy_refresh_hook(resource.scope, resource.app_id, self.db))
         except Exception as e:
             self.db.rollback()
             logger.error(f"Unhandled error during commit: {e}")
@@ -94,10 +96,10 @@ class IAMResourceService:
 
         return resource
 
-    async def get_resource_by_id(self, resource_id: int) -> Optional[IAMResource]:
+    def get_resource_by_id(self, resource_id: int) -> Optional[IAMResource]:
         return self.db.query(IAMResource).filter(IAMResource.id == resource_id).first()
 
-    async def get_resource_by_name(self, resource_name: str, scope: Scope, app_id: UUID = None) \
+    def get_resource_by_name(self, resource_name: str, scope: Scope, app_id: UUID = None) \
             -> Optional[IAMResource]:
         query = self.db.query(IAMResource).filter(
             IAMResource.resource_name == resource_name,
@@ -106,7 +108,8 @@ class IAMResourceService:
         )
         return query.first()
 
-    async def get_resources_by_scope_app(self, scope: str, app_id: Optional[str]) -> List[IAMResource]:
+    def get_resources_by_scope_app(self, scope: str, app_id: Optional[str],
+                                   page: Optional[PageParams] = None) -> List[IAMResource]:
         query = self.db.query(IAMResource).filter(IAMResource.scope == scope)
 
         if not app_id:
@@ -114,32 +117,34 @@ class IAMResourceService:
         else:
             query = query.filter(IAMResource.app_id == app_id)
 
-        return query.all()
+        return paginate(query, IAMResource, page)
 
-    async def get_resources(self, skip: int = 0, limit: int = 100) -> List[IAMResource]:
-        return self.db.query(IAMResource).offset(skip).limit(limit).all()
+    def get_resources(self, page: PageParams) -> List[IAMResource]:
+        return paginate(self.db.query(IAMResource), IAMResource, page)
 
-    async def get_resources_by_app(self, app_id: int) -> List[IAMResource]:
+    def get_resources_by_app(self, app_id: int) -> List[IAMResource]:
         return self.db.query(IAMResource).filter(IAMResource.app_id == app_id).all()
 
-    async def update_resource_by_id(self, resource_id: str, resource: IAMResourceUpdate) -> Optional[IAMResource]:
-        db_resource = await self.get_resource_by_id(resource_id)
+    def update_resource_by_id(self, resource_id: str, resource: IAMResourceUpdate) -> Optional[IAMResource]:
+        db_resource = self.get_resource_by_id(resource_id)
         return self.update_resource(db_resource, resource)
 
-    async def update_resource(self, db_resource: IAMResource, resource: IAMResourceUpdate) -> Optional[IAMResource]:
+    def update_resource(self, db_resource: IAMResource, resource: IAMResourceUpdate) -> Optional[IAMResource]:
         if not db_resource:
             raise NotFoundException("Resource not found")
 
+        was_synthetic = (bool(db_resource.synthetic), db_resource.synthetic_data)
         for key, value in resource.model_dump().items():
             setattr(db_resource, key, value)
 
+        # synthetic resources are excluded from the loaded policies; switching the flag needs a reload
+        synthetic_changed = was_synthetic != (bool(db_resource.synthetic), db_resource.synthetic_data)
+        record_policy_delta(self.db, delta_for(db_resource.scope, db_resource.app_id,
+                                               requires_reload=synthetic_changed))
+
         try:
             self.db.commit()
             self.db.refresh(db_resource)
-            if self.policy_refresh_hook:
-                asyncio.create_task(
-                    self.policy_refresh_hook(resource.scope, resource.app_id, self.db)
-                )
         except Exception as e:
             self.db.rollback()
             logger.warning(f"Failed to update resource. System said: {e}")
@@ -147,21 +152,56 @@ class IAMResourceService:
 
         return db_resource
 
-    async def delete_resource(self, resource: IAMResource) -> bool:
+    def delete_resource(self, resource: IAMResource) -> bool:
         if not resource:
             raise NotFoundException("Resource not found")
 
+        delta = delta_for(resource.scope, resource.app_id)
+        delta.removed.extend(resource_policies(resource))
+
         try:
             self.db.delete(resource)
+            record_policy_delta(self.db, delta)
             self.db.commit()
         except Exception as e:
             self.db.rollback()
             logger.warning(f"Failed to delete resource. System said: {e}")
             raise UnknownException()
 
-        if self.policy_refresh_hook:
-            asyncio.create_task(
-                self.policy_refresh_hook(resource.scope, resource.app_id, self.db)
-            )
-
         return True
+
+
+class AsyncIAMResourceService:
+    """IAMResourceService counterpart on an AsyncSession, for async routes."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_resource(self, resource: IAMResourceCreate) -> IAMResource:
+        db_resource = build_resource(resource)
+
+        self.db.add(db_resource)
+        record_policy_delta(self.db, delta_for(db_resource.scope, db_resource.app_id))
+
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            raise AlreadyExistsException(f"IAM resource {resource.resource_name} already exists ")
+        except Exception as e:
+            await self.db.rollback()
+            logger.warning(f"Failed to create resource. System said: {e}")
+            raise UnknownException()
+
+        db_resource = await self.get_resource_by_id(db_resource.id)
+        return db_resource
+
+    async def get_resource_by_id(self, resource_id) -> Optional[IAMResource]:
+        # permissions are read by schemas.IAMResource.from_orm
+        result = await self.db.execute(
+            select(IAMResource)
+            .options(selectinload(IAMResource.permissions))
+            .where(IAMResource.id == resource_id)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
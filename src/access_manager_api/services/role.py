@@ -1,53 +1,63 @@
-import asyncio
 import logging
-from typing import List, Optional, Callable, Awaitable
-from uuid import UUID
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID, uuid4
 
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
 from access_manager_api.infra.error_handling import AlreadyExistsException, UnknownException, NotFoundException
-from access_manager_api.models import IAMRole, Scope
-from access_manager_api.schemas import IAMRoleCreate, IAMResourceCreate, IAMRolePermissionCreate
+from access_manager_api.infra.policy_events import record_policy_delta
+from access_manager_api.models import IAMPermission, IAMResource, IAMRole, IAMRolePermission, Scope
+from access_manager_api.providers.policy_deltas import delta_for, role_permission_policies, role_policies
+from access_manager_api.schemas import IAMRoleCreate
 from access_manager_api.schemas.role import IAMRoleUpdate
-from access_manager_api.services import IAMResourceService, IAMPermissionService
-from access_manager_api.services.role_permissions import IAMRolePermissionsService
+from access_manager_api.utils.pagination import PageParams, paginate
+from access_manager_api.utils.utils import ensure_uuid
 
 logger = logging.getLogger(__name__)
-PolicyRefreshHookType = Callable[[str, int, Session], Awaitable[None]]
+
+# Relationships read by schemas.IAMRole.from_orm: loaded up front instead of 1 + N + N*M lazy loads,
+# which async sessions can't do anyway
+ROLE_LOAD_OPTIONS = (
+    selectinload(IAMRole.role_permissions)
+    .selectinload(IAMRolePermission.permission)
+    .selectinload(IAMPermission.resource),
+)
+
+
+def build_role(role: IAMRoleCreate) -> IAMRole:
+    from access_manager_api.infra.reserved_roles import RESERVED_ROLES
+    reserved = RESERVED_ROLES.get(role.role_name)
+    if reserved:
+        role = role.copy(update=reserved)
+
+    return IAMRole(
+        scope=role.scope,
+        app_id=role.app_id,
+        role_name=role.role_name,
+        description=role.description,
+        synthetic=role.synthetic,
+        synthetic_data=role.synthetic_data
+    )
 
 
 class IAMRoleService:
-    def __init__(self, db: Session,
-                 policy_refresh_hook: Optional[PolicyRefreshHookType] = None):
+    def __init__(self, db: Session):
         self.db = db
-        self.policy_refresh_hook = policy_refresh_hook
-
-    async def create_role(self, role: IAMRoleCreate, commit: bool = True) -> IAMRole:
-        from access_manager_api.infra.reserved_roles import RESERVED_ROLES
-        reserved = RESERVED_ROLES.get(role.role_name)
-        if reserved:
-            role = role.copy(update=reserved)
-
-        db_role = IAMRole(
-            scope=role.scope,
-            app_id=role.app_id,
-            role_name=role.role_name,
-            description=role.description,
-            synthetic=role.synthetic,
-            synthetic_data=role.synthetic_data
-        )
+
+    def create_role(self, role: IAMRoleCreate, commit: bool = True) -> IAMRole:
+        db_role = build_role(role)
 
         self.db.add(db_role)
+        record_policy_delta(self.db, delta_for(db_role.scope, db_role.app_id, synthetic=bool(db_role.synthetic)))
 
         if commit:
             try:
                 self.db.commit()
                 self.db.refresh(db_role)
-                if self.policy_refresh_hook:
-                    asyncio.create_task(
-                        self.policy_refresh_hook(db_role.scope, db_role.app_id, self.db)
-                    )
             except IntegrityError:
                 self.db.rollback()
                 raise AlreadyExistsException(f"IAM role {role.role_name} already exists")
@@ -60,68 +70,107 @@ class IAMRoleService:
 
         return db_role
 
-    async def create_or_get_role_with_resources(self, data: IAMRoleCreate) -> IAMRole:
+    def create_or_get_role_with_resources(self, data: IAMRoleCreate) -> IAMRole:
+        """
+        Idempotently create a role with its resources, actions and role permissions.
+        Every level is upserted with one INSERT ... ON CONFLICT DO NOTHING, all in a single
+        transaction that records one policy delta.
+        """
         try:
-            db_role = await self.create_role(data, commit=True)
-        except (IntegrityError, AlreadyExistsException):
+            db_role, role_created = self._upsert_role(data)
+            delta = delta_for(db_role.scope, db_role.app_id, synthetic=role_created and bool(db_role.synthetic))
+
+            if data.resources:
+                resources = self._upsert_resources(data, list(data.resources.keys()))
+                permissions = self._upsert_permissions({
+                    resources[name].id: list(actions.keys()) for name, actions in data.resources.items()
+                })
+                grants = [
+                    (permissions[(resources[name].id, action)], effect.value)
+                    for name, actions in data.resources.items()
+                    for action, effect in actions.items()
+                ]
+                for permission, effect in self._insert_role_permissions(db_role.id, grants):
+                    delta.added.extend(role_permission_policies(db_role, permission, effect))
+
+            record_policy_delta(self.db, delta)
+            self.db.commit()
+        except Exception as e:
             self.db.rollback()
-            db_role = self.get_role_by_name(
-                scope=data.scope,
-                app_id=data.app_id,
-                role_name=data.role_name
-            )
+            logger.warning(f"Failed to create role {data.role_name} with resources. System said: {e}")
+            raise UnknownException()
+
+        self.db.refresh(db_role)
+        return db_role
+
+    def _upsert_role(self, data: IAMRoleCreate) -> Tuple[IAMRole, bool]:
+        role = build_role(data)
+        role_id = self.db.execute(
+            insert(IAMRole)
+            .values(id=uuid4(), scope=role.scope, app_id=role.app_id, role_name=role.role_name,
+                    description=role.description, synthetic=role.synthetic, synthetic_data=role.synthetic_data)
+            .on_conflict_do_nothing()
+            .returning(IAMRole.id)
+        ).scalar()
+        if role_id is not None:
+            return self.db.get(IAMRole, role_id), True
+
+        db_role = self.get_role_by_name(role_name=data.role_name, scope=data.scope, app_id=data.app_id)
         if not db_role:
             raise NotFoundException(f"Failed to create or retrieve role {data.role_name}")
+        return db_role, False
 
-        if data.resources:
-            resource_service = IAMResourceService(self.db)
-            role_permission_service = IAMRolePermissionsService(self.db)
-            permission_service = IAMPermissionService(self.db)
-
-            for resource_name, actions_dict in data.resources.items():
-                action_names = list(actions_dict.keys())
-
-                ## Idempontently create the resource with the provided actions
-                resource_input = IAMResourceCreate(
-                    scope=data.scope,
-                    app_id=data.app_id,
-                    resource_name=resource_name,
-                    actions=action_names
-                )
-
-                try:
-                    resource = await resource_service.create_or_get_resource_with_actions(resource_input)
-                except Exception as e:
-                    self.db.rollback()
-                    logger.warning(f"Failed to create or get resource {resource_name}: {e}")
-                    continue
-                ## Resource is fetched
-
-                # Build a dict: action -> permission
-                permissions = permission_service.get_permissions_by_resource_and_actions(resource.id, action_names);
-                perm_by_action = {p.action: p for p in permissions}
-
-                for action, effect in actions_dict.items():
-                    permission = perm_by_action.get(action)
-                    if not permission:
-                        logger.warning(f"Permission '{action}' not found for resource '{resource_name}'.")
-                        continue
-
-                    try:
-                        role_permission_input = IAMRolePermissionCreate(
-                            role_id=db_role.id,
-                            permission_id=permission.id,
-                            effect=effect
-                        )
-                        await role_permission_service.create_role_permission(role_permission_input)
-                    except Exception as e:
-                        self.db.rollback()
-                        logger.warning(f"Could not assign permission '{action}' on '{resource_name}': {e}")
+    def _upsert_resources(self, data: IAMRoleCreate, names: List[str]) -> Dict[str, IAMResource]:
+        app_id = ensure_uuid(data.app_id) if data.app_id else None
+        self.db.execute(
+            insert(IAMResource)
+            .values([
+                {"id": uuid4(), "scope": data.scope, "app_id": app_id, "resource_name": name, "synthetic": False}
+                for name in names
+            ])
+            .on_conflict_do_nothing()
+        )
+        query = select(IAMResource).where(IAMResource.scope == data.scope, IAMResource.resource_name.in_(names))
+        query = query.where(IAMResource.app_id == app_id) if app_id else query.where(IAMResource.app_id.is_(None))
+        return {r.resource_name: r for r in self.db.execute(query).scalars()}
 
-        return db_role
+    def _upsert_permissions(self, actions_by_resource: Dict[UUID, List[str]]) -> Dict[Tuple[UUID, str], IAMPermission]:
+        rows = [
+            {"id": uuid4(), "resource_id": resource_id, "action": action}
+            for resource_id, actions in actions_by_resource.items()
+            for action in actions
+        ]
+        if rows:
+            self.db.execute(
+                insert(IAMPermission).values(rows).on_conflict_do_nothing(constraint="uix_resource_action")
+            )
+        permissions = self.db.execute(
+            select(IAMPermission).where(IAMPermission.resource_id.in_(list(actions_by_resource.keys())))
+        ).scalars()
+        return {(p.resource_id, p.action): p for p in permissions}
 
-    def get_role_by_id(self, role_id: str) -> Optional[IAMRole]:
-        return self.db.query(IAMRole).filter(IAMRole.id == role_id).first()
+    def _insert_role_permissions(self, role_id: UUID, grants: List[Tuple[IAMPermission, str]]) \
+            -> List[Tuple[IAMPermission, str]]:
+        """Insert the missing role permissions and return the (permission, effect) pairs actually added."""
+        if not grants:
+            return []
+        by_id = {permission.id: permission for permission, _ in grants}
+        added = self.db.execute(
+            insert(IAMRolePermission)
+            .values([
+                {"id": uuid4(), "role_id": role_id, "permission_id": permission.id, "effect": effect}
+                for permission, effect in grants
+            ])
+            .on_conflict_do_nothing()
+            .returning(IAMRolePermission.permission_id, IAMRolePermission.effect)
+        ).all()
+        return [(by_id[row.permission_id], row.effect) for row in added]
+
+    def get_role_by_id(self, role_id: str, with_resources: bool = False) -> Optional[IAMRole]:
+        query = self.db.query(IAMRole).filter(IAMRole.id == role_id)
+        if with_resources:
+            query = query.options(*ROLE_LOAD_OPTIONS)
+        return query.first()
 
     def get_role_by_name(self, role_name: str, scope: Scope, app_id: UUID = None) -> Optional[IAMRole]:
         return self.db.query(IAMRole).filter(
@@ -130,33 +179,36 @@ class IAMRoleService:
             IAMRole.app_id == app_id
         ).first()
 
-    def get_roles_by_scope_app(self, scope: str, app_id: Optional[str]) -> List[IAMRole]:
-        query = self.db.query(IAMRole).filter(IAMRole.scope == scope)
+    def get_roles_by_scope_app(self, scope: str, app_id: Optional[str],
+                               page: Optional[PageParams] = None) -> List[IAMRole]:
+        # the resource/action map of every role comes with a constant number of selectin queries
+        query = self.db.query(IAMRole).options(*ROLE_LOAD_OPTIONS).filter(IAMRole.scope == scope)
         if app_id:
             query = query.filter(IAMRole.app_id == app_id)
         else:
             query = query.filter(IAMRole.app_id.is_(None))
-        return query.all()
+        return paginate(query, IAMRole, page)
 
-    async def update_role_by_id(self, role_id: str, role_data: IAMRoleUpdate, commit: bool = True) -> Optional[IAMRole]:
+    def update_role_by_id(self, role_id: str, role_data: IAMRoleUpdate, commit: bool = True) -> Optional[IAMRole]:
         db_role = self.get_role_by_id(role_id)
         return self.update_role(db_role, role_data, commit)
 
-    async def update_role(self, db_role: IAMRole, role_data: IAMRoleUpdate, commit: bool = True) -> Optional[IAMRole]:
+    def update_role(self, db_role: IAMRole, role_data: IAMRoleUpdate, commit: bool = True) -> Optional[IAMRole]:
         if not db_role:
             raise NotFoundException("Entry not found")
 
+        was_synthetic = (bool(db_role.synthetic), db_role.synthetic_data)
         for key, value in role_data.model_dump().items():
             setattr(db_role, key, value)
 
+        # synthetic roles are expanded by the synthetic provider; switching the flag/pattern needs a reload
+        synthetic_changed = was_synthetic != (bool(db_role.synthetic), db_role.synthetic_data)
+        record_policy_delta(self.db, delta_for(db_role.scope, db_role.app_id, requires_reload=synthetic_changed))
+
         if commit:
             try:
                 self.db.commit()
                 self.db.refresh(db_role)
-                if self.policy_refresh_hook:
-                    asyncio.create_task(
-                        self.policy_refresh_hook(db_role.scope, db_role.app_id, self.db)
-                    )
             except Exception:
                 self.db.rollback()
                 logger.warning(f"Failed to update role. System said: {e}")
@@ -165,21 +217,58 @@ class IAMRoleService:
             self.db.flush()
         return db_role
 
-    async def delete_role(self, db_role: IAMRole, commit: bool = True):
+    def delete_role(self, db_role: IAMRole, commit: bool = True):
         if not db_role:
             raise NotFoundException("Entry not found")
 
+        # Collect tuples before the cascade removes role permissions and user roles
+        delta = delta_for(db_role.scope, db_role.app_id, synthetic=bool(db_role.synthetic),
+                          requires_reload=bool(db_role.synthetic))
+        delta.removed.extend(role_policies(db_role))
+
         self.db.delete(db_role)
+        record_policy_delta(self.db, delta)
         if commit:
             try:
                 self.db.commit()
-                if self.policy_refresh_hook:
-                    asyncio.create_task(
-                        self.policy_refresh_hook(db_role.scope, db_role.app_id, self.db)
-                    )
             except Exception as e:
                 self.db.rollback()
                 logger.warning(f"Failed to delete role. System said: {e}")
                 raise UnknownException()
         else:
             self.db.flush()
+
+
+class AsyncIAMRoleService:
+    """IAMRoleService counterpart on an AsyncSession, for async routes."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_role(self, role: IAMRoleCreate) -> IAMRole:
+        db_role = build_role(role)
+
+        self.db.add(db_role)
+        record_policy_delta(self.db, delta_for(db_role.scope, db_role.app_id, synthetic=bool(db_role.synthetic)))
+
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            raise AlreadyExistsException(f"IAM role {role.role_name} already exists")
+        except Exception as e:
+            await self.db.rollback()
+            logger.warning(f"Failed to create role. System said: {e}")
+            raise UnknownException()
+
+        db_role = await self.get_role_by_id(db_role.id)
+        return db_role
+
+    async def get_role_by_id(self, role_id) -> Optional[IAMRole]:
+        result = await self.db.execute(
+            select(IAMRole)
+            .options(*ROLE_LOAD_OPTIONS)
+            .where(IAMRole.id == role_id)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
@@ -1,40 +1,45 @@
-import asyncio
 import logging
-from typing import List, Optional, Callable, Awaitable
+from typing import List, Optional
 
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
 
 from access_manager_api.infra.error_handling import AlreadyExistsException, UnknownException, NotFoundException
-from access_manager_api.models import IAMRolePermission
+from access_manager_api.infra.policy_events import record_policy_delta
+from access_manager_api.models import IAMRolePermission, IAMRole, IAMPermission
+from access_manager_api.providers.policy_deltas import delta_for, role_permission_policies
 from access_manager_api.schemas.role_permissions import IAMRolePermissionCreate, IAMRolePermissionUpdate
+from access_manager_api.utils.pagination import PageParams, paginate
 
 logger = logging.getLogger(__name__)
-PolicyRefreshHookType = Callable[[str, int, Session], Awaitable[None]]
 
 
 class IAMRolePermissionsService:
-    def __init__(self, db: Session,
-                 policy_refresh_hook: Optional[PolicyRefreshHookType] = None):
+    def __init__(self, db: Session):
         self.db = db
-        self.policy_refresh_hook = policy_refresh_hook
 
-    async def create_role_permission(self, role_permission: IAMRolePermissionCreate, commit: bool = True) -> IAMRolePermission:
+    def create_role_permission(self, role_permission: IAMRolePermissionCreate, commit: bool = True) -> IAMRolePermission:
         db_obj = IAMRolePermission(
             role_id=role_permission.role_id,
             permission_id=role_permission.permission_id,
             effect=role_permission.effect.value
         )
 
+        # Build the delta before adding the row, lazy loads would autoflush it
+        role = self.db.get(IAMRole, role_permission.role_id)
+        permission = self.db.get(IAMPermission, role_permission.permission_id)
+        delta = delta_for(role.scope, role.app_id) if role else None
+        if delta and permission:
+            delta.added.extend(role_permission_policies(role, permission, db_obj.effect))
+
         self.db.add(db_obj)
+        if delta:
+            record_policy_delta(self.db, delta)
+
         if commit:
             try:
                 self.db.commit()
                 self.db.refresh(db_obj)
-                if self.policy_refresh_hook:
-                    asyncio.create_task(
-                        self.policy_refresh_hook(db_obj.role.scope, db_obj.role.app_id, self.db)
-                    )
             except IntegrityError as e:
                 self.db.rollback()
                 raise AlreadyExistsException("Role permission already exists")
@@ -55,50 +60,50 @@ class IAMRolePermissionsService:
                 .first()
         )
 
-    def get_role_permissions_by_role_id(self, role_id: str) -> List[IAMRolePermission]:
-        return (
+    def get_role_permissions_by_role_id(self, role_id: str,
+                                        page: Optional[PageParams] = None) -> List[IAMRolePermission]:
+        query = (
             self.db.query(IAMRolePermission)
                 .options(joinedload(IAMRolePermission.role), joinedload(IAMRolePermission.permission))
                 .filter(IAMRolePermission.role_id == role_id)
-                .all()
         )
+        return paginate(query, IAMRolePermission, page)
 
-    async def update_role_permission_by_id(self, permission_id: str, data: IAMRolePermissionUpdate) \
+    def update_role_permission_by_id(self, permission_id: str, data: IAMRolePermissionUpdate) \
             -> Optional[IAMRolePermission]:
         db_obj = self.get_role_permission_by_id(permission_id)
         return self.update_role_permission(db_obj, data)
 
-    async def update_role_permission(self, db_obj: IAMRolePermission, data: IAMRolePermissionUpdate) \
+    def update_role_permission(self, db_obj: IAMRolePermission, data: IAMRolePermissionUpdate) \
             -> Optional[IAMRolePermission]:
         if not db_obj:
             raise NotFoundException("Entry not found")
 
+        delta = delta_for(db_obj.role.scope, db_obj.role.app_id)
+        delta.removed.extend(role_permission_policies(db_obj.role, db_obj.permission, db_obj.effect))
         for key, value in data.model_dump().items():
             setattr(db_obj, key, value)
+        delta.added.extend(role_permission_policies(db_obj.role, db_obj.permission, db_obj.effect))
+        record_policy_delta(self.db, delta)
         try:
             self.db.commit()
             self.db.refresh(db_obj)
-            if self.policy_refresh_hook:
-                asyncio.create_task(
-                    self.policy_refresh_hook(db_obj.role.scope, db_obj.role.app_id, self.db)
-                )
         except Exception:
             self.db.rollback()
             logger.warning(f"Failed to update role permission. System said: {e}")
             raise UnknownException()
         return db_obj
 
-    async def delete_role_permission(self, db_obj: IAMRolePermission):
+    def delete_role_permission(self, db_obj: IAMRolePermission):
         if not db_obj:
             raise NotFoundException("Entry not found")
         role = db_obj.role
+        delta = delta_for(role.scope, role.app_id)
+        delta.removed.extend(role_permission_policies(role, db_obj.permission, db_obj.effect))
         try:
             self.db.delete(db_obj)
+            record_policy_delta(self.db, delta)
             self.db.commit()
-            if self.policy_refresh_hook:
-                asyncio.create_task(
-                    self.policy_refresh_hook(role.scope, role.app_id, self.db)
-                )
         except Exception:
             self.db.rollback()
             raise UnknownException()
@@ -1,39 +1,50 @@
-import asyncio
 import logging
-from typing import List, Optional, Callable, Awaitable
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID, uuid4
 
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 
 from access_manager_api.infra.error_handling import AlreadyExistsException, UnknownException, NotFoundException
-from access_manager_api.models import IAMUserPermission
+from access_manager_api.infra.policy_events import record_policy_delta
+from access_manager_api.models import IAMUserPermission, IAMPermission, User
+from access_manager_api.providers.policy_deltas import delta_for, merge_deltas, user_permission_policies
+from access_manager_api.schemas.common import BulkItemStatus
 from access_manager_api.schemas.user_permissions import IAMUserPermissionCreate
+from access_manager_api.services.bulk import get_user_emails
+from access_manager_api.utils.pagination import PageParams, paginate
 
 logger = logging.getLogger(__name__)
-PolicyRefreshHookType = Callable[[str, int, Session], Awaitable[None]]
+# (user_id, permission_id)
+BulkKey = Tuple[UUID, UUID]
 
 
 class IAMUserPermissionsService:
-    def __init__(self, db: Session,
-                 policy_refresh_hook: Optional[PolicyRefreshHookType] = None):
+    def __init__(self, db: Session):
         self.db = db
-        self.policy_refresh_hook = policy_refresh_hook
 
-    async def create_user_permission(self, payload: IAMUserPermissionCreate) -> IAMUserPermission:
+    def create_user_permission(self, payload: IAMUserPermissionCreate) -> IAMUserPermission:
         db_obj = IAMUserPermission(
             user_id=payload.user_id,
             permission_id=payload.permission_id,
             effect=payload.effect.value
         )
 
+        permission = self.db.get(IAMPermission, payload.permission_id)
+        user = self.db.get(User, payload.user_id)
+        delta = delta_for(permission.resource.scope, permission.resource.app_id) if permission else None
+        if delta and user:
+            delta.added.extend(user_permission_policies(user.email, permission, db_obj.effect))
+
         try:
             self.db.add(db_obj)
+            if delta:
+                record_policy_delta(self.db, delta)
             self.db.commit()
             self.db.refresh(db_obj)
-            if self.policy_refresh_hook:
-                asyncio.create_task(
-                    self.policy_refresh_hook(db_obj.permission.resource.scope, db_obj.permission.resource.app_id, self.db)
-                )
             return db_obj
         except IntegrityError:
             self.db.rollback()
@@ -50,30 +61,128 @@ class IAMUserPermissionsService:
                 .first()
         )
 
-    def get_user_permissions_by_user(self, user_id: str) -> List[IAMUserPermission]:
-        return (
+    def get_user_permissions_by_user(self, user_id: str,
+                                     page: Optional[PageParams] = None) -> List[IAMUserPermission]:
+        query = (
             self.db.query(IAMUserPermission)
                 .options(joinedload(IAMUserPermission.permission))
                 .filter(IAMUserPermission.user_id == user_id)
-                .all()
         )
+        return paginate(query, IAMUserPermission, page)
 
-    async def delete_user_permission(self, db_obj: IAMUserPermission):
+    def delete_user_permission(self, db_obj: IAMUserPermission):
         if not db_obj:
             raise NotFoundException("Entry not found")
 
         # Eager load before commit
         permission = db_obj.permission
         resource = permission.resource
+        delta = delta_for(resource.scope, resource.app_id)
+        delta.removed.extend(user_permission_policies(db_obj.user.email, permission, db_obj.effect))
 
         try:
             self.db.delete(db_obj)
+            record_policy_delta(self.db, delta)
             self.db.commit()
-            if self.policy_refresh_hook:
-                asyncio.create_task(
-                    self.policy_refresh_hook(resource.scope, resource.app_id, self.db)
-                )
         except Exception:
             self.db.rollback()
             logger.warning(f"Failed to delete user permission. System said: {e}")
             raise UnknownException()
+
+
+class AsyncIAMUserPermissionsService:
+    """IAMUserPermissionsService counterpart on an AsyncSession, for async routes."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_user_permissions_bulk(self, items: List[IAMUserPermissionCreate],
+                                           permissions: Dict[UUID, IAMPermission]) -> Dict[BulkKey, BulkItemStatus]:
+        """
+        Grant direct permissions with a single multi-row insert. `permissions` holds every
+        permission of the items with its resource loaded. Items that can't be granted are
+        reported per item instead of failing the batch.
+        """
+        effects: Dict[BulkKey, str] = {}
+        for item in items:
+            # a pair repeated in the batch is granted with its first effect
+            effects.setdefault((item.user_id, item.permission_id), item.effect.value)
+        statuses = {key: BulkItemStatus.NOT_FOUND for key in effects}
+
+        emails = await get_user_emails(self.db, {user_id for user_id, _ in effects})
+        rows = [
+            {"id": uuid4(), "user_id": user_id, "permission_id": permission_id, "effect": effect}
+            for (user_id, permission_id), effect in effects.items()
+            if user_id in emails and permission_id in permissions
+        ]
+        if not rows:
+            return statuses
+
+        try:
+            inserted = (await self.db.execute(
+                insert(IAMUserPermission)
+                .values(rows)
+                .on_conflict_do_nothing()
+                .returning(IAMUserPermission.user_id, IAMUserPermission.permission_id, IAMUserPermission.effect)
+            )).all()
+            self._record_bulk_deltas(inserted, permissions, emails, granted=True)
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            logger.warning(f"Failed to grant user permissions. System said: {e}")
+            raise UnknownException()
+
+        # rows the insert skipped already exist
+        for row in rows:
+            statuses[(row["user_id"], row["permission_id"])] = BulkItemStatus.CONFLICT
+        for row in inserted:
+            statuses[(row.user_id, row.permission_id)] = BulkItemStatus.CREATED
+        return statuses
+
+    async def delete_user_permissions_bulk(self, keys: List[BulkKey],
+                                           permissions: Dict[UUID, IAMPermission]) -> Dict[BulkKey, BulkItemStatus]:
+        """Revoke direct permissions with a single delete; pairs that weren't granted are reported as not found."""
+        statuses = {key: BulkItemStatus.NOT_FOUND for key in keys}
+        keys = [key for key in statuses if key[1] in permissions]
+        if not keys:
+            return statuses
+
+        try:
+            deleted = (await self.db.execute(
+                delete(IAMUserPermission)
+                .where(tuple_(IAMUserPermission.user_id, IAMUserPermission.permission_id).in_(keys))
+                .returning(IAMUserPermission.user_id, IAMUserPermission.permission_id, IAMUserPermission.effect)
+                .execution_options(synchronize_session=False)
+            )).all()
+            emails = await get_user_emails(self.db, {row.user_id for row in deleted})
+            self._record_bulk_deltas(deleted, permissions, emails, granted=False)
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            logger.warning(f"Failed to revoke user permissions. System said: {e}")
+            raise UnknownException()
+
+        for row in deleted:
+            statuses[(row.user_id, row.permission_id)] = BulkItemStatus.DELETED
+        return statuses
+
+    async def get_permissions_with_resources(self, permission_ids: Iterable[UUID]) -> Dict[UUID, IAMPermission]:
+        permissions = (await self.db.execute(
+            select(IAMPermission)
+            .options(joinedload(IAMPermission.resource))
+            .where(IAMPermission.id.in_(list(permission_ids)))
+        )).scalars()
+        return {p.id: p for p in permissions}
+
+    def _record_bulk_deltas(self, rows, permissions: Dict[UUID, IAMPermission], emails: Dict[UUID, str],
+                            granted: bool):
+        """Record one delta per (scope, app_id), in the transaction of the rows."""
+        deltas = []
+        for row in rows:
+            permission = permissions[row.permission_id]
+            delta = delta_for(permission.resource.scope, permission.resource.app_id)
+            policies = user_permission_policies(emails[row.user_id], permission, row.effect)
+            (delta.added if granted else delta.removed).extend(policies)
+            deltas.append(delta)
+        for delta in merge_deltas(deltas):
+            record_policy_delta(self.db, delta)
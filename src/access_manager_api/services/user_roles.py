@@ -1,44 +1,55 @@
-import asyncio
 import logging
-from typing import List, Optional, Callable, Awaitable
-from uuid import UUID
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID, uuid4
 
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
 from access_manager_api.infra.error_handling import AlreadyExistsException, UnknownException, NotFoundException
-from access_manager_api.models import IAMUserRole
+from access_manager_api.infra.policy_events import record_policy_delta
+from access_manager_api.models import IAMUserRole, IAMRole, User
+from access_manager_api.providers.policy_deltas import merge_deltas, user_role_delta
 from access_manager_api.schemas.user_roles import UserRoleCreate
+from access_manager_api.services.bulk import get_user_emails
+from access_manager_api.services.role import ROLE_LOAD_OPTIONS
+from access_manager_api.utils.pagination import PageParams, paginate
 
 logger = logging.getLogger(__name__)
-PolicyRefreshHookType = Callable[[str, int, Session], Awaitable[None]]
+
+# the role and its permissions are read by schemas.UserRole.from_orm
+USER_ROLE_LOAD_OPTIONS = tuple(selectinload(IAMUserRole.role).options(option) for option in ROLE_LOAD_OPTIONS)
 
 
 class IAMUserRolesService:
-    def __init__(self, db: Session,
-                 policy_refresh_hook: Optional[PolicyRefreshHookType] = None):
+    def __init__(self, db: Session):
         self.db = db
-        self.policy_refresh_hook = policy_refresh_hook
 
     # alias to create_user_role
-    async def assign_user_to_role(self, user_id: UUID, role_id: UUID, commit: bool = True):
-        return await self.create_user_role(UserRoleCreate(user_id=user_id, role_id=role_id), commit=commit)
+    def assign_user_to_role(self, user_id: UUID, role_id: UUID, commit: bool = True):
+        return self.create_user_role(UserRoleCreate(user_id=user_id, role_id=role_id), commit=commit)
 
-    async def create_user_role(self, payload: UserRoleCreate, commit: bool = True) -> IAMUserRole:
+    def create_user_role(self, payload: UserRoleCreate, commit: bool = True) -> IAMUserRole:
         db_obj = IAMUserRole(
             user_id=payload.user_id,
             role_id=payload.role_id
         )
 
+        # Build the delta before adding the row, lazy loads would autoflush it
+        role = self.db.get(IAMRole, payload.role_id)
+        user = self.db.get(User, payload.user_id)
+        delta = user_role_delta(user.email, role, assigned=True) if role and user else None
+
         self.db.add(db_obj)
+        if delta:
+            record_policy_delta(self.db, delta)
+
         if commit:
             try:
                 self.db.commit()
                 self.db.refresh(db_obj)
-                if self.policy_refresh_hook:
-                    asyncio.create_task(
-                        self.policy_refresh_hook(db_obj.role.scope, db_obj.role.app_id, self.db)
-                    )
             except IntegrityError:
                 self.db.rollback()
                 raise AlreadyExistsException("User already assigned to this role")
@@ -53,41 +64,144 @@ class IAMUserRolesService:
     def get_user_role_by_id(self, user_role_id: str) -> Optional[IAMUserRole]:
         return (
             self.db.query(IAMUserRole)
-                .options(joinedload(IAMUserRole.role))
+                .options(*USER_ROLE_LOAD_OPTIONS)
                 .filter(IAMUserRole.id == user_role_id)
                 .first()
         )
 
-    def get_user_roles_by_user(self, user_id: str, app_id: Optional[str] = None) -> List[IAMUserRole]:
+    def get_user_roles_by_user(self, user_id: str, app_id: Optional[str] = None,
+                               page: Optional[PageParams] = None) -> List[IAMUserRole]:
         query = (
             self.db.query(IAMUserRole)
-                .options(joinedload(IAMUserRole.role))
+                .options(*USER_ROLE_LOAD_OPTIONS)
                 .filter(
                 IAMUserRole.user_id == user_id,
                 IAMUserRole.role.has(app_id=app_id) if app_id else True
             )
         )
 
-        return query.all()
+        return paginate(query, IAMUserRole, page)
 
-    async def delete_user_role(self, db_obj: IAMUserRole, commit: bool = True):
+    def delete_user_role(self, db_obj: IAMUserRole, commit: bool = True):
         if not db_obj:
             raise NotFoundException("Entry not found")
 
         # Eager load before delete
         role = db_obj.role
+        delta = user_role_delta(db_obj.user.email, role, assigned=False)
 
         self.db.delete(db_obj)
+        record_policy_delta(self.db, delta)
         if commit:
             try:
                 self.db.commit()
-                if self.policy_refresh_hook:
-                    asyncio.create_task(
-                        self.policy_refresh_hook(role.scope, role.app_id, self.db)
-                    )
             except Exception as e:
                 self.db.rollback()
                 logger.warning(f"Failed to delete user role. System said: {e}")
                 raise UnknownException()
         else:
             self.db.flush()
+
+
+class AsyncIAMUserRolesService:
+    """IAMUserRolesService counterpart on an AsyncSession, for async routes."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_user_role(self, payload: UserRoleCreate) -> IAMUserRole:
+        db_obj = IAMUserRole(
+            user_id=payload.user_id,
+            role_id=payload.role_id
+        )
+
+        role = await self.db.get(IAMRole, payload.role_id)
+        user = await self.db.get(User, payload.user_id)
+        delta = user_role_delta(user.email, role, assigned=True) if role and user else None
+
+        self.db.add(db_obj)
+        if delta:
+            record_policy_delta(self.db, delta)
+
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            raise AlreadyExistsException("User already assigned to this role")
+        except Exception as e:
+            await self.db.rollback()
+            logger.warning(f"Failed to assign user role. System said: {e}")
+            raise UnknownException()
+
+        db_obj = await self.get_user_role_by_id(db_obj.id)
+        return db_obj
+
+    async def get_user_role_by_id(self, user_role_id) -> Optional[IAMUserRole]:
+        result = await self.db.execute(
+            select(IAMUserRole)
+            .options(*USER_ROLE_LOAD_OPTIONS)
+            .where(IAMUserRole.id == user_role_id)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    async def create_user_roles_bulk(self, pairs: List[Tuple[UUID, UUID]], roles: Dict[UUID, IAMRole]) -> int:
+        """
+        Assign (user_id, role_id) pairs with a single multi-row insert; pairs already assigned
+        are skipped. `roles` holds every role of the pairs. Returns the number of assignments made.
+        """
+        pairs = list(dict.fromkeys(pairs))
+        if not pairs:
+            return 0
+        emails = await get_user_emails(self.db, {user_id for user_id, _ in pairs})
+        missing = {str(user_id) for user_id, _ in pairs if user_id not in emails}
+        if missing:
+            raise NotFoundException(f"Users not found: {', '.join(sorted(missing))}")
+
+        try:
+            inserted = (await self.db.execute(
+                insert(IAMUserRole)
+                .values([{"id": uuid4(), "user_id": user_id, "role_id": role_id} for user_id, role_id in pairs])
+                .on_conflict_do_nothing()
+                .returning(IAMUserRole.user_id, IAMUserRole.role_id)
+            )).all()
+            self._record_bulk_deltas(inserted, roles, emails, assigned=True)
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            logger.warning(f"Failed to assign user roles. System said: {e}")
+            raise UnknownException()
+
+        return len(inserted)
+
+    async def delete_user_roles_bulk(self, pairs: List[Tuple[UUID, UUID]], roles: Dict[UUID, IAMRole]) -> int:
+        """Revoke (user_id, role_id) pairs with a single delete. Returns the number of assignments removed."""
+        pairs = list(dict.fromkeys(pairs))
+        if not pairs:
+            return 0
+        try:
+            deleted = (await self.db.execute(
+                delete(IAMUserRole)
+                .where(tuple_(IAMUserRole.user_id, IAMUserRole.role_id).in_(pairs))
+                .returning(IAMUserRole.user_id, IAMUserRole.role_id)
+                .execution_options(synchronize_session=False)
+            )).all()
+            emails = await get_user_emails(self.db, {row.user_id for row in deleted})
+            self._record_bulk_deltas(deleted, roles, emails, assigned=False)
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            logger.warning(f"Failed to revoke user roles. System said: {e}")
+            raise UnknownException()
+
+        return len(deleted)
+
+    async def get_roles_by_ids(self, role_ids: Iterable[UUID]) -> Dict[UUID, IAMRole]:
+        roles = (await self.db.execute(select(IAMRole).where(IAMRole.id.in_(list(role_ids))))).scalars()
+        return {role.id: role for role in roles}
+
+    def _record_bulk_deltas(self, rows, roles: Dict[UUID, IAMRole], emails: Dict[UUID, str], assigned: bool):
+        # one delta per (scope, app_id), written with the rows in the same transaction
+        deltas = [user_role_delta(emails[row.user_id], roles[row.role_id], assigned=assigned) for row in rows]
+        for delta in merge_deltas(deltas):
+            record_policy_delta(self.db, delta)
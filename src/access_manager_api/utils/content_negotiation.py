@@ -0,0 +1,55 @@
+from typing import List, Optional, Sequence, Tuple
+
+
+def parse_accept(accept: Optional[str]) -> List[Tuple[str, float]]:
+    """Media ranges of an Accept header with their q-values, in header order."""
+    ranges = []
+    for part in (accept or "").split(","):
+        media_range, *params = [p.strip() for p in part.split(";")]
+        if not media_range:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = min(max(float(value), 0.0), 1.0)
+                except ValueError:
+                    quality = 0.0
+        ranges.append((media_range.lower(), quality))
+    return ranges
+
+
+def negotiate_media_type(accept: Optional[str], offered: Sequence[str]) -> Optional[str]:
+    """
+    The offered media type with the highest q-value, taken from the most specific matching range
+    (type/subtype, then type/*, then */*). Ties go to the first offered type. Returns the first
+    offered type without an Accept header and None when nothing offered is acceptable.
+    """
+    ranges = parse_accept(accept)
+    if not ranges:
+        return offered[0] if offered else None
+
+    best, best_quality = None, 0.0
+    for media_type in offered:
+        quality = _quality_of(media_type.lower(), ranges)
+        if quality > best_quality:
+            best, best_quality = media_type, quality
+    return best
+
+
+def _quality_of(media_type: str, ranges: List[Tuple[str, float]]) -> float:
+    main_type = media_type.split("/", 1)[0]
+    specificity, quality = -1, 0.0
+    for media_range, range_quality in ranges:
+        if media_range == media_type:
+            match = 2
+        elif media_range == f"{main_type}/*":
+            match = 1
+        elif media_range == "*/*":
+            match = 0
+        else:
+            continue
+        if match > specificity:
+            specificity, quality = match, range_quality
+    return quality
@@ -0,0 +1,77 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Tuple
+from uuid import UUID
+
+from fastapi import Query, Response
+from sqlalchemy import tuple_
+
+from access_manager_api.infra.config import settings
+from access_manager_api.infra.error_handling import InvalidFormatException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+Cursor = Tuple[datetime, UUID]
+
+
+@dataclass(frozen=True)
+class PageParams:
+    cursor: Optional[Cursor]
+    limit: int
+
+
+class Page(list):
+    """A page of rows; next_cursor is None on the last page."""
+
+    def __init__(self, items, next_cursor: Optional[str] = None):
+        super().__init__(items)
+        self.next_cursor = next_cursor
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    raw = json.dumps([created_at.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidFormatException(f"Invalid cursor '{cursor}'")
+
+
+def get_page_params(
+        cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+        limit: Optional[int] = Query(None, ge=1, description="Page size, capped at the configured maximum"),
+) -> PageParams:
+    limit = min(limit or settings.AccessManager.DefaultPageSize, settings.AccessManager.MaxPageSize)
+    return PageParams(cursor=decode_cursor(cursor) if cursor else None, limit=limit)
+
+
+def paginate(query, model, page: Optional[PageParams]):
+    """
+    Keyset pagination of an ORM query on (created_at, id). Without page params the query is
+    returned unbounded, for internal callers.
+    """
+    if page is None:
+        return query.all()
+
+    if page.cursor:
+        query = query.filter(tuple_(model.created_at, model.id) > tuple_(*page.cursor))
+    # one extra row tells whether there is a next page
+    rows = query.order_by(model.created_at, model.id).limit(page.limit + 1).all()
+    if len(rows) <= page.limit:
+        return Page(rows)
+    rows = rows[:page.limit]
+    return Page(rows, encode_cursor(rows[-1].created_at, rows[-1].id))
+
+
+def set_next_cursor(response: Response, rows):
+    next_cursor = getattr(rows, "next_cursor", None)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
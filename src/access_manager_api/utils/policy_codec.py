@@ -0,0 +1,69 @@
+"""
+Compact MessagePack encoding of the policies served by GET /iam/policies.
+
+Payload (a msgpack map):
+    v                format version
+    resource_prefix  same as the JSON response
+    strings          string table, every ptype/subject/object/action/effect is stored once
+    policies         one array per rule: [ptype, subject, object(, action, effect)] as indexes
+                     into `strings`, nil for a missing value
+
+Descriptions are not encoded; decode_policies rebuilds the JSON response shape without them.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import msgpack
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+POLICY_CODEC_VERSION = 1
+
+POLICY_FIELDS = ("subject", "object", "action", "effect")
+
+
+class _StringTable:
+    def __init__(self):
+        self.strings: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def add(self, value: Optional[str]) -> Optional[int]:
+        if value is None:
+            return None
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+
+def encode_policies(rules: Iterable[Tuple[str, Sequence[Optional[str]]]], resource_prefix: str = "") -> bytes:
+    """Encode (ptype, rule) pairs as read from the enforcer model."""
+    table = _StringTable()
+    rows = [[table.add(ptype)] + [table.add(value) for value in rule[:len(POLICY_FIELDS)]] for ptype, rule in rules]
+    return msgpack.packb({
+        "v": POLICY_CODEC_VERSION,
+        "resource_prefix": resource_prefix,
+        "strings": table.strings,
+        "policies": rows,
+    }, use_bin_type=True)
+
+
+def decode_policies(data: bytes) -> dict:
+    """
+    Reference decoder: returns {"resource_prefix", "policies"} like the JSON response,
+    with ptype/subject/object/action/effect per policy.
+    """
+    payload = msgpack.unpackb(data, raw=False)
+    if payload.get("v") != POLICY_CODEC_VERSION:
+        raise ValueError(f"Unsupported policy payload version {payload.get('v')}")
+
+    strings = payload["strings"]
+    policies = []
+    for row in payload["policies"]:
+        values = [strings[index] if index is not None else None for index in row]
+        policy = {"ptype": values[0]}
+        for position, field in enumerate(POLICY_FIELDS, start=1):
+            policy[field] = values[position] if position < len(values) else None
+        policies.append(policy)
+
+    return {"resource_prefix": payload["resource_prefix"], "policies": policies}
@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from access_manager_api.infra.database import get_db
+from access_manager_api.infra.error_handling import ErrorHandlerMiddleware
+from access_manager_api.routes import access
+from access_manager_api.services.policies import PoliciesService
+
+
+class FakeQuery:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def filter(self, *criteria):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def query(self, *entities):
+        return FakeQuery(self.rows)
+
+
+def make_client(db) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(ErrorHandlerMiddleware)
+    app.include_router(access.router)
+    app.dependency_overrides[get_db] = lambda: db
+    return TestClient(app)
+
+
+def test_batch_user_access_resolves_every_known_user(monkeypatch):
+    alice, bob, unknown = uuid4(), uuid4(), uuid4()
+    app_id = str(uuid4())
+    prefix = f"APP/{app_id}/"
+    requested = []
+
+    def get_policies(self, params):
+        requested.append(params)
+        return {
+            "resource_prefix": prefix,
+            "policies": [
+                {"ptype": "g", "subject": "alice@example.com", "object": f"{prefix}viewer"},
+                {"ptype": "p", "subject": f"{prefix}viewer", "object": f"{prefix}docs", "action": "read",
+                 "effect": "allow"},
+                {"ptype": "p", "subject": "bob@example.com", "object": f"{prefix}docs", "action": "write",
+                 "effect": "allow"},
+            ],
+        }
+
+    monkeypatch.setattr(PoliciesService, "get_policies", get_policies)
+    db = FakeSession([
+        SimpleNamespace(id=alice, email="alice@example.com"),
+        SimpleNamespace(id=bob, email="bob@example.com"),
+    ])
+
+    response = make_client(db).post("/iam/access/user-access/batch", json={
+        "user_ids": [str(alice), str(bob), str(unknown)],
+        "scope": "APP",
+        "app_id": app_id,
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [access["user_id"] for access in body] == [str(alice), str(bob)]
+    assert body[0]["roles"] == ["viewer"]
+    assert body[0]["permissions"] == {"docs": [{"action": "read", "effect": "allow"}]}
+    assert body[1]["roles"] == []
+    assert body[1]["permissions"] == {"docs": [{"action": "write", "effect": "allow"}]}
+    assert requested[0].scope == "APP" and requested[0].app_id == app_id
+
+
+def test_batch_user_access_without_known_users_is_empty(monkeypatch):
+    monkeypatch.setattr(PoliciesService, "get_policies", lambda self, params: {"policies": []})
+
+    response = make_client(FakeSession([])).post("/iam/access/user-access/batch", json={
+        "user_ids": [str(uuid4())],
+        "scope": "APP",
+        "app_id": str(uuid4()),
+    })
+
+    assert response.status_code == 200
+    assert response.json() == []
@@ -0,0 +1,145 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from access_manager_api.infra.access_guard import get_access_guard_enforcer
+from access_manager_api.infra.database import get_async_db
+from access_manager_api.infra.error_handling import ErrorHandlerMiddleware
+from access_manager_api.infra.user_cache import CachedUser
+from access_manager_api.routes import user_permissions, user_roles
+from access_manager_api.routes.dependencies import get_user
+from access_manager_api.schemas.common import BulkItemStatus
+from access_manager_api.services.user_permissions import AsyncIAMUserPermissionsService
+from access_manager_api.services.user_roles import AsyncIAMUserRolesService
+from access_manager_api.utils.utils import build_resource_path
+
+WRITABLE_APP, READ_ONLY_APP = uuid4(), uuid4()
+CALLER = CachedUser(id=uuid4(), email="admin@example.com", org_id=None, is_super_admin=False)
+
+
+class FakeAuthorizer:
+    """Grants write on the iam resource of the writable app only, and records the batches."""
+
+    def __init__(self):
+        self.batches = []
+
+    def batch_check(self, requests):
+        self.batches.append(list(requests))
+        writable = (CALLER.email, build_resource_path("iam", WRITABLE_APP), "write")
+        return [request == writable for request in requests]
+
+
+@pytest.fixture
+def authorizer():
+    return FakeAuthorizer()
+
+
+@pytest.fixture
+def client(authorizer):
+    app = FastAPI()
+    app.add_middleware(ErrorHandlerMiddleware)
+    app.include_router(user_roles.router)
+    app.include_router(user_permissions.router)
+    app.dependency_overrides[get_user] = lambda: CALLER
+    app.dependency_overrides[get_access_guard_enforcer] = lambda: authorizer
+    app.dependency_overrides[get_async_db] = lambda: object()
+    return TestClient(app)
+
+
+@pytest.fixture
+def roles(monkeypatch):
+    roles = {uuid4(): SimpleNamespace(app_id=WRITABLE_APP), uuid4(): SimpleNamespace(app_id=WRITABLE_APP)}
+    applied = []
+
+    async def get_roles_by_ids(self, role_ids):
+        return {role_id: roles[role_id] for role_id in role_ids if role_id in roles}
+
+    async def create_user_roles_bulk(self, pairs, loaded):
+        applied.append(pairs)
+        return len(pairs) - 1
+
+    monkeypatch.setattr(AsyncIAMUserRolesService, "get_roles_by_ids", get_roles_by_ids)
+    monkeypatch.setattr(AsyncIAMUserRolesService, "create_user_roles_bulk", create_user_roles_bulk)
+    monkeypatch.setattr(AsyncIAMUserRolesService, "delete_user_roles_bulk", create_user_roles_bulk)
+    return SimpleNamespace(items=roles, applied=applied)
+
+
+def role_items(role_ids):
+    return {"items": [{"user_id": str(uuid4()), "role_id": str(role_id)} for role_id in role_ids]}
+
+
+def test_bulk_assignment_checks_each_app_once(client, authorizer, roles):
+    response = client.post("/iam/user-roles/bulk", json=role_items(roles.items))
+
+    assert response.status_code == 200
+    assert response.json() == {"requested": 2, "applied": 1}
+    assert authorizer.batches == [[(CALLER.email, build_resource_path("iam", WRITABLE_APP), "write")]]
+    assert len(roles.applied[0]) == 2
+
+
+def test_bulk_revocation_with_an_unknown_role_fails_the_batch(client, roles):
+    unknown = uuid4()
+
+    response = client.request("DELETE", "/iam/user-roles/bulk", json=role_items([*roles.items, unknown]))
+
+    assert response.status_code == 404
+    assert str(unknown) in response.json()["detail"]
+    assert roles.applied == []
+
+
+def test_bulk_assignment_to_a_read_only_app_fails_the_batch(client, roles):
+    read_only = uuid4()
+    roles.items[read_only] = SimpleNamespace(app_id=READ_ONLY_APP)
+
+    response = client.post("/iam/user-roles/bulk", json=role_items(roles.items))
+
+    assert response.status_code == 401
+    assert str(READ_ONLY_APP) in response.json()["detail"]
+    assert roles.applied == []
+
+
+def test_bulk_grants_report_a_status_per_item(client, monkeypatch):
+    writable, read_only, unknown = uuid4(), uuid4(), uuid4()
+    granted_before = uuid4()
+    permissions = {
+        writable: SimpleNamespace(resource=SimpleNamespace(app_id=WRITABLE_APP)),
+        read_only: SimpleNamespace(resource=SimpleNamespace(app_id=READ_ONLY_APP)),
+    }
+    requested = []
+
+    async def get_permissions_with_resources(self, permission_ids):
+        return {pid: permissions[pid] for pid in permission_ids if pid in permissions}
+
+    async def create_user_permissions_bulk(self, items, loaded):
+        requested.extend((item.user_id, item.permission_id) for item in items)
+        return {
+            (item.user_id, item.permission_id):
+                BulkItemStatus.CONFLICT if item.user_id == granted_before else BulkItemStatus.CREATED
+            for item in items
+        }
+
+    monkeypatch.setattr(AsyncIAMUserPermissionsService, "get_permissions_with_resources",
+                        get_permissions_with_resources)
+    monkeypatch.setattr(AsyncIAMUserPermissionsService, "create_user_permissions_bulk", create_user_permissions_bulk)
+    user_id = uuid4()
+    items = [
+        {"user_id": str(user_id), "permission_id": str(writable)},
+        {"user_id": str(user_id), "permission_id": str(writable)},
+        {"user_id": str(granted_before), "permission_id": str(writable)},
+        {"user_id": str(user_id), "permission_id": str(read_only)},
+        {"user_id": str(user_id), "permission_id": str(unknown)},
+    ]
+
+    response = client.post("/iam/user-permissions/bulk", json={"items": items})
+
+    assert response.status_code == 200
+    assert [item["status"] for item in response.json()["items"]] == [
+        BulkItemStatus.CREATED, BulkItemStatus.CONFLICT, BulkItemStatus.CONFLICT,
+        BulkItemStatus.FORBIDDEN, BulkItemStatus.NOT_FOUND,
+    ]
+    assert response.json()["items"][1]["detail"] == "Duplicate item in request"
+    # denied and unknown permissions never reach the insert
+    assert {permission_id for _, permission_id in requested} == {writable}
@@ -0,0 +1,29 @@
+from access_manager_api.utils.content_negotiation import negotiate_media_type, parse_accept
+
+OFFERED = ("application/json", "application/msgpack", "application/x-ndjson")
+
+
+def test_parse_accept():
+    assert parse_accept("application/msgpack;q=0, */*; q=0.5") == [("application/msgpack", 0.0), ("*/*", 0.5)]
+    assert parse_accept(None) == []
+
+
+def test_explicit_type_is_selected():
+    assert negotiate_media_type("application/msgpack", OFFERED) == "application/msgpack"
+    assert negotiate_media_type("application/x-ndjson", OFFERED) == "application/x-ndjson"
+
+
+def test_q_zero_refuses_a_type():
+    assert negotiate_media_type("application/msgpack;q=0", OFFERED) is None
+    assert negotiate_media_type("application/msgpack;q=0, */*", OFFERED) == "application/json"
+
+
+def test_higher_q_wins_and_ties_go_to_the_first_offered():
+    assert negotiate_media_type("application/json;q=0.5, application/msgpack", OFFERED) == "application/msgpack"
+    assert negotiate_media_type("application/msgpack, application/json", OFFERED) == "application/json"
+    assert negotiate_media_type("*/*", OFFERED) == "application/json"
+
+
+def test_missing_header_selects_the_default():
+    assert negotiate_media_type(None, OFFERED) == "application/json"
+    assert negotiate_media_type("", OFFERED) == "application/json"
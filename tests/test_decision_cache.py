@@ -0,0 +1,84 @@
+import pytest
+from access_guard.authz.exceptions import PermissionDeniedError
+from access_guard.authz.models.entities import User
+
+from access_manager_api.infra import decision_cache
+from access_manager_api.infra.decision_cache import CachedPermissionEnforcer, DecisionCache
+
+ALLOWED = (True, None)
+KEY = ("alice@example.com", "iam/app-a", "write")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(decision_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+class FakeEnforcer:
+    """Grants the (subject, resource_path, action) triples it was given, denies everything else."""
+
+    def __init__(self, granted):
+        self.granted = set(granted)
+        self.calls = []
+
+    def require_permission(self, user, resource_path, action):
+        self.calls.append((str(user.id), resource_path, action))
+        if (str(user.id), resource_path, action) not in self.granted:
+            raise PermissionDeniedError(f"{user.id} can't {action} {resource_path}")
+        return True
+
+
+def test_decisions_expire_after_ttl(clock):
+    cache = DecisionCache(max_size=10, ttl_seconds=30)
+    cache.put(KEY, ALLOWED, cache.epoch)
+
+    clock[0] += 29
+    assert cache.get(KEY) == ALLOWED
+    clock[0] += 1
+    assert cache.get(KEY) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_decision_is_evicted(clock):
+    cache = DecisionCache(max_size=2, ttl_seconds=30)
+    first, second, third = (("u", f"iam/app-{i}", "read") for i in range(3))
+    cache.put(first, ALLOWED, cache.epoch)
+    cache.put(second, ALLOWED, cache.epoch)
+    cache.get(first)
+    cache.put(third, ALLOWED, cache.epoch)
+
+    assert cache.get(second) is None
+    assert cache.get(first) == ALLOWED
+    assert cache.get(third) == ALLOWED
+
+
+def test_decision_computed_before_a_clear_is_not_stored(clock):
+    cache = DecisionCache(max_size=10, ttl_seconds=30)
+    epoch = cache.epoch
+    cache.clear()
+    cache.put(KEY, ALLOWED, epoch)
+
+    assert cache.get(KEY) is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_cached_denial_raises_without_asking_the_enforcer_again(clock):
+    enforcer = FakeEnforcer(granted=[])
+    authorizer = CachedPermissionEnforcer(enforcer, DecisionCache(max_size=10, ttl_seconds=30))
+
+    for _ in range(2):
+        with pytest.raises(PermissionDeniedError, match="can't write iam/app-a"):
+            authorizer.require_permission(User(id="alice@example.com"), "iam/app-a", "write")
+    assert len(enforcer.calls) == 1
+
+
+def test_batch_check_evaluates_every_distinct_request_once(clock):
+    enforcer = FakeEnforcer(granted=[KEY])
+    authorizer = CachedPermissionEnforcer(enforcer, DecisionCache(max_size=10, ttl_seconds=30))
+    denied = ("alice@example.com", "iam/app-b", "write")
+
+    assert authorizer.batch_check([KEY, denied, KEY]) == [True, False, True]
+    assert authorizer.batch_check([denied, KEY]) == [False, True]
+    assert enforcer.calls == [KEY, denied]
@@ -0,0 +1,65 @@
+from access_manager_api.infra.enforcer_cache import EnforcerCache
+from access_manager_api.providers.policy_deltas import PolicyDelta
+
+APP_A = ("APP", "a")
+APP_B = ("APP", "b")
+SCOPE_WIDE = ("APP", None)
+
+
+def test_enforcers_are_built_once_per_key():
+    cache = EnforcerCache(max_size=2)
+    builds = []
+
+    def factory():
+        builds.append(APP_A)
+        return object()
+
+    first = cache.get_or_create(APP_A, factory)
+    assert cache.get_or_create(APP_A, factory) is first
+    assert builds == [APP_A]
+
+
+def test_least_recently_used_enforcer_is_evicted():
+    cache = EnforcerCache(max_size=2)
+    cache.get_or_create(APP_A, lambda: "a")
+    cache.get_or_create(APP_B, lambda: "b")
+    cache.get_or_create(APP_A, lambda: "a2")
+    cache.get_or_create(SCOPE_WIDE, lambda: "scope")
+
+    assert len(cache) == 2
+    assert cache.get_or_create(APP_A, lambda: "a2") == "a"
+    assert cache.get_or_create(APP_B, lambda: "b2") == "b2"
+
+
+def test_enforcer_built_during_an_invalidation_is_not_stored():
+    cache = EnforcerCache(max_size=2)
+
+    def factory():
+        # a commit of app a lands while its policies are being loaded
+        cache.invalidate(APP_A)
+        return "stale"
+
+    assert cache.get_or_create(APP_A, factory) == "stale"
+    assert cache.get_or_create(APP_A, lambda: "fresh") == "fresh"
+
+
+def test_deltas_drop_their_app_and_the_scope_wide_enforcer():
+    cache = EnforcerCache(max_size=4)
+    for key in (APP_A, APP_B, SCOPE_WIDE):
+        cache.get_or_create(key, lambda key=key: key)
+
+    cache.invalidate_for_deltas([PolicyDelta(scope="APP", app_id="a")])
+
+    assert cache.get_or_create(APP_B, lambda: "rebuilt") == APP_B
+    assert cache.get_or_create(APP_A, lambda: "rebuilt") == "rebuilt"
+    assert cache.get_or_create(SCOPE_WIDE, lambda: "rebuilt") == "rebuilt"
+
+
+def test_reload_delta_drops_every_enforcer():
+    cache = EnforcerCache(max_size=4)
+    cache.get_or_create(APP_A, lambda: "a")
+    cache.get_or_create(APP_B, lambda: "b")
+
+    cache.invalidate_for_deltas([PolicyDelta(scope="APP", app_id="a", requires_reload=True)])
+
+    assert len(cache) == 0
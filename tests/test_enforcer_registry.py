@@ -0,0 +1,123 @@
+import threading
+from types import SimpleNamespace
+
+import casbin
+import pytest
+from access_guard.authz.models.casbin_policy import CasbinPolicy
+from casbin.model import Model
+
+from access_manager_api.infra import access_guard
+from access_manager_api.infra.access_guard import EnforcerRegistry
+from access_manager_api.infra.decision_cache import DecisionCache
+from access_manager_api.infra.enforcer_cache import EnforcerCache
+from access_manager_api.infra.policy_generations import PolicyGenerations
+from access_manager_api.providers.policy_deltas import PolicyDelta
+
+AM_APP_ID = "00000000-0000-0000-0000-0000000000a1"
+
+MODEL = """
+[request_definition]
+r = sub, obj, act
+
+[policy_definition]
+p = sub, obj, act, eft
+
+[role_definition]
+g = _, _
+
+[policy_effect]
+e = some(where (p.eft == allow)) && !some(where (p.eft == deny))
+
+[matchers]
+m = g(r.sub, p.sub) && r.obj == p.obj && r.act == p.act
+"""
+
+VIEWER_READS_DOCS = CasbinPolicy(ptype="p", sub="SMC/viewer", obj="SMC/docs", act="read", effect="allow")
+ALICE_IS_VIEWER = CasbinPolicy(ptype="g", sub="alice@example.com", obj="SMC/viewer")
+
+
+class FakeSmcEnforcer:
+    """The casbin model of the SMC enforcer, as patched by apply_deltas."""
+
+    def __init__(self):
+        model = Model()
+        model.load_model_from_text(MODEL)
+        self.casbin = casbin.Enforcer(model)
+        self._model = self.casbin.model
+        self.refreshes = 0
+
+    def refresh_policies(self):
+        self.refreshes += 1
+
+    def allows(self, subject, obj, action):
+        return self.casbin.enforce(subject, obj, action)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(access_guard, "get_access_manager_app_id", lambda: AM_APP_ID)
+    registry = EnforcerRegistry.__new__(EnforcerRegistry)
+    registry._session = SimpleNamespace(close=lambda: None)
+    registry._lock = threading.Lock()
+    registry.app_enforcers = EnforcerCache(max_size=4)
+    registry.generations = PolicyGenerations()
+    registry.smc_enforcer = FakeSmcEnforcer()
+    registry.decisions = DecisionCache(max_size=10, ttl_seconds=30)
+    return registry
+
+
+def smc_delta(**kwargs) -> PolicyDelta:
+    return PolicyDelta(scope="SMC", app_id=AM_APP_ID, **kwargs)
+
+
+def test_added_rules_and_role_links_are_enforced(registry):
+    registry.apply_deltas([smc_delta(added=[VIEWER_READS_DOCS, ALICE_IS_VIEWER])])
+
+    assert registry.smc_enforcer.allows("alice@example.com", "SMC/docs", "read")
+    assert not registry.smc_enforcer.allows("bob@example.com", "SMC/docs", "read")
+
+
+def test_removed_role_link_revokes_access(registry):
+    registry.apply_deltas([smc_delta(added=[VIEWER_READS_DOCS, ALICE_IS_VIEWER])])
+    registry.apply_deltas([smc_delta(removed=[ALICE_IS_VIEWER])])
+
+    assert not registry.smc_enforcer.allows("alice@example.com", "SMC/docs", "read")
+    assert registry.smc_enforcer._model.has_policy("p", "p", ["SMC/viewer", "SMC/docs", "read", "allow"])
+
+
+def test_repeated_add_and_missing_remove_are_no_ops(registry):
+    registry.apply_deltas([smc_delta(added=[VIEWER_READS_DOCS]), smc_delta(added=[VIEWER_READS_DOCS])])
+    registry.apply_deltas([smc_delta(removed=[ALICE_IS_VIEWER])])
+
+    assert registry.smc_enforcer._model.get_policy("p", "p") == [["SMC/viewer", "SMC/docs", "read", "allow"]]
+
+
+def test_smc_changes_clear_the_decision_cache(registry):
+    registry.decisions.put(("alice@example.com", "SMC/docs", "read"), (None, "denied"), registry.decisions.epoch)
+
+    registry.apply_deltas([smc_delta(added=[VIEWER_READS_DOCS])])
+
+    assert registry.decisions.get(("alice@example.com", "SMC/docs", "read")) is None
+
+
+def test_app_changes_only_drop_cached_app_enforcers(registry):
+    registry.app_enforcers.get_or_create(("APP", "a"), lambda: "a")
+    registry.app_enforcers.get_or_create(("APP", "b"), lambda: "b")
+    registry.decisions.put(("alice@example.com", "SMC/docs", "read"), (True, None), registry.decisions.epoch)
+    app_rule = CasbinPolicy(ptype="p", sub="APP/a/viewer", obj="APP/a/docs", act="read", effect="allow")
+
+    registry.apply_deltas([PolicyDelta(scope="APP", app_id="a", added=[app_rule])])
+
+    assert registry.app_enforcers.get_or_create(("APP", "a"), lambda: "rebuilt") == "rebuilt"
+    assert registry.app_enforcers.get_or_create(("APP", "b"), lambda: "rebuilt") == "b"
+    assert registry.decisions.get(("alice@example.com", "SMC/docs", "read")) == (True, None)
+    assert registry.smc_enforcer._model.get_policy("p", "p") == []
+
+
+def test_reload_delta_refreshes_the_smc_enforcer(registry):
+    registry.app_enforcers.get_or_create(("APP", "a"), lambda: "a")
+
+    registry.apply_deltas([PolicyDelta(scope="APP", app_id="a", requires_reload=True)])
+
+    assert registry.smc_enforcer.refreshes == 1
+    assert len(registry.app_enforcers) == 0
@@ -0,0 +1,87 @@
+import base64
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import UUID, uuid4
+
+import pytest
+
+from access_manager_api.infra.config import settings
+from access_manager_api.infra.error_handling import InvalidFormatException
+from access_manager_api.utils.pagination import PageParams, decode_cursor, encode_cursor, get_page_params, paginate
+
+CREATED_AT = datetime(2024, 5, 17, 8, 30, 12, 345678, tzinfo=timezone.utc)
+
+
+class FakeQuery:
+    """Records the keyset clauses and serves rows like ORDER BY/LIMIT would."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.filters = []
+        self.limit_value = None
+
+    def filter(self, *criteria):
+        self.filters.extend(criteria)
+        return self
+
+    def order_by(self, *columns):
+        return self
+
+    def limit(self, limit):
+        self.limit_value = limit
+        return self
+
+    def all(self):
+        return self.rows[:self.limit_value] if self.limit_value else self.rows
+
+
+def rows(count):
+    return [SimpleNamespace(created_at=CREATED_AT + timedelta(seconds=i), id=uuid4()) for i in range(count)]
+
+
+MODEL = SimpleNamespace(created_at="created_at", id="id")
+
+
+def test_cursor_round_trip():
+    row_id = UUID("0b7e6a52-3f0c-4d5e-9a8b-1c2d3e4f5a6b")
+
+    cursor = encode_cursor(CREATED_AT, row_id)
+
+    assert decode_cursor(cursor) == (CREATED_AT, row_id)
+    # travels in query strings and headers as is
+    assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    base64.urlsafe_b64encode(b"{}").decode(),
+    base64.urlsafe_b64encode(b'["2024-05-17T08:30:12", "not-a-uuid"]').decode(),
+    base64.urlsafe_b64encode(b'["yesterday", "0b7e6a52-3f0c-4d5e-9a8b-1c2d3e4f5a6b"]').decode(),
+])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidFormatException):
+        decode_cursor(cursor)
+
+
+def test_page_size_is_capped():
+    assert get_page_params(cursor=None, limit=None).limit == settings.AccessManager.DefaultPageSize
+    assert get_page_params(cursor=None, limit=10 ** 6).limit == settings.AccessManager.MaxPageSize
+
+
+def test_next_cursor_points_at_the_last_row_of_a_full_page():
+    page_rows = rows(3)
+
+    page = paginate(FakeQuery(page_rows), MODEL, PageParams(cursor=None, limit=2))
+
+    assert list(page) == page_rows[:2]
+    assert decode_cursor(page.next_cursor) == (page_rows[1].created_at, page_rows[1].id)
+
+
+def test_last_page_has_no_next_cursor():
+    query = FakeQuery(rows(2))
+
+    page = paginate(query, MODEL, PageParams(cursor=decode_cursor(encode_cursor(CREATED_AT, uuid4())), limit=2))
+
+    assert len(page) == 2
+    assert page.next_cursor is None
+    assert len(query.filters) == 1
@@ -0,0 +1,21 @@
+import pytest
+
+from access_manager_api.infra.error_handling import InvalidFormatException
+from access_manager_api.services.policies import _generation_key
+
+APP_ID = "3f2b8c4e-9a1d-4e6f-8b7a-2c5d1e0f9a34"
+
+
+@pytest.mark.parametrize("app_id", [APP_ID, APP_ID.upper(), APP_ID.replace("-", ""), f"{{{APP_ID}}}"])
+def test_generation_key_normalizes_every_spelling_of_an_app_id(app_id):
+    assert _generation_key("APP", app_id) == ("APP", APP_ID)
+
+
+@pytest.mark.parametrize("app_id", [None, ""])
+def test_generation_key_without_app_id_is_scope_wide(app_id):
+    assert _generation_key("SMC", app_id) == ("SMC", None)
+
+
+def test_generation_key_rejects_malformed_app_id():
+    with pytest.raises(InvalidFormatException):
+        _generation_key("APP", "not-a-uuid")
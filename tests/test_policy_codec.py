@@ -0,0 +1,39 @@
+import msgpack
+
+from access_manager_api.utils.policy_codec import decode_policies, encode_policies
+
+
+def test_round_trip():
+    prefix = "APP/3f0c/"
+    rules = [
+        ("p", ["APP/3f0c/viewer", "APP/3f0c/docs", "read", "allow"]),
+        ("p", ["APP/3f0c/editor", "APP/3f0c/docs", "write", "deny"]),
+        ("g", ["alice@example.com", "APP/3f0c/viewer"]),
+    ]
+
+    decoded = decode_policies(encode_policies(rules, prefix))
+
+    assert decoded == {
+        "resource_prefix": prefix,
+        "policies": [
+            {"ptype": "p", "subject": "APP/3f0c/viewer", "object": "APP/3f0c/docs", "action": "read",
+             "effect": "allow"},
+            {"ptype": "p", "subject": "APP/3f0c/editor", "object": "APP/3f0c/docs", "action": "write",
+             "effect": "deny"},
+            {"ptype": "g", "subject": "alice@example.com", "object": "APP/3f0c/viewer", "action": None,
+             "effect": None},
+        ],
+    }
+
+
+def test_repeated_strings_are_stored_once():
+    rules = [("p", ["APP/3f0c/viewer", "APP/3f0c/docs", "read", "allow"])] * 3
+
+    payload = msgpack.unpackb(encode_policies(rules), raw=False)
+
+    assert sorted(payload["strings"]) == sorted(["p", "APP/3f0c/viewer", "APP/3f0c/docs", "read", "allow"])
+    assert payload["policies"] == [[0, 1, 2, 3, 4]] * 3
+
+
+def test_empty_round_trip():
+    assert decode_policies(encode_policies([])) == {"resource_prefix": "", "policies": []}
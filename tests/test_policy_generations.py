@@ -0,0 +1,94 @@
+from access_manager_api.infra import policy_generations
+from access_manager_api.infra.policy_generations import GLOBAL_GENERATION_KEY, PolicyGenerations, changed_generation_keys
+from access_manager_api.providers.policy_deltas import PolicyDelta
+
+KEY = ("APP", "3f2b8c4e-9a1d-4e6f-8b7a-2c5d1e0f9a34")
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+
+class FakeGenerationsSession:
+    """Answers the generation reads from a dict keyed like iam_policy_generations."""
+
+    def __init__(self, generations):
+        self.generations = generations
+        self.reads = 0
+
+    def execute(self, statement, params):
+        self.reads += 1
+        if statement is policy_generations.SELECT_SCOPE_GENERATION_SQL:
+            return FakeResult(sum(g for (scope, _), g in self.generations.items() if scope == params["scope"]))
+        assert statement is policy_generations.SELECT_GENERATION_SQL
+        return FakeResult(self.generations.get((params["scope"], params["app_id"])))
+
+
+def test_generations_are_read_once_without_ttl():
+    db = FakeGenerationsSession({(KEY[0], KEY[1]): 3, ("*", ""): 1})
+    generations = PolicyGenerations()
+
+    assert generations.version(db, KEY) == (3, 1)
+    db.generations[(KEY[0], KEY[1])] = 4
+    assert generations.version(db, KEY) == (3, 1)
+    assert db.reads == 2
+
+
+def test_generations_are_re_read_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(policy_generations.time, "monotonic", lambda: now[0])
+    advanced = []
+    db = FakeGenerationsSession({(KEY[0], KEY[1]): 3})
+    generations = PolicyGenerations(ttl_seconds=5.0, on_advance=advanced.append)
+
+    assert generations.get_or_load(db, KEY) == 3
+    db.generations[(KEY[0], KEY[1])] = 4
+    now[0] += 1.0
+    assert generations.get_or_load(db, KEY) == 3
+
+    now[0] += 5.0
+    assert generations.get_or_load(db, KEY) == 4
+    assert advanced == [KEY]
+
+
+def test_re_read_of_an_unchanged_generation_does_not_advance(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(policy_generations.time, "monotonic", lambda: now[0])
+    advanced = []
+    db = FakeGenerationsSession({("*", ""): 2})
+    generations = PolicyGenerations(ttl_seconds=5.0, on_advance=advanced.append)
+
+    generations.get_or_load(db, GLOBAL_GENERATION_KEY)
+    now[0] += 10.0
+    assert generations.get_or_load(db, GLOBAL_GENERATION_KEY) == 2
+    assert advanced == []
+    assert db.reads == 2
+
+
+def test_app_deltas_only_bump_their_own_key():
+    deltas = [PolicyDelta(scope="APP", app_id="a"), PolicyDelta(scope="APP", app_id=None),
+              PolicyDelta(scope="APP", app_id="b", requires_reload=True)]
+
+    assert changed_generation_keys(deltas) == {("APP", "a"), ("APP", None), ("APP", "b"), GLOBAL_GENERATION_KEY}
+
+
+def test_scope_wide_generation_follows_every_row_of_the_scope():
+    db = FakeGenerationsSession({("APP", "a"): 3, ("APP", "b"): 5, ("APP", ""): 1, ("SMC", "x"): 7})
+    generations = PolicyGenerations()
+
+    assert generations.get_or_load(db, ("APP", None)) == 9
+
+    # a commit of app a: the scope-wide generation is re-read instead of being bumped
+    db.generations[("APP", "a")] = 4
+    generations.observe(("APP", "a"), 4)
+    assert generations.get(("APP", None)) is None
+    assert generations.get_or_load(db, ("APP", None)) == 10
+
+    # a scope-wide delta reports the generation of its own row, not the sum
+    db.generations[("APP", "")] = 2
+    generations.observe(("APP", None), 2)
+    assert generations.get_or_load(db, ("APP", None)) == 11
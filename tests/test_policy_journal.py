@@ -0,0 +1,72 @@
+from types import SimpleNamespace
+
+from access_guard.authz.models.casbin_policy import CasbinPolicy
+
+from access_manager_api.infra import policy_journal
+from access_manager_api.infra.policy_generations import GLOBAL_GENERATION_KEY
+from access_manager_api.infra.policy_journal import load_policy_changes, record_policy_journal
+from access_manager_api.providers.policy_deltas import PolicyDelta
+
+
+class FakeJournalSession:
+    """Answers the journal statements from rows kept in memory."""
+
+    def __init__(self):
+        self.rows = []
+        self.horizons = {}
+
+    def execute(self, statement, params):
+        if statement is policy_journal.INSERT_SQL:
+            self.rows.extend(params)
+            return None
+        if statement is policy_journal.HORIZON_SQL:
+            generation = self.horizons.get((params["scope"], params["app_id"]))
+            return SimpleNamespace(scalar=lambda: generation)
+        if statement is policy_journal.CHANGES_SQL:
+            return [
+                SimpleNamespace(**row) for row in self.rows
+                if row["scope"] == params["scope"] and row["app_id"] == params["app_id"]
+                and params["since"] < row["generation"] <= params["generation"]
+            ]
+        raise AssertionError(f"Unexpected statement {statement}")
+
+
+def test_reload_of_another_app_requires_a_snapshot():
+    db = FakeJournalSession()
+    reload = PolicyDelta(scope="APP", app_id="b", requires_reload=True)
+    # a reload bumps the global generation, not the generation of app a
+    record_policy_journal(db, [reload], {("APP", "b"): 4, GLOBAL_GENERATION_KEY: 2})
+
+    assert load_policy_changes(db, ("APP", "a"), (3, 1), (3, 2)) is None
+    assert load_policy_changes(db, ("APP", "b"), (3, 1), (4, 2)) is None
+    assert load_policy_changes(db, ("APP", "a"), (3, 2), (3, 2)) == ([], [])
+
+
+def test_changes_are_netted_per_tuple():
+    db = FakeJournalSession()
+    read = CasbinPolicy(ptype="p", sub="APP/a/viewer", obj="APP/a/docs", act="read", effect="allow")
+    write = CasbinPolicy(ptype="p", sub="APP/a/viewer", obj="APP/a/docs", act="write", effect="allow")
+    record_policy_journal(db, [PolicyDelta(scope="APP", app_id="a", added=[read, write])], {("APP", "a"): 1})
+    record_policy_journal(db, [PolicyDelta(scope="APP", app_id="a", removed=[write])], {("APP", "a"): 2})
+
+    added, removed = load_policy_changes(db, ("APP", "a"), (0, 0), (2, 0))
+    assert added == [("p", "APP/a/viewer", "APP/a/docs", "read", "allow")]
+    assert removed == [("p", "APP/a/viewer", "APP/a/docs", "write", "allow")]
+
+
+def test_tuples_are_journaled_once_under_their_app():
+    db = FakeJournalSession()
+    read = CasbinPolicy(ptype="p", sub="APP/a/viewer", obj="APP/a/docs", act="read", effect="allow")
+    shared = CasbinPolicy(ptype="p", sub="APP/viewer", obj="APP/docs", act="read", effect="allow")
+    record_policy_journal(db, [PolicyDelta(scope="APP", app_id="a", added=[read]),
+                               PolicyDelta(scope="APP", app_id=None, added=[shared])],
+                          {("APP", "a"): 1, ("APP", None): 1})
+
+    assert [(row["app_id"], row["subject"]) for row in db.rows] == [("a", "APP/a/viewer")]
+
+
+def test_scope_wide_changes_are_answered_with_a_snapshot():
+    db = FakeJournalSession()
+
+    assert load_policy_changes(db, ("APP", None), (9, 0), (10, 0)) is None
+    assert load_policy_changes(db, ("APP", None), (10, 0), (10, 0)) == ([], [])